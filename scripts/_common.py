@@ -0,0 +1,99 @@
+"""Row I/O helpers and stand-ins shared by the evaluation and tracing CLIs."""
+
+import csv
+import json
+import operator
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from shoptech_eval.jsonl import dumps_line
+
+__all__ = ["ZERO_USAGE", "ZeroUsage", "detect_csv_delimiter", "dumps_cell", "dumps_line", "iter_csv_rows"]
+
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover (optional speedup)
+    _orjson = None
+
+_CSV_DELIMITERS = (",", ";", "\t", "|")
+_INPUT_BUFFER_BYTES = 1 << 20
+
+
+def detect_csv_delimiter(sample: bytes) -> str:
+    # Prefer using the header line only (data lines may contain lots of commas inside fields).
+    # Works on the raw bytes: all candidates are ASCII, so no decode is needed to count them.
+    header = next((line for line in sample.splitlines() if line.strip()), b"")
+
+    # Heuristic: pick the delimiter with the highest count in the header; a header with none of
+    # them is a single-column file, for which the delimiter does not matter.
+    counts = {d: header.count(d.encode("ascii")) for d in _CSV_DELIMITERS}
+    best = max(counts, key=counts.__getitem__)
+    return best if counts[best] > 0 else ","
+
+
+def iter_csv_rows(
+    path: Path,
+    csv_delimiter: str | None,
+    columns: Iterable[str] | None = None,
+) -> Iterable[Dict[str, str]]:
+    # Auto-detect delimiter unless explicitly provided.
+    delim = (csv_delimiter or "").strip()
+    if not delim:
+        with path.open("rb") as raw:
+            delim = detect_csv_delimiter(raw.read(4096))
+    # Use utf-8-sig to handle BOM-prefixed CSV headers; a large read buffer cuts read calls on long lists.
+    with path.open("r", encoding="utf-8-sig", newline="", buffering=_INPUT_BUFFER_BYTES) as f:
+        if columns is None:
+            yield from csv.DictReader(f, delimiter=delim)
+            return
+
+        # Projected read: only the requested columns are copied out of each row (wide exports
+        # carry dozens of columns we never look at). Columns missing from the header are left
+        # out of the row dict, so `.get()` behaves as with DictReader.
+        reader = csv.reader(f, delimiter=delim)
+        header = next(reader, [])
+        pos = {name: i for i, name in enumerate(header)}
+        picks = [(c, pos[c]) for c in dict.fromkeys(columns) if c in pos]
+        names = [c for c, _ in picks]
+        idxs = [i for _, i in picks]
+        # One C-level fetch of all picked values per full-width row (itemgetter returns a bare value for one index).
+        if len(idxs) > 1:
+            fetch = operator.itemgetter(*idxs)
+        else:
+            fetch = (lambda row, _i=idxs[0]: (row[_i],)) if idxs else (lambda row: ())
+        need = max(idxs, default=-1) + 1
+        for row in reader:
+            if not row:
+                continue  # DictReader skips blank lines too
+            if len(row) >= need:
+                yield dict(zip(names, fetch(row)))
+            else:
+                width = len(row)
+                yield {c: (row[i] if i < width else None) for c, i in picks}
+
+
+def dumps_cell(obj: Any) -> str:
+    # JSON text for a *_json CSV cell; orjson when available (compact separators).
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+class ZeroTokenDetails:
+    __slots__ = ()
+    cached_tokens = 0
+    reasoning_tokens = 0
+
+
+class ZeroUsage:
+    """Usage stand-in for rows that made no API call (local result or error): every count is 0."""
+
+    __slots__ = ()
+    input_tokens = 0
+    output_tokens = 0
+    total_tokens = 0
+    input_tokens_details = ZeroTokenDetails()
+    output_tokens_details = ZeroTokenDetails()
+
+
+ZERO_USAGE = ZeroUsage()
@@ -0,0 +1,29 @@
+"""Environment-variable readers shared by the evaluation CLIs."""
+
+import os
+
+TRUTHY = frozenset({"1", "true", "yes", "on", "y", "t"})
+
+
+def env(name: str) -> str | None:
+    # Unset and blank both mean "use the default".
+    v = os.environ.get(name)
+    if v is None:
+        return None
+    v = v.strip()
+    return v or None
+
+
+def envbool(name: str, default: bool | None = False) -> bool | None:
+    v = env(name)
+    return default if v is None else v.lower() in TRUTHY
+
+
+def envint(name: str, default: int | None = None) -> int | None:
+    v = env(name)
+    return default if v is None else int(v)
+
+
+def envfloat(name: str, default: float | None = None) -> float | None:
+    v = env(name)
+    return default if v is None else float(v)
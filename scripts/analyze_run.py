@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import argparse
 import csv
+import gzip
 import json
+from array import array
 from collections import Counter
 from pathlib import Path
 from statistics import mean, median
+from typing import Any
 
 
 def _pct(n: int, d: int) -> float:
@@ -13,6 +16,10 @@ def _pct(n: int, d: int) -> float:
 
 
 def _parse_int(v) -> int:
+    try:
+        return int(v)
+    except Exception:
+        pass
     try:
         return int(float(v))
     except Exception:
@@ -26,65 +33,109 @@ def _parse_float(v) -> float:
         return 0.0
 
 
+_INT_COLS = (
+    "web_search_calls",
+    "web_search_tool_calls_total",
+    "web_search_calls_query",
+    "web_search_calls_open",
+    "web_search_calls_unknown",
+)
+_FLOAT_COLS = ("cost_usd", "token_cost_usd", "web_search_tool_cost_usd", "duration_seconds")
+
+
+_TEXT_COLS = ("error", "url_citations_json")
+
+
+def _read_columns(p: Path) -> tuple[int, dict[str, Any]]:
+    """Returns (row_count, columns) for the columns we report on, parsed in one pass.
+
+    Uses csv.reader with header positions instead of DictReader: only ~10 of the ~30 output
+    columns are needed, so building a dict per row is wasted work. Missing columns read as empty.
+    Numeric columns are packed arrays (8 bytes per value instead of a boxed int/float per row).
+    """
+    cols: dict[str, Any] = {c: array("q") for c in _INT_COLS}
+    cols.update({c: array("d") for c in _FLOAT_COLS})
+    cols.update({c: [] for c in _TEXT_COLS})
+    opener = gzip.open if p.suffix == ".gz" else open  # evaluate_list --gzip-out
+    with opener(p, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        pos = {name: i for i, name in enumerate(header)}
+        specs = [
+            (cols[c].append, pos.get(c, -1), parse)
+            for names, parse in ((_INT_COLS, _parse_int), (_FLOAT_COLS, _parse_float), (_TEXT_COLS, None))
+            for c in names
+        ]
+        n = 0
+        for row in reader:
+            if not row:
+                continue  # DictReader skips blank lines too
+            n += 1
+            width = len(row)
+            for append, i, parse in specs:
+                v = row[i] if 0 <= i < width else None
+                append(parse(v) if parse is not None else v)
+    return n, cols
+
+
 def main() -> int:
     ap = argparse.ArgumentParser(description="Analyze evaluate_list/run outputs (cost + web-search usage + timing).")
     ap.add_argument("--csv", required=True, help="Path to outputs CSV (e.g. outputs/<run>.csv)")
     args = ap.parse_args()
 
     p = Path(args.csv)
-    rows = list(csv.DictReader(p.open("r", encoding="utf-8", newline="")))
-    n = len(rows)
+    n, cols = _read_columns(p)
     if n == 0:
         print("No rows found.")
         return 2
 
-    web_calls = [_parse_int(r.get("web_search_calls")) for r in rows]
-    tool_total = [_parse_int(r.get("web_search_tool_calls_total")) for r in rows]
-    q = [_parse_int(r.get("web_search_calls_query")) for r in rows]
-    o = [_parse_int(r.get("web_search_calls_open")) for r in rows]
-    u = [_parse_int(r.get("web_search_calls_unknown")) for r in rows]
+    web_calls = cols["web_search_calls"]
+    tool_total = cols["web_search_tool_calls_total"]
+    q = cols["web_search_calls_query"]
+    o = cols["web_search_calls_open"]
+    u = cols["web_search_calls_unknown"]
+    dur = cols["duration_seconds"]
+    sum_web, sum_tool, sum_q, sum_o, sum_u = sum(web_calls), sum(tool_total), sum(q), sum(o), sum(u)
 
     # Prefer query-count as the "billed" number if available; otherwise fall back to web_search_calls.
-    billed = q if any(q) else web_calls
-
-    cost = [_parse_float(r.get("cost_usd")) for r in rows]
-    token_cost = [_parse_float(r.get("token_cost_usd")) for r in rows]
-    ws_cost = [_parse_float(r.get("web_search_tool_cost_usd")) for r in rows]
-    dur = [_parse_float(r.get("duration_seconds")) for r in rows]
+    billed, sum_billed = (q, sum_q) if any(q) else (web_calls, sum_web)
 
-    errors = sum(1 for r in rows if (r.get("error") or "").strip())
+    errors = sum(1 for e in cols["error"] if (e or "").strip())
 
     print(f"rows: {n} (errors: {errors}, ok: {n - errors})")
-    print(f"cost_usd: total={sum(cost):.4f} token={sum(token_cost):.4f} web_search_tool={sum(ws_cost):.4f}")
+    print(
+        f"cost_usd: total={sum(cols['cost_usd']):.4f} token={sum(cols['token_cost_usd']):.4f} "
+        f"web_search_tool={sum(cols['web_search_tool_cost_usd']):.4f}"
+    )
     print(f"duration: total_min={sum(dur)/60:.1f} mean_s={mean(dur):.2f} median_s={median(dur):.2f}")
 
     print("\nWeb search calls (billed estimate):")
-    print(f"- total: {sum(billed)}  mean/row: {sum(billed)/n:.3f}")
+    print(f"- total: {sum_billed}  mean/row: {sum_billed/n:.3f}")
     print(f"- distribution: {dict(sorted(Counter(billed).items()))}")
 
     if any(q):
         print("\nWeb search calls (from CSV column web_search_calls):")
-        print(f"- total: {sum(web_calls)}  mean/row: {sum(web_calls)/n:.3f}")
+        print(f"- total: {sum_web}  mean/row: {sum_web/n:.3f}")
         print(f"- distribution: {dict(sorted(Counter(web_calls).items()))}")
 
     if any(tool_total):
         print("\nWeb search tool calls (total tool invocations):")
-        print(f"- total: {sum(tool_total)}  mean/row: {sum(tool_total)/n:.3f}")
+        print(f"- total: {sum_tool}  mean/row: {sum_tool/n:.3f}")
         print(f"- distribution: {dict(sorted(Counter(tool_total).items()))}")
 
     if any(q) or any(o) or any(u):
         print("\nWeb search tool calls by kind (completed):")
-        print(f"- query:   {sum(q)} (mean/row {sum(q)/n:.3f})")
-        print(f"- open:    {sum(o)} (mean/row {sum(o)/n:.3f})")
-        print(f"- unknown: {sum(u)} (mean/row {sum(u)/n:.3f})")
-        if sum(q) + sum(o) + sum(u) > 0:
-            tot = sum(q) + sum(o) + sum(u)
-            print(f"- share: query={_pct(sum(q), tot):.1f}% open={_pct(sum(o), tot):.1f}% unknown={_pct(sum(u), tot):.1f}%")
+        print(f"- query:   {sum_q} (mean/row {sum_q/n:.3f})")
+        print(f"- open:    {sum_o} (mean/row {sum_o/n:.3f})")
+        print(f"- unknown: {sum_u} (mean/row {sum_u/n:.3f})")
+        if sum_q + sum_o + sum_u > 0:
+            tot = sum_q + sum_o + sum_u
+            print(f"- share: query={_pct(sum_q, tot):.1f}% open={_pct(sum_o, tot):.1f}% unknown={_pct(sum_u, tot):.1f}%")
 
     # Citations (usually empty when output is strict JSON without URLs)
     cites = []
-    for r in rows:
-        s = r.get("url_citations_json") or "[]"
+    for s in cols["url_citations_json"]:
+        s = s or "[]"
         try:
             arr = json.loads(s)
             cites.append(len(arr) if isinstance(arr, list) else 0)
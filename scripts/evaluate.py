@@ -1,49 +1,176 @@
 import argparse
+import asyncio
+import contextlib
+import functools
 import json
 import os
+import re
 import sys
-from typing import Any, Dict
+import time
+from typing import Any, Callable, Dict
+from urllib.parse import urlsplit
 
-from dotenv import load_dotenv
-from shoptech_eval import evaluate_company as core_evaluate_company
-from shoptech_eval import (
-    evaluate_company_with_usage_and_web_search_artifacts,
-    evaluate_company_with_usage_and_web_search_debug,
-)
-from shoptech_eval.costing import compute_cost_usd, compute_web_search_tool_cost_usd, pricing_from_env, web_search_pricing_from_env
-from shoptech_eval.rubric_loader import DEFAULT_RUBRIC_FILE
+from scripts._env import envbool as _envbool, envfloat as _envfloat, envint as _envint
 
+@functools.lru_cache(maxsize=1)
+def _orjson() -> Any:
+    try:
+        import orjson
+    except Exception:  # pragma: no cover (optional speedup)
+        return None
+    return orjson
 
-def _extract_json_text(resp: Any) -> str:
-    # Newer SDKs expose a convenience accessor.
-    if hasattr(resp, "output_text") and isinstance(resp.output_text, str) and resp.output_text.strip():
-        return resp.output_text
 
-    # Fallback: attempt to traverse the structured output.
-    try:
-        parts = []
-        for item in getattr(resp, "output", []) or []:
-            for c in getattr(item, "content", []) or []:
-                t = getattr(c, "text", None)
-                if isinstance(t, str) and t.strip():
-                    parts.append(t)
-        if parts:
-            return "\n".join(parts)
-    except Exception:
-        pass
+_CONFIDENCE_RE = re.compile(r'"confidence"\s*:\s*"(\w+)"')
+
+
+def _write_json(obj: Any, *, pretty: bool) -> None:
+    # One encoded write per result; compact output (the machine-readable case) uses orjson when available.
+    if pretty:
+        data = json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    elif _orjson() is not None:
+        data = _orjson().dumps(obj)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        print(data.decode("utf-8"), flush=True)
+        return
+    sys.stdout.flush()
+    out.write(data + b"\n")
+    out.flush()
+
+
+def _normalize(url: str) -> str:
+    u = url.strip()
+    return u if "://" in u else f"https://{u}"
+
+
+def _host(url: str) -> str:
+    host = urlsplit(_normalize(url)).hostname or url.strip()
+    return host.removeprefix("www.")
+
+
+@functools.lru_cache(maxsize=1024)
+def _disambiguation_prompt(host: str) -> str:
+    # The real domain in the example queries saves the model from filling in a template.
+    return (
+        "Perform TWO distinct web searches before deciding.\n"
+        f"1) Search for direct platform markers tied to {host} (e.g., '{host} Magento', '{host} Shopware', '{host} WooCommerce', '{host} Shopify').\n"
+        f"2) Search a reputable technology profiler for {host} (e.g., 'builtwith {host} ecommerce platform' or 'wappalyzer {host}').\n"
+        "If evidence conflicts or is not clearly about the provided domain, choose unknown with low confidence.\n"
+    )
+
+
+class _AdaptiveLimit:
+    """AIMD cap on in-flight API requests for --batch (each attempt of a URL takes its own slot).
+
+    A 429 halves the cap, at most once per back-off window, and holds new requests for any Retry-After;
+    each request that completes outside the window grows the cap back by one.
+    """
+
+    _WINDOW_SECONDS = 1.0
+
+    def __init__(self, maximum: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maximum = max(1, maximum)
+        self.limit = self.maximum
+        self._clock = clock
+        self._in_flight = 0
+        self._backoff_until = 0.0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
 
-    raise RuntimeError("Could not extract text output from OpenAI response.")
+    async def __aenter__(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        delay = self._resume_at - self._clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __aexit__(self, exc_type: Any, *_exc: Any) -> None:
+        if exc_type is None:
+            self.record(throttled=False)
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def record(self, *, throttled: bool, retry_after: float | None = None) -> None:
+        now = self._clock()
+        if throttled:
+            # Concurrent requests see the same overload; count that burst once.
+            if now >= self._backoff_until:
+                self.limit = max(1, self.limit // 2)
+            wait = retry_after or 0.0
+            self._resume_at = max(self._resume_at, now + wait)
+            self._backoff_until = max(self._backoff_until, now + max(wait, self._WINDOW_SECONDS))
+        elif now >= self._backoff_until and self.limit < self.maximum:
+            self.limit += 1
+
+
+# Stand-in for _AdaptiveLimit outside --batch (nullcontext also works with `async with`).
+_NO_LIMIT = contextlib.nullcontext()
+
+
+# argparse dest -> env var for every boolean flag default.
+_FLAG_ENV = {
+    "prompt_cache": "SHOPTECH_PROMPT_CACHE",
+    "flex_fallback_to_auto": "SHOPTECH_FLEX_FALLBACK_TO_AUTO",
+    "debug_web_search": "SHOPTECH_DEBUG_WEB_SEARCH",
+    "second_query_on_uncertainty": "SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY",
+    "retry_disambiguation_on_low_confidence": "SHOPTECH_RETRY_DISAMBIGUATION_ON_LOW_CONFIDENCE",
+    "use_batch_api": "SHOPTECH_USE_BATCH_API",
+    "cache_by_site": "SHOPTECH_CACHE_BY_SITE",
+    "no_cache": "SHOPTECH_CACHE_DISABLE",
+}
+# Flags whose unset env means "decide automatically" (None) rather than off.
+_TRISTATE_FLAGS = frozenset({"prompt_cache"})
 
 
 def main() -> int:
+    from dotenv import load_dotenv
+
     load_dotenv(override=False)
-    if hasattr(sys.stdout, "reconfigure"):
-        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
-    if hasattr(sys.stderr, "reconfigure"):
-        sys.stderr.reconfigure(encoding="utf-8", errors="replace")
+    # Already-UTF-8 streams (the norm on Linux/macOS) are left alone; reconfigure flushes the stream.
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure") and (stream.encoding or "").lower().replace("-", "") != "utf8":
+            stream.reconfigure(encoding="utf-8", errors="replace")
+
+    # Read after load_dotenv so .env values count.
+    flags = {k: _envbool(env, None if k in _TRISTATE_FLAGS else False) for k, env in _FLAG_ENV.items()}
 
     parser = argparse.ArgumentParser(description="Single-call SHOPTECH platform detector (URL -> ecommerce platform).")
-    parser.add_argument("url", help="Shop website URL (e.g., https://example.com)")
+    parser.add_argument("url", nargs="?", help="Shop website URL (e.g., https://example.com). Omit with --batch.")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Evaluate many URLs (one per line on stdin, or --urls-file) concurrently; prints one JSON line per URL.",
+    )
+    parser.add_argument("--urls-file", default=None, help="With --batch: read URLs from this file instead of stdin.")
+    parser.add_argument(
+        "--pretty",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Indent JSON output. Default: on for a single URL, off (one compact line per URL) with --batch.",
+    )
+    parser.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        default=flags["use_batch_api"],
+        help=(
+            "With --batch: submit all URLs as one OpenAI Batch API job (about half the token price, up to 24h turnaround) "
+            "instead of live calls. Cached URLs (--cache-dir) are not resubmitted. The low-confidence retry is not applied. Env: SHOPTECH_USE_BATCH_API=1"
+        ),
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=_envint("SHOPTECH_CONCURRENCY", 20),
+        help=(
+            "With --batch: max API requests in flight (a URL's speculative retry counts separately); "
+            "halved on HTTP 429s, honouring Retry-After, then grown back. Default: 20. Env: SHOPTECH_CONCURRENCY"
+        ),
+    )
     parser.add_argument(
         "--model",
         default=os.environ.get("OPENAI_MODEL", "gpt-4.1-mini"),
@@ -51,13 +178,13 @@ def main() -> int:
     )
     parser.add_argument(
         "--rubric-file",
-        default=os.environ.get("SHOPTECH_RUBRIC_FILE", str(DEFAULT_RUBRIC_FILE)),
-        help="Path to rubric file (default: env SHOPTECH_RUBRIC_FILE or the default rubric)",
+        default=os.environ.get("SHOPTECH_RUBRIC_FILE") or None,
+        help="Path to rubric file (default: env SHOPTECH_RUBRIC_FILE or rubrics/shop_platform_rubric_v1.md)",
     )
     parser.add_argument(
         "--max-tool-calls",
         type=int,
-        default=int(os.environ["SHOPTECH_MAX_TOOL_CALLS"]) if os.environ.get("SHOPTECH_MAX_TOOL_CALLS") else None,
+        default=_envint("SHOPTECH_MAX_TOOL_CALLS"),
         help="Optional cap on tool calls (web searches) within the single LLM call. Env: SHOPTECH_MAX_TOOL_CALLS",
     )
     parser.add_argument(
@@ -68,8 +195,17 @@ def main() -> int:
     parser.add_argument(
         "--prompt-cache",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_PROMPT_CACHE", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
-        help="Enable prompt caching for repeated static input (rubric + system prompt). Env: SHOPTECH_PROMPT_CACHE=1",
+        default=flags["prompt_cache"],
+        help=(
+            "Enable prompt caching for repeated static input (rubric + system prompt). "
+            "Default: on when the prompt prefix is large enough to be cached. Env: SHOPTECH_PROMPT_CACHE=1/0"
+        ),
+    )
+    parser.add_argument(
+        "--no-prompt-cache",
+        dest="prompt_cache",
+        action="store_false",
+        help="Disable prompt caching (overrides the default/env).",
     )
     parser.add_argument(
         "--prompt-cache-retention",
@@ -84,19 +220,19 @@ def main() -> int:
     parser.add_argument(
         "--timeout-seconds",
         type=float,
-        default=float(os.environ["SHOPTECH_OPENAI_TIMEOUT_SECONDS"]) if os.environ.get("SHOPTECH_OPENAI_TIMEOUT_SECONDS") else None,
+        default=_envfloat("SHOPTECH_OPENAI_TIMEOUT_SECONDS"),
         help="Request timeout in seconds. For flex, you may want ~900s. Env: SHOPTECH_OPENAI_TIMEOUT_SECONDS",
     )
     parser.add_argument(
         "--flex-max-retries",
         type=int,
-        default=int(os.environ.get("SHOPTECH_FLEX_MAX_RETRIES", "5")),
+        default=_envint("SHOPTECH_FLEX_MAX_RETRIES", 5),
         help="Retries (with exponential backoff) on 429 Resource Unavailable when service-tier is flex. Env: SHOPTECH_FLEX_MAX_RETRIES",
     )
     parser.add_argument(
         "--flex-fallback-to-auto",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_FLEX_FALLBACK_TO_AUTO", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=flags["flex_fallback_to_auto"],
         help="If flex is unavailable after retries, retry once with standard processing (auto). Env: SHOPTECH_FLEX_FALLBACK_TO_AUTO=1",
     )
     parser.add_argument(
@@ -107,46 +243,110 @@ def main() -> int:
     parser.add_argument(
         "--debug-web-search",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_DEBUG_WEB_SEARCH", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=flags["debug_web_search"],
         help="Print debug info about web_search_call items to stderr. Env: SHOPTECH_DEBUG_WEB_SEARCH=1",
     )
     parser.add_argument(
         "--second-query-on-uncertainty",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=flags["second_query_on_uncertainty"],
         help="Allow a second web-search query only for ambiguous/low-confidence cases (does not force it). Env: SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY=1",
     )
     parser.add_argument(
         "--retry-disambiguation-on-low-confidence",
         action="store_true",
-        default=(
-            os.environ.get("SHOPTECH_RETRY_DISAMBIGUATION_ON_LOW_CONFIDENCE", "").strip()
-            in ("1", "true", "TRUE", "yes", "YES")
-        ),
+        default=flags["retry_disambiguation_on_low_confidence"],
         help=(
             "If the model returns confidence=low, re-run the evaluation once with stronger disambiguation instructions. "
-            "This is a second model call (extra tokens + extra web-search queries if used). "
+            "This is a second model call (extra tokens + extra web-search queries if used); it is started in parallel "
+            "with the first call and cancelled if the first answer is not low-confidence. "
             "Env: SHOPTECH_RETRY_DISAMBIGUATION_ON_LOW_CONFIDENCE=1"
         ),
     )
     parser.add_argument(
         "--retry-max-tool-calls",
         type=int,
-        default=int(os.environ.get("SHOPTECH_RETRY_MAX_TOOL_CALLS", "3") or 3),
+        default=_envint("SHOPTECH_RETRY_MAX_TOOL_CALLS", 3),
         help="max_tool_calls to use for the retry call (if retry is triggered). Default: 3. Env: SHOPTECH_RETRY_MAX_TOOL_CALLS",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.environ.get("SHOPTECH_CACHE_DIR") or None,
+        help=(
+            "Persist results on disk and reuse them for identical requests (same URL, model, rubric and prompt settings). "
+            "Off unless set. Env: SHOPTECH_CACHE_DIR"
+        ),
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=_envfloat("SHOPTECH_CACHE_TTL_DAYS", 14.0),
+        help="Days a cached result stays valid. Default: 14. Env: SHOPTECH_CACHE_TTL_DAYS",
+    )
+    parser.add_argument(
+        "--cache-by-site",
+        action="store_true",
+        default=flags["cache_by_site"],
+        help=(
+            "With --cache-dir: reuse a cached result for any URL variant of the same site "
+            "(scheme, www., path and query ignored; other subdomains stay separate). Env: SHOPTECH_CACHE_BY_SITE=1"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=flags["no_cache"],
+        help="Ignore --cache-dir/SHOPTECH_CACHE_DIR for this run. Env: SHOPTECH_CACHE_DISABLE=1",
+    )
     args = parser.parse_args()
+    if not args.batch and not args.url:
+        parser.error("url is required unless --batch is given")
 
     if not os.environ.get("OPENAI_API_KEY"):
         print("Missing OPENAI_API_KEY env var.", file=sys.stderr)
         return 2
 
+    # Deferred so `--help`, argument errors and the missing-key exit return without loading openai + pydantic.
+    from shoptech_eval import (
+        NullCache,
+        aevaluate_company_with_usage_and_web_search_debug,
+        evaluate_company_with_usage_and_web_search_artifacts,
+        evaluate_company_with_usage_and_web_search_debug,
+        new_async_client,
+    )
+    from shoptech_eval.costing import (
+        compute_cost_usd,
+        compute_web_search_tool_cost_usd,
+        pricing_from_env,
+        web_search_pricing_from_env,
+    )
+    from shoptech_eval.openai_batch import evaluate_companies_batch
+    from shoptech_eval.result_cache import DiskCache
+    from shoptech_eval.rubric_loader import load_rubric_text
+
+    # The retry shares the system prompt + fixed instructions with attempt 1; keep that prefix cached
+    # (retention defaults to 24h) unless prompt caching was explicitly disabled.
+    if args.retry_disambiguation_on_low_confidence and args.prompt_cache is None:
+        args.prompt_cache = True
+
+    # Read the rubric once up front: both attempts reuse the cached text/hash, and a bad path fails before any API call.
+    try:
+        load_rubric_text(args.rubric_file)
+    except (OSError, ValueError) as e:
+        print(f"Cannot load rubric: {e}", file=sys.stderr)
+        return 2
+
     # Flex can be slower; default to a larger timeout if not set explicitly.
     timeout_seconds = args.timeout_seconds
     if timeout_seconds is None and (args.service_tier or "").strip().lower() == "flex":
         timeout_seconds = 900.0
 
+    result_cache = NullCache()
+    if args.cache_dir and not args.no_cache:
+        result_cache = DiskCache(args.cache_dir, default_ttl=float(args.cache_ttl_days) * 86400.0)
+
     def _do_eval_once(
+        url: str,
         *,
         max_tool_calls: int | None,
         extra_user_instructions: str | None,
@@ -155,7 +355,7 @@ def main() -> int:
     ) -> Dict[str, Any]:
         if use_debug:
             res, use, ws = evaluate_company_with_usage_and_web_search_debug(
-                args.url,
+                url,
                 args.model,
                 rubric_file=args.rubric_file,
                 max_tool_calls=max_tool_calls,
@@ -169,13 +369,15 @@ def main() -> int:
                 include_sources=False,
                 extra_user_instructions=extra_user_instructions,
                 second_query_on_uncertainty=second_query_on_uncertainty,
+                result_cache=result_cache,
+                cache_by_site=bool(args.cache_by_site),
             )
             by_kind_completed = ws.get("by_kind_completed") or {}
             billed_q = int(by_kind_completed.get("query", 0) or 0)
             return {"result": res, "usage": use, "ws_debug": ws, "web_search_calls": billed_q}
 
         res, use, billed_q, _citations = evaluate_company_with_usage_and_web_search_artifacts(
-            args.url,
+            url,
             args.model,
             rubric_file=args.rubric_file,
             max_tool_calls=max_tool_calls,
@@ -187,68 +389,286 @@ def main() -> int:
             flex_max_retries=args.flex_max_retries,
             flex_fallback_to_auto=args.flex_fallback_to_auto,
             second_query_on_uncertainty=second_query_on_uncertainty,
+            result_cache=result_cache,
+            cache_by_site=bool(args.cache_by_site),
         )
         return {"result": res, "usage": use, "ws_debug": None, "web_search_calls": int(billed_q)}
 
-    # Attempt 1
-    a1 = _do_eval_once(
-        max_tool_calls=args.max_tool_calls,
-        extra_user_instructions=None,
-        second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
-        use_debug=bool(args.debug_web_search),
-    )
-    attempts = [a1]
-    selected = a1
-
-    # Optional retry on confidence=low
-    conf1 = str((a1.get("result") or {}).get("confidence") or "").strip().lower()
-    if args.retry_disambiguation_on_low_confidence and conf1 == "low":
-        retry_max = int(args.retry_max_tool_calls)
-        if args.max_tool_calls is not None:
-            retry_max = max(int(args.max_tool_calls), retry_max)
-        disambig_prompt = (
-            "Perform TWO distinct web searches before deciding.\n"
-            "1) Search for direct platform markers tied to the provided domain (e.g., '<domain> Magento', '<domain> Shopware', '<domain> WooCommerce', '<domain> Shopify').\n"
-            "2) Search a reputable technology profiler for the domain (e.g., 'builtwith <domain> ecommerce platform' or 'wappalyzer <domain>').\n"
-            "If evidence conflicts or is not clearly about the provided domain, choose unknown with low confidence.\n"
-        )
-        a2 = _do_eval_once(
-            max_tool_calls=retry_max,
-            extra_user_instructions=disambig_prompt,
-            second_query_on_uncertainty=False,
-            # Retry needs debug mode to inject extra instructions.
-            use_debug=True,
+    async def _do_eval_once_async(
+        client: Any,
+        url: str,
+        *,
+        max_tool_calls: int | None,
+        extra_user_instructions: str | None,
+        second_query_on_uncertainty: bool,
+        on_text_delta: Callable[[str], None] | None = None,
+        limit: Any = _NO_LIMIT,
+    ) -> Dict[str, Any]:
+        async with limit:
+            res, use, ws = await aevaluate_company_with_usage_and_web_search_debug(
+                url,
+                args.model,
+                client=client,
+                rubric_file=args.rubric_file,
+                max_tool_calls=max_tool_calls,
+                reasoning_effort=args.reasoning_effort,
+                prompt_cache=args.prompt_cache,
+                prompt_cache_retention=args.prompt_cache_retention,
+                service_tier=args.service_tier,
+                timeout_seconds=timeout_seconds,
+                flex_max_retries=args.flex_max_retries,
+                flex_fallback_to_auto=args.flex_fallback_to_auto,
+                include_sources=False,
+                extra_user_instructions=extra_user_instructions,
+                second_query_on_uncertainty=second_query_on_uncertainty,
+                result_cache=result_cache,
+                cache_by_site=bool(args.cache_by_site),
+                stream=on_text_delta is not None,
+                on_text_delta=on_text_delta,
+            )
+        by_kind_completed = ws.get("by_kind_completed") or {}
+        billed_q = int(by_kind_completed.get("query", 0) or 0)
+        return {"result": res, "usage": use, "ws_debug": ws, "web_search_calls": billed_q}
+
+    def _confidence(a: Dict[str, Any]) -> str:
+        return str((a.get("result") or {}).get("confidence") or "").strip().lower()
+
+    retry_max = int(args.retry_max_tool_calls)
+    if args.max_tool_calls is not None:
+        retry_max = max(int(args.max_tool_calls), retry_max)
+
+    async def _attempts_async(client: Any, url: str, limit: Any = _NO_LIMIT) -> list[Dict[str, Any]]:
+        if not args.retry_disambiguation_on_low_confidence:
+            return [
+                await _do_eval_once_async(
+                    client,
+                    url,
+                    max_tool_calls=args.max_tool_calls,
+                    extra_user_instructions=None,
+                    second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
+                    limit=limit,
+                )
+            ]
+
+        # Optional retry on confidence=low: started speculatively alongside attempt 1 so the
+        # low-confidence path costs one round trip instead of two; discarded otherwise.
+        t2 = asyncio.create_task(
+            _do_eval_once_async(
+                client,
+                url,
+                max_tool_calls=retry_max,
+                extra_user_instructions=_disambiguation_prompt(_host(url)),
+                second_query_on_uncertainty=False,
+                limit=limit,
+            )
         )
-        attempts.append(a2)
-        conf2 = str((a2.get("result") or {}).get("confidence") or "").strip().lower()
-        if conf2 and conf2 != "low":
-            selected = a2
 
-    result = selected["result"]
-    usage = selected["usage"]
-    web_search_calls = sum(int(a.get("web_search_calls", 0) or 0) for a in attempts)
+        # Attempt 1 streams its JSON; `confidence` precedes the long `reasoning` field, so a
+        # non-low answer cancels the speculative retry before attempt 1 has finished generating.
+        streamed: str | None = ""
 
-    if args.debug_web_search:
+        def _on_delta(delta: str) -> None:
+            nonlocal streamed
+            if streamed is None or t2.done():
+                return  # already decided
+            streamed += delta
+            m = _CONFIDENCE_RE.search(streamed)
+            if m is not None:
+                streamed = None
+                if m.group(1).lower() != "low":
+                    t2.cancel()
+
+        try:
+            a1 = await _do_eval_once_async(
+                client,
+                url,
+                max_tool_calls=args.max_tool_calls,
+                extra_user_instructions=None,
+                second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
+                on_text_delta=_on_delta,
+                limit=limit,
+            )
+        except BaseException:
+            t2.cancel()
+            await asyncio.gather(t2, return_exceptions=True)
+            raise
+        if _confidence(a1) != "low":
+            t2.cancel()
+            (a2,) = await asyncio.gather(t2, return_exceptions=True)
+            if isinstance(a2, dict):
+                # The retry finished before the cancel landed: unused, but billed, so keep it for costing.
+                return [a1, {**a2, "discarded": True}]
+            # Usage only arrives with the final response event, so an in-flight retry's spend is unknown.
+            a1["speculative_cancelled"] = True
+            return [a1]
+        return [a1, await t2]
+
+    def _log_cache_reuse(url: str, attempts: list[Dict[str, Any]]) -> None:
+        # Site-level hits may come from another URL variant; say which one for auditability.
+        for a in attempts:
+            cached_url = str((a.get("result") or {}).get("input_url") or "")
+            if (a.get("ws_debug") or {}).get("cache_hit") and cached_url.rstrip("/") != _normalize(url).rstrip("/"):
+                print(f"cache: reused result for {cached_url} (requested {url})", file=sys.stderr)
+
+    def _select(attempts: list[Dict[str, Any]]) -> Dict[str, Any]:
+        if len(attempts) > 1 and not attempts[1].get("discarded"):
+            conf2 = _confidence(attempts[1])
+            if conf2 and conf2 != "low":
+                return attempts[1]
+        return attempts[0]
+
+    def _print_debug(selected: Dict[str, Any], prefix: str = "") -> None:
         ws_debug = selected.get("ws_debug") or {}
         citations = ws_debug.get("url_citations") or []
-        print(f"web_search_debug={json.dumps(ws_debug, ensure_ascii=False)}", file=sys.stderr)
-        print(f"url_citations={json.dumps(citations, ensure_ascii=False)}", file=sys.stderr)
-    if not args.no_cost:
-        pricing = pricing_from_env(os.environ)
-        token_cost_raw = sum(compute_cost_usd(a["usage"], pricing) for a in attempts)
-        flex_discount = float(os.environ.get("SHOPTECH_FLEX_TOKEN_DISCOUNT", "0.5") or 0.5)
-        token_cost = (token_cost_raw * flex_discount) if (args.service_tier or "").strip().lower() == "flex" else token_cost_raw
-        tool_pricing = web_search_pricing_from_env(os.environ)
+        print(f"{prefix}web_search_debug={json.dumps(ws_debug, ensure_ascii=False)}", file=sys.stderr)
+        print(f"{prefix}url_citations={json.dumps(citations, ensure_ascii=False)}", file=sys.stderr)
+
+    # Pricing only depends on env (loaded above), so resolve it once per run.
+    pricing = pricing_from_env(os.environ)
+    tool_pricing = web_search_pricing_from_env(os.environ)
+    if args.batch and args.use_batch_api:
+        token_discount = _envfloat("SHOPTECH_BATCH_TOKEN_DISCOUNT", 0.5)
+    elif (args.service_tier or "").strip().lower() == "flex":
+        token_discount = _envfloat("SHOPTECH_FLEX_TOKEN_DISCOUNT", 0.5)
+    else:
+        token_discount = 1.0
+
+    def _print_cost(attempts: list[Dict[str, Any]], extra: str = "") -> None:
+        token_cost_raw = 0.0
+        web_search_calls = input_total = output_total = cached_total = billed = 0
+        for a in attempts:
+            # Results replayed from the disk cache cost nothing this run.
+            if (a.get("ws_debug") or {}).get("cache_hit"):
+                continue
+            u = a["usage"]
+            billed += 1
+            token_cost_raw += compute_cost_usd(u, pricing)
+            web_search_calls += int(a.get("web_search_calls", 0) or 0)
+            input_total += int(u.input_tokens)
+            output_total += int(u.output_tokens)
+            cached_total += int(getattr(getattr(u, "input_tokens_details", None), "cached_tokens", 0) or 0)
+        token_cost = token_cost_raw * token_discount
         web_search_cost = compute_web_search_tool_cost_usd(web_search_calls, tool_pricing)
         cost = token_cost + web_search_cost
-        input_total = sum(int(a["usage"].input_tokens) for a in attempts)
-        output_total = sum(int(a["usage"].output_tokens) for a in attempts)
-        cached_total = sum(int(getattr(getattr(a["usage"], "input_tokens_details", None), "cached_tokens", 0) or 0) for a in attempts)
+        cancelled = sum(1 for a in attempts if a.get("speculative_cancelled"))
+        if cancelled:
+            extra += f", excludes_cancelled_speculative_retries={cancelled}"
         print(
-            f"Estimated cost_usd={cost:.6f} (service_tier={args.service_tier}, tokens={token_cost:.6f}, web_search_calls={web_search_calls}, web_search_tool_cost={web_search_cost:.6f}, input={input_total}, cached={cached_total}, output={output_total}, attempts={len(attempts)})",
+            f"Estimated cost_usd={cost:.6f} (service_tier={args.service_tier}, tokens={token_cost:.6f}, web_search_calls={web_search_calls}, web_search_tool_cost={web_search_cost:.6f}, input={input_total}, cached={cached_total}, output={output_total}, attempts={len(attempts)}, cached_results={len(attempts) - billed}{extra})",
             file=sys.stderr,
         )
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    async def _run_batch(urls: list[str]) -> int:
+        """Evaluate `urls` concurrently on one shared AsyncOpenAI client; one JSON line per URL, in completion order."""
+        limit = _AdaptiveLimit(int(args.concurrency))
+        # Every 429 counts, including the ones the SDK retries internally on the default tier.
+        client = new_async_client(on_rate_limited=lambda retry_after: limit.record(throttled=True, retry_after=retry_after))
+
+        async def _one(url: str) -> tuple[str, Any]:
+            try:
+                return url, await _attempts_async(client, url, limit)
+            except Exception as e:
+                return url, e
+
+        all_attempts: list[Dict[str, Any]] = []
+        errors = 0
+        try:
+            for fut in asyncio.as_completed([asyncio.create_task(_one(u)) for u in urls]):
+                url, out = await fut
+                if isinstance(out, Exception):
+                    errors += 1
+                    line: Dict[str, Any] = {"input_url": url, "error": f"{type(out).__name__}: {out}"}
+                else:
+                    all_attempts.extend(out)
+                    _log_cache_reuse(url, out)
+                    selected = _select(out)
+                    if args.debug_web_search:
+                        _print_debug(selected, prefix=f"[{url}] ")
+                    line = selected["result"]
+                _write_json(line, pretty=bool(args.pretty))
+        finally:
+            await client.close()
+
+        if not args.no_cost:
+            _print_cost(all_attempts, f", urls={len(urls)}, errors={errors}")
+        return 1 if errors else 0
+
+    def _run_batch_api(urls: list[str]) -> int:
+        """Evaluate `urls` as one Batch API job; one JSON line per URL, in input order."""
+        triples = evaluate_companies_batch(
+            urls,
+            args.model,
+            rubric_file=args.rubric_file,
+            max_tool_calls=args.max_tool_calls,
+            reasoning_effort=args.reasoning_effort,
+            prompt_cache=args.prompt_cache,
+            prompt_cache_retention=args.prompt_cache_retention,
+            second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
+            result_cache=result_cache,
+            cache_by_site=bool(args.cache_by_site),
+            return_exceptions=True,
+        )
+        all_attempts: list[Dict[str, Any]] = []
+        errors = 0
+        for url, out in zip(urls, triples):
+            if isinstance(out, Exception):
+                errors += 1
+                line: Dict[str, Any] = {"input_url": url, "error": f"{type(out).__name__}: {out}"}
+            else:
+                res, use, ws = out
+                by_kind_completed = ws.get("by_kind_completed") or {}
+                attempt = {"result": res, "usage": use, "ws_debug": ws, "web_search_calls": int(by_kind_completed.get("query", 0) or 0)}
+                all_attempts.append(attempt)
+                _log_cache_reuse(url, [attempt])
+                if args.debug_web_search:
+                    _print_debug(attempt, prefix=f"[{url}] ")
+                line = res
+            _write_json(line, pretty=bool(args.pretty))
+
+        if not args.no_cost:
+            _print_cost(all_attempts, f", urls={len(urls)}, errors={errors}, batch_api=1")
+        return 1 if errors else 0
+
+    if args.batch:
+        if args.urls_file:
+            with open(args.urls_file, "r", encoding="utf-8") as f:
+                urls = [line.strip() for line in f if line.strip()]
+        else:
+            urls = [line.strip() for line in sys.stdin if line.strip()]
+        if args.use_batch_api:
+            return _run_batch_api(urls)
+        return asyncio.run(_run_batch(urls))
+
+    if args.retry_disambiguation_on_low_confidence:
+
+        async def _single() -> list[Dict[str, Any]]:
+            client = new_async_client()
+            try:
+                return await _attempts_async(client, args.url)
+            finally:
+                await client.close()
+
+        attempts = asyncio.run(_single())
+    else:
+        # Attempt 1 only
+        attempts = [
+            _do_eval_once(
+                args.url,
+                max_tool_calls=args.max_tool_calls,
+                extra_user_instructions=None,
+                second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
+                # Debug stats carry the cache_hit marker; cached entries hold them anyway.
+                use_debug=bool(args.debug_web_search) or not isinstance(result_cache, NullCache),
+            )
+        ]
+    _log_cache_reuse(args.url, attempts)
+    selected = _select(attempts)
+
+    if args.debug_web_search:
+        _print_debug(selected)
+    if not args.no_cost:
+        _print_cost(attempts)
+    _write_json(selected["result"], pretty=args.pretty is not False)
     return 0
 
 
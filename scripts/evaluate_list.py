@@ -1,16 +1,24 @@
 import argparse
 import csv
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
 import json
+import operator
 import os
-import random
+import queue
+import re
+import sqlite3
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
-from urllib.parse import urlparse
+from typing import Any, Container, Dict, Iterable, Iterator, List, Tuple
 
 from dotenv import load_dotenv
 from shoptech_eval import (
@@ -21,32 +29,39 @@ from shoptech_eval.local_detector import detect_platform_local
 from shoptech_eval.shop_functionality import detect_shop_functionality
 from shoptech_eval.playwright_cart_check import detect_shop_functionality_playwright
 from shoptech_eval.costing import (
-    compute_cost_usd,
+    compute_cost_usd_batch,
     compute_web_search_tool_cost_usd,
     pricing_from_env,
     web_search_pricing_from_env,
 )
 from shoptech_eval.rubric_loader import DEFAULT_RUBRIC_FILE
 
+from scripts._common import (
+    ZERO_USAGE as _ZERO_USAGE,
+    dumps_cell as _dumps_cell,
+    dumps_line as _dumps_line,
+    iter_csv_rows as _iter_csv_rows,
+)
+from scripts._env import env as _env, envbool as _envbool, envfloat as _envfloat, envint as _envint
+
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover (optional speedup)
+    _orjson = None
+
 
 def _run_stamp() -> str:
     # Filesystem-friendly local timestamp.
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 
+_SLUG_SPACE_RE = re.compile(r"\s")
+_SLUG_DROP_RE = re.compile(r"[^\w-]")
+
+
 def _suffix_slug(s: str) -> str:
-    s = (s or "").strip()
-    if not s:
-        return ""
-    # Keep it filename-friendly.
-    safe = []
-    for ch in s:
-        if ch.isalnum() or ch in ("-", "_"):
-            safe.append(ch)
-        elif ch.isspace():
-            safe.append("_")
-    out = "".join(safe).strip("_")
-    return out
+    # Keep it filename-friendly: whitespace becomes "_", anything but letters/digits/-/_ is dropped.
+    return _SLUG_DROP_RE.sub("", _SLUG_SPACE_RE.sub("_", (s or "").strip())).strip("_")
 
 
 def _is_probably_url_list_file(path: Path) -> bool:
@@ -55,26 +70,25 @@ def _is_probably_url_list_file(path: Path) -> bool:
     return suffix in {".txt", ".list", ".urls"}
 
 
+_SCHEME_RE = re.compile(r"^https?://", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=200_000)
 def _normalize_for_dedupe(url: str) -> str:
     u = (url or "").strip()
     if not u:
         return ""
-    # Strip scheme and trailing slash; keep path/query as-is (so distinct URLs stay distinct).
-    if u.lower().startswith(("http://", "https://")):
-        try:
-            pu = urlparse(u)
-            u = pu.netloc + (pu.path or "")
-            if pu.query:
-                u += "?" + pu.query
-        except Exception:
-            u = u
-    u = u.strip().rstrip("/")
-    return u.lower()
-
-
-def _load_url_list(path: Path) -> List[Dict[str, str]]:
-    # Returns rows shaped like DictReader rows for downstream compatibility.
-    rows: List[Dict[str, str]] = []
+    # Strip scheme (and fragment) and trailing slash; keep path/query as-is (so distinct URLs stay distinct).
+    m = _SCHEME_RE.match(u)
+    if m:
+        u = u[m.end():].partition("#")[0].strip()
+        if u.endswith("?"):
+            u = u[:-1]  # empty query
+    return u.rstrip("/").lower()
+
+
+def _iter_url_list(path: Path) -> Iterable[Dict[str, str]]:
+    # Yields rows shaped like DictReader rows for downstream compatibility.
     with path.open("r", encoding="utf-8", errors="replace") as f:
         for line in f:
             s = line.strip()
@@ -83,111 +97,397 @@ def _load_url_list(path: Path) -> List[Dict[str, str]]:
             # Support "url<TAB>name" lines (our sampled URL list format).
             if "\t" in s:
                 url, name = s.split("\t", 1)
-                rows.append({"Website": url.strip(), "Name": name.strip()})
+                yield {"Website": url.strip(), "Name": name.strip()}
             else:
-                rows.append({"Website": s})
-    return rows
-
+                yield {"Website": s}
 
-def _load_csv_rows(path: Path) -> List[Dict[str, str]]:
-    # Materialize all rows (OK for smaller files).
-    return list(_iter_csv_rows(path, csv_delimiter=None))
 
+_PARQUET_BATCH_ROWS = 8192
 
-def _detect_csv_delimiter(sample: str) -> str:
-    # Prefer using the header line only (data lines may contain lots of commas inside fields).
-    header = ""
-    for line in (sample or "").splitlines():
-        if line.strip():
-            header = line
-            break
 
-    # Heuristic: pick the delimiter with the highest count in the header.
-    if header:
-        counts = {d: header.count(d) for d in [",", ";", "\t", "|"]}
-        best = max(counts.items(), key=lambda kv: kv[1])[0]
-        if counts[best] > 0:
-            return best
-
-    # Best-effort: try Sniffer as a fallback.
+def _import_pyarrow_parquet() -> Any:
+    # Optional dependency, only needed for parquet input/caching.
     try:
-        dialect = csv.Sniffer().sniff(sample, delimiters=[",", ";", "\t", "|"])
-        if getattr(dialect, "delimiter", None):
-            return dialect.delimiter
-    except Exception:
-        pass
-
-    return ","
-
-
-def _iter_csv_rows(path: Path, csv_delimiter: str | None) -> Iterable[Dict[str, str]]:
-    # Use utf-8-sig to handle BOM-prefixed CSV headers.
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-        # Auto-detect delimiter unless explicitly provided.
-        delim = (csv_delimiter or "").strip()
-        if not delim:
-            head = f.read(4096)
-            f.seek(0)
-            delim = _detect_csv_delimiter(head)
-        reader = csv.DictReader(f, delimiter=delim)
-        for r in reader:
-            yield r
-
-
-def _load_rows(
-    input_path: Path,
-    *,
-    input_format: str | None,
-) -> List[Dict[str, str]]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise SystemExit("Parquet input/caching requires the optional pyarrow package (pip install pyarrow).") from e
+    return pa, pq
+
+
+def _iter_parquet_rows(path: Path, columns: Iterable[str] | None = None) -> Iterable[Dict[str, str]]:
+    # Column-pruned batch reads; values come back as str (None for nulls) like the CSV reader.
+    _pa, pq = _import_pyarrow_parquet()
+    pf = pq.ParquetFile(str(path))
+    names = set(pf.schema_arrow.names)
+    cols = None if columns is None else [c for c in dict.fromkeys(columns) if c in names]
+    for batch in pf.iter_batches(batch_size=_PARQUET_BATCH_ROWS, columns=cols):
+        for row in batch.to_pylist():
+            yield {k: (v if v is None or isinstance(v, str) else str(v)) for k, v in row.items()}
+
+
+def _write_parquet_rows(rows: Iterable[Dict[str, str]], path: Path, columns: Iterable[str]) -> int:
+    # All columns are stored as (nullable) strings; rows missing a column get null.
+    pa, pq = _import_pyarrow_parquet()
+    schema = pa.schema([(c, pa.string()) for c in dict.fromkeys(columns)])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    it = iter(rows)
+    n = 0
+    with pq.ParquetWriter(str(path), schema, compression="zstd") as w:
+        for chunk in iter(lambda: list(itertools.islice(it, _PARQUET_BATCH_ROWS)), []):
+            w.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            n += len(chunk)
+    return n
+
+
+def _resolve_input_format(input_path: Path, input_format: str | None) -> str:
     fmt = (input_format or "auto").strip().lower()
-    if fmt not in {"auto", "csv", "txt"}:
-        raise SystemExit(f"Unsupported --input-format {input_format!r}. Use: auto/csv/txt.")
+    if fmt not in {"auto", "csv", "txt", "parquet"}:
+        raise SystemExit(f"Unsupported --input-format {input_format!r}. Use: auto/csv/txt/parquet.")
 
     if fmt == "auto":
-        fmt = "txt" if _is_probably_url_list_file(input_path) else "csv"
-
-    if fmt == "txt":
-        return _load_url_list(input_path)
-    return _load_csv_rows(input_path)
+        if input_path.suffix.lower() in {".parquet", ".pq"}:
+            return "parquet"
+        return "txt" if _is_probably_url_list_file(input_path) else "csv"
+    return fmt
 
 
 def _iter_rows(
     input_path: Path,
     *,
     input_format: str | None,
-    csv_delimiter: str | None,
+    csv_delimiter: str | None = None,
+    columns: Iterable[str] | None = None,
 ) -> Iterable[Dict[str, str]]:
-    fmt = (input_format or "auto").strip().lower()
-    if fmt not in {"auto", "csv", "txt"}:
-        raise SystemExit(f"Unsupported --input-format {input_format!r}. Use: auto/csv/txt.")
+    # Single streaming entry point for every input format; callers list() it if they need to.
+    fmt = _resolve_input_format(input_path, input_format)
+    if fmt == "txt":
+        return _iter_url_list(input_path)
+    if fmt == "parquet":
+        return _iter_parquet_rows(input_path, columns=columns)
+    return _iter_csv_rows(input_path, csv_delimiter=csv_delimiter, columns=columns)
 
-    if fmt == "auto":
-        fmt = "txt" if _is_probably_url_list_file(input_path) else "csv"
 
-    if fmt == "txt":
-        return _load_url_list(input_path)
-    return _iter_csv_rows(input_path, csv_delimiter=csv_delimiter)
+def _is_gzip_file(path: Path) -> bool:
+    with path.open("rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+# Plain output files get a large buffer; _BackgroundWriter decides when to flush.
+_OUTPUT_BUFFER_BYTES = 1 << 20
+
+
+def _open_output(path: Path, mode: str, *, gz: bool) -> Any:
+    # mode: "w"/"a" (+ "b" for bytes). gzip uses level 1: the output is written row by row and
+    # flushed periodically, so speed matters more than ratio. Appending adds a gzip member, which readers handle.
+    if gz:
+        if "b" in mode:
+            return gzip.open(path, mode, compresslevel=1)
+        return gzip.open(path, mode + "t", compresslevel=1, encoding="utf-8", newline="")
+    if "b" in mode:
+        return path.open(mode, buffering=_OUTPUT_BUFFER_BYTES)
+    return path.open(mode, encoding="utf-8", newline="", buffering=_OUTPUT_BUFFER_BYTES)
+
+
+# orjson >= 3.9 can embed already-encoded JSON in a document verbatim.
+_ORJSON_FRAGMENT = getattr(_orjson, "Fragment", None)
+
+
+def _reuse_cell(obj: Any, cell: str) -> Any:
+    # Value for a JSONL record field whose *_json CSV cell (`cell`, from _dumps_cell) is already
+    # encoded: embedded as-is when orjson supports fragments, so it is not serialized twice.
+    if _ORJSON_FRAGMENT is not None and obj is not None:
+        return _ORJSON_FRAGMENT(cell)
+    return obj
+
+
+# Records are written with "website"/"website_key" as their leading top-level keys, ahead of any nested
+# objects, so the first match is the top-level field (quotes inside string values are escaped and cannot match).
+_WEBSITE_RE = re.compile(rb'"website"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+_WEBSITE_KEY_RE = re.compile(rb'"website_key"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
 
 
-def _iter_processed_websites_from_jsonl(jsonl_path: Path) -> Iterable[str]:
-    if not jsonl_path.exists():
-        return []
+def _jsonl_str_field(line: bytes, pattern: "re.Pattern[bytes]") -> str | None:
+    m = pattern.search(line)
+    if not m:
+        return None
+    raw = m.group(1)
+    if b"\\" not in raw:
+        return raw.decode("utf-8", "replace")
+    try:
+        return json.loads(b'"' + raw + b'"')
+    except ValueError:
+        return None
+
+
+def _jsonl_website(line: bytes) -> str:
+    # Only the website field is needed to resume; skip full JSON parsing when the fast path matches.
+    website = _jsonl_str_field(line, _WEBSITE_RE)
+    if website is not None:
+        return website
+    try:
+        rec = json.loads(line)
+    except ValueError:
+        return ""
+    return str(rec.get("website") or "") if isinstance(rec, dict) else ""
+
+
+def _jsonl_resume_key(line: bytes) -> str:
+    # Records carry their normalized dedupe key; older outputs without it are normalized here.
+    key = _jsonl_str_field(line, _WEBSITE_KEY_RE)
+    return key if key is not None else _normalize_for_dedupe(_jsonl_website(line))
+
+
+class _ResumeIndex:
+    """Normalized websites already written to an output JSONL, kept in a sqlite sidecar (`<out>.seen.db`).
+
+    Membership is an indexed lookup, so memory stays flat however large the previous output is.
+    The sidecar remembers how far into the JSONL it has read; each `sync()` only scans lines appended
+    since (the whole file on first use, or when the file shrank because it was rewritten).
+    """
+
+    def __init__(self, jsonl_path: Path) -> None:
+        self.jsonl_path = jsonl_path
+        self._conn = sqlite3.connect(str(jsonl_path) + ".seen.db")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS seen (key TEXT PRIMARY KEY) WITHOUT ROWID")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+
+    def _meta(self, name: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def sync(self) -> None:
+        if not self.jsonl_path.exists():
+            return
+        size = self.jsonl_path.stat().st_size
+        offset = self._meta("offset")
+        if size < self._meta("file_size"):
+            offset = 0
+            with self._conn:
+                self._conn.execute("DELETE FROM seen")
+
+        gz = _is_gzip_file(self.jsonl_path)
+        with (gzip.open(self.jsonl_path, "rb") if gz else self.jsonl_path.open("rb")) as f, self._conn:
+            f.seek(offset)  # gzip offsets are in decompressed bytes
+            try:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partial last line of an interrupted run; re-read next time
+                    offset += len(line)
+                    key = _jsonl_resume_key(line)
+                    if key:
+                        self._conn.execute("INSERT OR IGNORE INTO seen (key) VALUES (?)", (key,))
+            except EOFError:
+                pass  # gzip output cut off mid-write (killed run): keep the records that were readable
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", [("offset", offset), ("file_size", size)]
+            )
+
+    def __contains__(self, key: object) -> bool:
+        return self._conn.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @staticmethod
+    def discard_for(jsonl_path: Path) -> None:
+        # A fresh (non-resume) run overwrites the JSONL, so its old index no longer applies.
+        Path(str(jsonl_path) + ".seen.db").unlink(missing_ok=True)
+
+
+def _eligible_rows(
+    rows: Iterable[Dict[str, str]],
+    *,
+    url_column: str,
+    processed: Container[str],
+    dedupe: bool,
+    resume: bool,
+) -> Iterator[Dict[str, str]]:
+    # Lazily apply the URL-present/resume/dedupe filters (dedupe keeps the first occurrence),
+    # so only the seen-key set grows with the input size.
+    seen: set[str] = set()
+    for r in rows:
+        website = (r.get(url_column) or r.get("Website") or "").strip()
+        if not website:
+            continue
+        key = _normalize_for_dedupe(website) if dedupe or resume else website
+        if not key:
+            continue
+        if resume and key in processed:
+            continue
+        if dedupe:
+            if key in seen:
+                continue
+            seen.add(key)
+        yield r
+
+
+
+
+class _BackgroundWriter:
+    """Serializes and writes output rows (JSONL record + CSV values) on one thread so evaluations never
+    wait on JSON encoding or disk.
+
+    The queue is bounded, so producers only block if the disk falls far behind. Rows already queued
+    are written together (up to `batch_rows`: one JSONL write, one `writerows`). Files are flushed
+    every `flush_every` rows, once unflushed rows are `flush_seconds` old, and on close - not per row,
+    so the output buffers absorb the small writes. A write error is re-raised to the next `put()` /
+    `close()` caller.
+    """
+
+    def __init__(
+        self,
+        out: Any,
+        out_csv: Any,
+        *,
+        maxsize: int = 128,
+        flush_every: int = 64,
+        flush_seconds: float = 5.0,
+        batch_rows: int = 64,
+    ) -> None:
+        self._out = out
+        self._out_csv = out_csv
+        self._csv_writer = csv.writer(out_csv)
+        self._flush_every = max(1, flush_every)
+        self._flush_seconds = max(0.0, flush_seconds)
+        self._batch_rows = max(1, batch_rows)
+        self._q: "queue.Queue[Tuple[Dict[str, Any] | None, Any] | None]" = queue.Queue(maxsize=maxsize)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="evaluate_list-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, record: Dict[str, Any] | None, csv_values: Any) -> None:
+        # `record` must not be mutated afterwards (it is serialized later); None writes a CSV row only.
+        if self._error is not None:
+            raise self._error
+        self._q.put((record, csv_values))
+
+    def _next_batch(self, timeout: float | None) -> Tuple[List[Tuple[Dict[str, Any] | None, Any]], bool]:
+        # Blocks for one item (up to `timeout`), then takes whatever else is already queued.
+        # Returns (rows, closed); rows is empty if the wait timed out.
+        batch: List[Tuple[Dict[str, Any] | None, Any]] = []
+        try:
+            item = self._q.get(timeout=timeout)
+        except queue.Empty:
+            return batch, False
+        while item is not None:
+            batch.append(item)
+            if len(batch) >= self._batch_rows:
+                return batch, False
+            try:
+                item = self._q.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        unflushed = 0
+        flush_due = 0.0
+        closed = False
+        while not closed:
+            timeout = max(0.0, flush_due - time.monotonic()) if unflushed else None
+            batch, closed = self._next_batch(timeout)
+            if self._error is not None:
+                continue  # keep draining so producers never block on a dead writer
+            try:
+                if batch:
+                    self._out.write(b"".join(_dumps_line(rec) for rec, _ in batch if rec is not None))
+                    self._csv_writer.writerows(values for _, values in batch)
+                    if not unflushed:
+                        flush_due = time.monotonic() + self._flush_seconds
+                    unflushed += len(batch)
+                if unflushed and (closed or unflushed >= self._flush_every or time.monotonic() >= flush_due):
+                    self._out.flush()
+                    self._out_csv.flush()
+                    unflushed = 0
+            except BaseException as e:  # surfaced to the main thread
+                self._error = e
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+@dataclass(frozen=True, slots=True)
+class _RunConfig:
+    """Per-run settings read by every row, resolved from the CLI args once before the loop."""
+
+    url_column: str
+    name_column: str
+    model: str
+    rubric_file: str
+    service_tier: str
+    max_tool_calls: int | None
+    debug_web_search: bool
+    minimal_jsonl: bool
+    second_query_on_uncertainty: bool
+    retry_disambiguation_on_low_confidence: bool
+    retry_max_tool_calls: int
+    continue_on_error: bool
+    local_first: bool
+    local_only: bool
+    check_functional_shop: bool
+    check_functional_shop_playwright: bool
+    playwright_fallback_on_blocked: bool
+    playwright_fallback_on_unknown: bool
+    openai_fallback_on_unknown: bool
+    progress_every: int
+    sleep: float
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "_RunConfig":
+        return cls(
+            url_column=args.url_column,
+            name_column=args.name_column,
+            model=args.model,
+            rubric_file=args.rubric_file,
+            service_tier=args.service_tier,
+            max_tool_calls=args.max_tool_calls,
+            debug_web_search=bool(args.debug_web_search),
+            minimal_jsonl=bool(args.minimal_jsonl),
+            second_query_on_uncertainty=bool(args.second_query_on_uncertainty),
+            retry_disambiguation_on_low_confidence=bool(args.retry_disambiguation_on_low_confidence),
+            retry_max_tool_calls=int(args.retry_max_tool_calls),
+            continue_on_error=bool(args.continue_on_error),
+            local_first=bool(args.local_first),
+            local_only=bool(args.local_only),
+            check_functional_shop=bool(args.check_functional_shop),
+            check_functional_shop_playwright=bool(args.check_functional_shop_playwright),
+            playwright_fallback_on_blocked=bool(args.playwright_fallback_on_blocked),
+            playwright_fallback_on_unknown=bool(args.playwright_fallback_on_unknown),
+            openai_fallback_on_unknown=bool(args.openai_fallback_on_unknown),
+            progress_every=int(args.progress_every or 0),
+            sleep=float(args.sleep),
+        )
 
-    def gen() -> Iterable[str]:
-        with jsonl_path.open("r", encoding="utf-8", errors="replace") as f:
-            for line in f:
-                s = line.strip()
-                if not s:
-                    continue
-                try:
-                    rec = json.loads(s)
-                except Exception:
-                    continue
-                w = (rec.get("website") or "").strip()
-                if w:
-                    yield w
 
-    return gen()
+def _sample_keys(keys: Iterable[str], *, k: int, seed: int) -> set[str]:
+    """Uniform sample of k distinct keys from a stream, holding only O(k) keys.
+
+    Each key gets a pseudo-random priority from a seeded hash and the k smallest priorities win
+    (bottom-k sampling). Repeats of a key share its priority, so duplicates need no seen-set and
+    every distinct key is equally likely, however often it repeats. Deterministic for a given seed.
+    """
+    if k <= 0:
+        return set()
+    salt = str(seed).encode("utf-8")
+    heap: List[Tuple[int, str]] = []  # (-priority, key): max-heap over the current sample
+    chosen: set[str] = set()
+    for key in keys:
+        if not key or key in chosen:
+            continue
+        prio = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8, key=salt).digest(), "big")
+        if len(heap) < k:
+            heapq.heappush(heap, (-prio, key))
+            chosen.add(key)
+        elif prio < -heap[0][0]:
+            _, dropped = heapq.heapreplace(heap, (-prio, key))
+            chosen.discard(dropped)
+            chosen.add(key)
+    return chosen
 
 
 def main() -> int:
@@ -213,62 +513,79 @@ def main() -> int:
     )
     parser.add_argument(
         "--input",
-        default=os.environ.get("SHOPTECH_INPUT_PATH") or None,
+        default=_env("SHOPTECH_INPUT_PATH"),
         help="Path to input file (CSV or TXT). Env: SHOPTECH_INPUT_PATH. Overrides --sample if set.",
     )
     parser.add_argument(
         "--input-format",
-        default=os.environ.get("SHOPTECH_INPUT_FORMAT") or "auto",
-        help="Input format: auto (default), csv, txt. Env: SHOPTECH_INPUT_FORMAT",
+        default=_env("SHOPTECH_INPUT_FORMAT") or "auto",
+        help=(
+            "Input format: auto (default; .parquet/.pq, .txt/.list/.urls, else csv), csv, txt, parquet "
+            "(parquet needs the optional pyarrow package). Env: SHOPTECH_INPUT_FORMAT"
+        ),
+    )
+    parser.add_argument(
+        "--cache-parquet",
+        default=_env("SHOPTECH_CACHE_PARQUET"),
+        help=(
+            "Convert the input's url/name/bucket columns to this parquet file (zstd) before the run and read from it; "
+            "pass it as --input on later runs to skip CSV parsing. Needs pyarrow. Env: SHOPTECH_CACHE_PARQUET"
+        ),
     )
     parser.add_argument(
         "--csv-delimiter",
-        default=os.environ.get("SHOPTECH_CSV_DELIMITER") or None,
+        default=_env("SHOPTECH_CSV_DELIMITER"),
         help="CSV delimiter override (e.g. ';'). Default: auto-detect. Env: SHOPTECH_CSV_DELIMITER",
     )
     parser.add_argument(
         "--url-column",
-        default=os.environ.get("SHOPTECH_URL_COLUMN", "Website"),
+        default=_env("SHOPTECH_URL_COLUMN") or "Website",
         help="CSV column name that contains the URL. Ignored for TXT. Default: Website. Env: SHOPTECH_URL_COLUMN",
     )
     parser.add_argument(
         "--name-column",
-        default=os.environ.get("SHOPTECH_NAME_COLUMN", "Name"),
+        default=_env("SHOPTECH_NAME_COLUMN") or "Name",
         help="CSV column name for display name. Default: Name. Env: SHOPTECH_NAME_COLUMN",
     )
     parser.add_argument(
         "--bucket-column",
-        default=os.environ.get("SHOPTECH_BUCKET_COLUMN", "-"),
+        default=_env("SHOPTECH_BUCKET_COLUMN") or "-",
         help="Optional CSV column for grouping labels. Use '-' to disable. Env: SHOPTECH_BUCKET_COLUMN",
     )
     parser.add_argument(
         "--random-sample",
         type=int,
-        default=int(os.environ["SHOPTECH_RANDOM_SAMPLE"]) if os.environ.get("SHOPTECH_RANDOM_SAMPLE") else None,
+        default=_envint("SHOPTECH_RANDOM_SAMPLE"),
         help="Randomly sample N unique rows (URL present) from the input before evaluating. Env: SHOPTECH_RANDOM_SAMPLE",
     )
     parser.add_argument(
         "--seed",
         type=int,
-        default=int(os.environ.get("SHOPTECH_SAMPLE_SEED", "42")),
+        default=_envint("SHOPTECH_SAMPLE_SEED", 42),
         help="RNG seed for --random-sample (default 42). Env: SHOPTECH_SAMPLE_SEED",
     )
     parser.add_argument(
         "--dedupe",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_DEDUPE", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_DEDUPE"),
         help="Dedupe rows by normalized URL before evaluating. Env: SHOPTECH_DEDUPE=1",
     )
     parser.add_argument(
         "--limit",
         type=int,
-        default=int(os.environ["SHOPTECH_LIMIT"]) if os.environ.get("SHOPTECH_LIMIT") else None,
+        default=_envint("SHOPTECH_LIMIT"),
         help="Optional cap on number of rows to evaluate after filtering/dedupe. Env: SHOPTECH_LIMIT",
     )
+    parser.add_argument(
+        "--total",
+        type=int,
+        default=None,
+        help="Expected number of rows to evaluate; only used for progress/ETA output when streaming the input.",
+    )
     parser.add_argument(
         "--resume",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_RESUME", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_RESUME"),
         help="Resume from existing --out JSONL: skip URLs already present and append to outputs. Env: SHOPTECH_RESUME=1",
     )
     parser.add_argument("--out", default=None, help="Where to write JSONL results (default: outputs/<timestamp>[_suffix].jsonl)")
@@ -283,16 +600,25 @@ def main() -> int:
         default="",
         help="Optional suffix added to output filenames (default: none). Example: -s baseline",
     )
-    parser.add_argument("--model", default=os.environ.get("OPENAI_MODEL", "gpt-4.1-mini"), help="OpenAI model")
+    parser.add_argument(
+        "--gzip-out",
+        action="store_true",
+        default=_envbool("SHOPTECH_GZIP_OUT"),
+        help=(
+            "Gzip-compress the JSONL/CSV outputs (default names get a .gz suffix). "
+            "Outputs named *.gz are always compressed. Env: SHOPTECH_GZIP_OUT=1"
+        ),
+    )
+    parser.add_argument("--model", default=_env("OPENAI_MODEL") or "gpt-4.1-mini", help="OpenAI model")
     parser.add_argument(
         "--rubric-file",
-        default=os.environ.get("SHOPTECH_RUBRIC_FILE", str(DEFAULT_RUBRIC_FILE)),
+        default=_env("SHOPTECH_RUBRIC_FILE") or str(DEFAULT_RUBRIC_FILE),
         help="Path to rubric file (default: env SHOPTECH_RUBRIC_FILE or rubrics/shop_platform_rubric_v1.md)",
     )
     parser.add_argument(
         "--max-tool-calls",
         type=int,
-        default=int(os.environ["SHOPTECH_MAX_TOOL_CALLS"]) if os.environ.get("SHOPTECH_MAX_TOOL_CALLS") else None,
+        default=_envint("SHOPTECH_MAX_TOOL_CALLS"),
         help=(
             "Optional cap on tool calls (web searches) within each single LLM call. "
             "This is a cost guardrail; the model may use fewer. Env: SHOPTECH_MAX_TOOL_CALLS"
@@ -300,63 +626,83 @@ def main() -> int:
     )
     parser.add_argument(
         "--reasoning-effort",
-        default=os.environ.get("SHOPTECH_REASONING_EFFORT") or None,
+        default=_env("SHOPTECH_REASONING_EFFORT"),
         help="Optional reasoning effort override: none/minimal/low/medium/high/xhigh. Default: auto (unset). Env: SHOPTECH_REASONING_EFFORT",
     )
     parser.add_argument(
         "--prompt-cache",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_PROMPT_CACHE", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
-        help="Enable prompt caching for repeated static input (rubric + system prompt). Env: SHOPTECH_PROMPT_CACHE=1",
+        default=_envbool("SHOPTECH_PROMPT_CACHE", None),
+        help=(
+            "Enable prompt caching for repeated static input (rubric + system prompt). "
+            "Default: on when the prompt prefix is large enough to be cached. Env: SHOPTECH_PROMPT_CACHE=1/0"
+        ),
+    )
+    parser.add_argument(
+        "--no-prompt-cache",
+        dest="prompt_cache",
+        action="store_false",
+        help="Disable prompt caching (overrides the default/env).",
     )
     parser.add_argument(
         "--prompt-cache-retention",
-        default=os.environ.get("SHOPTECH_PROMPT_CACHE_RETENTION") or None,
+        default=_env("SHOPTECH_PROMPT_CACHE_RETENTION"),
         help="Prompt cache retention: in-memory or 24h. Env: SHOPTECH_PROMPT_CACHE_RETENTION",
     )
     parser.add_argument(
         "--service-tier",
-        default=os.environ.get("SHOPTECH_SERVICE_TIER", "auto"),
+        default=_env("SHOPTECH_SERVICE_TIER") or "auto",
         help="OpenAI service tier: auto (default) or flex. Env: SHOPTECH_SERVICE_TIER",
     )
     parser.add_argument(
         "--timeout-seconds",
         type=float,
-        default=float(os.environ["SHOPTECH_OPENAI_TIMEOUT_SECONDS"]) if os.environ.get("SHOPTECH_OPENAI_TIMEOUT_SECONDS") else None,
+        default=_envfloat("SHOPTECH_OPENAI_TIMEOUT_SECONDS"),
         help="Request timeout in seconds. For flex, you may want ~900s. Env: SHOPTECH_OPENAI_TIMEOUT_SECONDS",
     )
     parser.add_argument(
         "--flex-max-retries",
         type=int,
-        default=int(os.environ.get("SHOPTECH_FLEX_MAX_RETRIES", "5")),
+        default=_envint("SHOPTECH_FLEX_MAX_RETRIES", 5),
         help="Retries (with exponential backoff) on 429 Resource Unavailable when service-tier is flex. Env: SHOPTECH_FLEX_MAX_RETRIES",
     )
     parser.add_argument(
         "--flex-fallback-to-auto",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_FLEX_FALLBACK_TO_AUTO", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_FLEX_FALLBACK_TO_AUTO"),
         help="If flex is unavailable after retries, retry once with standard processing (auto). Env: SHOPTECH_FLEX_FALLBACK_TO_AUTO=1",
     )
-    parser.add_argument("--sleep", type=float, default=0.5, help="Seconds to sleep between calls")
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=0.5,
+        help="Seconds to sleep between calls (serial runs only; with --workers > 1 the pool size is the rate limit)",
+    )
     parser.add_argument(
         "--debug-web-search",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_DEBUG_WEB_SEARCH", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_DEBUG_WEB_SEARCH"),
         help="Include OpenAI web_search_call debug info in JSONL records. Env: SHOPTECH_DEBUG_WEB_SEARCH=1",
     )
+    parser.add_argument(
+        "--minimal-jsonl",
+        action="store_true",
+        default=_envbool("SHOPTECH_MINIMAL_JSONL"),
+        help=(
+            "Omit the full model JSON ('raw') from JSONL records; the parsed fields are kept. "
+            "Env: SHOPTECH_MINIMAL_JSONL=1"
+        ),
+    )
     parser.add_argument(
         "--second-query-on-uncertainty",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY"),
         help="Allow a second web-search query only for ambiguous/low-confidence cases (does not force it). Env: SHOPTECH_SECOND_QUERY_ON_UNCERTAINTY=1",
     )
     parser.add_argument(
         "--retry-disambiguation-on-low-confidence",
         action="store_true",
-        default=(
-            os.environ.get("SHOPTECH_RETRY_DISAMBIGUATION_ON_LOW_CONFIDENCE", "").strip()
-            in ("1", "true", "TRUE", "yes", "YES")
-        ),
+        default=_envbool("SHOPTECH_RETRY_DISAMBIGUATION_ON_LOW_CONFIDENCE"),
         help=(
             "If the model returns confidence=low, re-run the evaluation once with stronger disambiguation instructions. "
             "This is a second model call (extra tokens + extra web-search queries if used). "
@@ -366,19 +712,19 @@ def main() -> int:
     parser.add_argument(
         "--retry-max-tool-calls",
         type=int,
-        default=int(os.environ.get("SHOPTECH_RETRY_MAX_TOOL_CALLS", "3") or 3),
+        default=_envint("SHOPTECH_RETRY_MAX_TOOL_CALLS", 3),
         help="max_tool_calls to use for the retry call (if retry is triggered). Default: 3. Env: SHOPTECH_RETRY_MAX_TOOL_CALLS",
     )
     parser.add_argument(
         "--continue-on-error",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_CONTINUE_ON_ERROR", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_CONTINUE_ON_ERROR"),
         help="Continue the run if an evaluation errors; write an error record instead of aborting. Env: SHOPTECH_CONTINUE_ON_ERROR=1",
     )
     parser.add_argument(
         "--local-first",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_LOCAL_FIRST", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_LOCAL_FIRST"),
         help=(
             "Try API-free local detection first (HTML fingerprinting + shop-link discovery + DNS Shopify hint). "
             "If confident, skip the OpenAI call. Env: SHOPTECH_LOCAL_FIRST=1"
@@ -387,13 +733,13 @@ def main() -> int:
     parser.add_argument(
         "--local-only",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_LOCAL_ONLY", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_LOCAL_ONLY"),
         help="API-free mode: only run local detection, never call OpenAI (no OPENAI_API_KEY required). Env: SHOPTECH_LOCAL_ONLY=1",
     )
     parser.add_argument(
         "--check-functional-shop",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_CHECK_FUNCTIONAL_SHOP", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_CHECK_FUNCTIONAL_SHOP"),
         help=(
             "Run an additional API-free check for cart/checkout functionality (has_cart_checkout/no_cart_checkout/unclear) "
             "and write results to outputs. Default off. Env: SHOPTECH_CHECK_FUNCTIONAL_SHOP=1"
@@ -402,7 +748,7 @@ def main() -> int:
     parser.add_argument(
         "--check-functional-shop-playwright",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_CHECK_FUNCTIONAL_SHOP_PLAYWRIGHT", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_CHECK_FUNCTIONAL_SHOP_PLAYWRIGHT"),
         help=(
             "Also run a Playwright headless browser cart/checkout check (optional dependency). "
             "This can catch JS-rendered carts but may be blocked. Env: SHOPTECH_CHECK_FUNCTIONAL_SHOP_PLAYWRIGHT=1"
@@ -411,7 +757,7 @@ def main() -> int:
     parser.add_argument(
         "--playwright-fallback-on-blocked",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_PLAYWRIGHT_FALLBACK_ON_BLOCKED", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_PLAYWRIGHT_FALLBACK_ON_BLOCKED"),
         help=(
             "For local detection: if a site is blocked/inaccessible via normal fetch, try a Playwright-rendered HTML fallback "
             "to recover platform/shop_presence. Optional dependency. Env: SHOPTECH_PLAYWRIGHT_FALLBACK_ON_BLOCKED=1"
@@ -420,7 +766,7 @@ def main() -> int:
     parser.add_argument(
         "--playwright-fallback-on-unknown",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_PLAYWRIGHT_FALLBACK_ON_UNKNOWN", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_PLAYWRIGHT_FALLBACK_ON_UNKNOWN"),
         help=(
             "For local detection: if platform remains unknown even though the plain fetch succeeded (often JS-heavy), "
             "try a Playwright-rendered HTML fallback to recover platform/shop_presence. Optional dependency. "
@@ -430,7 +776,7 @@ def main() -> int:
     parser.add_argument(
         "--openai-fallback-on-unknown",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_OPENAI_FALLBACK_ON_UNKNOWN", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=_envbool("SHOPTECH_OPENAI_FALLBACK_ON_UNKNOWN"),
         help=(
             "When using --local-first: only call OpenAI if local detection still returns final_platform=unknown "
             "(i.e. OpenAI is a last-resort fallback for unknowns only). Env: SHOPTECH_OPENAI_FALLBACK_ON_UNKNOWN=1"
@@ -439,17 +785,30 @@ def main() -> int:
     parser.add_argument(
         "--progress-every",
         type=int,
-        default=int(os.environ.get("SHOPTECH_PROGRESS_EVERY", "25")),
+        default=_envint("SHOPTECH_PROGRESS_EVERY", 25),
         help="Print progress/ETA every N completed evaluations. Env: SHOPTECH_PROGRESS_EVERY (default 25)",
     )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=_envint("SHOPTECH_FLUSH_EVERY", 0),
+        help=(
+            "Flush the JSONL/CSV outputs every N rows (they are also flushed after 5s idle and at exit). "
+            "0 = max(64, --progress-every). Env: SHOPTECH_FLUSH_EVERY"
+        ),
+    )
     parser.add_argument(
         "--workers",
+        "--concurrency",
+        dest="workers",
         type=int,
-        default=int(os.environ.get("SHOPTECH_WORKERS", "1") or 1),
+        default=_envint("SHOPTECH_WORKERS") or _envint("SHOPTECH_CONCURRENCY") or 1,
         help=(
-            "Number of concurrent worker threads (best for I/O-bound fetches). "
-            "Note: output files are still written under a lock to avoid corruption. "
-            "Default: 1. Env: SHOPTECH_WORKERS"
+            "Number of rows evaluated concurrently (worker threads sharing one pooled OpenAI client; "
+            "each row is network-bound, so 8-16 is typical for OpenAI runs). "
+            "Output rows are handed to a single background writer thread, which flushes every --flush-every "
+            "rows, after 5s of unflushed output, and at exit. "
+            "Default: 1. Env: SHOPTECH_WORKERS / SHOPTECH_CONCURRENCY"
         ),
     )
     args = parser.parse_args()
@@ -458,10 +817,28 @@ def main() -> int:
         raise SystemExit("Missing OPENAI_API_KEY env var (or set --local-only).")
 
     # Flex can be slower; default to a larger timeout if not set explicitly.
+    service_tier_norm = (args.service_tier or "").strip().lower()
     timeout_seconds = args.timeout_seconds
-    if timeout_seconds is None and (args.service_tier or "").strip().lower() == "flex":
+    if timeout_seconds is None and service_tier_norm == "flex":
         timeout_seconds = 900.0
 
+    cfg = _RunConfig.from_args(args)
+    # Run-level evaluator settings are bound once; each call only adds the per-attempt arguments.
+    shared_eval_kwargs: Dict[str, Any] = dict(
+        rubric_file=args.rubric_file,
+        reasoning_effort=args.reasoning_effort,
+        prompt_cache=args.prompt_cache,
+        prompt_cache_retention=args.prompt_cache_retention,
+        service_tier=args.service_tier,
+        timeout_seconds=timeout_seconds,
+        flex_max_retries=args.flex_max_retries,
+        flex_fallback_to_auto=args.flex_fallback_to_auto,
+    )
+    eval_debug = functools.partial(
+        evaluate_company_with_usage_and_web_search_debug, include_sources=False, **shared_eval_kwargs
+    )
+    eval_artifacts = functools.partial(evaluate_company_with_usage_and_web_search_artifacts, **shared_eval_kwargs)
+
     input_path: Path
     if args.input:
         input_path = Path(args.input)
@@ -476,25 +853,44 @@ def main() -> int:
     suffix = _suffix_slug(args.suffix)
     stem = stamp if not suffix else f"{stamp}_{suffix}"
 
-    out_path = Path(args.out) if args.out else (out_dir / f"{stem}.jsonl")
-    out_csv_path = Path(args.out_csv) if args.out_csv else (out_dir / f"{stem}.csv")
-
-    rows_iter = _iter_rows(input_path, input_format=args.input_format, csv_delimiter=args.csv_delimiter)
-
-    results: List[Dict[str, Any]] = []
+    gz_suffix = ".gz" if args.gzip_out else ""
+    out_path = Path(args.out) if args.out else (out_dir / f"{stem}.jsonl{gz_suffix}")
+    out_csv_path = Path(args.out_csv) if args.out_csv else (out_dir / f"{stem}.csv{gz_suffix}")
 
     pricing = pricing_from_env(os.environ)
     tool_pricing = web_search_pricing_from_env(os.environ)
 
     # Flex discount: apply a multiplier to token-cost estimates only.
     # Web search tool usage is billed separately (typically $0.01 per query) and is not discounted the same way.
-    flex_discount = float(os.environ.get("SHOPTECH_FLEX_TOKEN_DISCOUNT", "0.5") or 0.5)
-    apply_flex_discount = (args.service_tier or "").strip().lower() == "flex"
+    flex_discount = _envfloat("SHOPTECH_FLEX_TOKEN_DISCOUNT", 0.5)
+    apply_flex_discount = service_tier_norm == "flex"
+    token_cost_multiplier = flex_discount if apply_flex_discount else 1.0
 
     bucket_col_raw = (args.bucket_column or "").strip()
     bucket_col = "" if bucket_col_raw.lower() in {"", "-", "none", "null"} else bucket_col_raw
     include_bucket = bool(bucket_col)
 
+    # Only the columns read below are kept per row.
+    row_columns = [args.url_column, "Website", args.name_column, "Firma"]
+    if include_bucket:
+        row_columns += [bucket_col, "bucket"]
+
+    input_format = args.input_format
+    if args.cache_parquet:
+        cache_path = Path(args.cache_parquet)
+        n_cached = _write_parquet_rows(
+            _iter_rows(input_path, input_format=input_format, csv_delimiter=args.csv_delimiter, columns=row_columns),
+            cache_path,
+            row_columns,
+        )
+        print(f"Wrote parquet input cache ({n_cached} rows): {cache_path}", flush=True)
+        input_path, input_format = cache_path, "parquet"
+
+    def _open_rows() -> Iterable[Dict[str, str]]:
+        return _iter_rows(input_path, input_format=input_format, csv_delimiter=args.csv_delimiter, columns=row_columns)
+
+    rows_iter = _open_rows()
+
     csv_fieldnames = [
         "run_id",
         "name",
@@ -556,78 +952,76 @@ def main() -> int:
     ]
     if include_bucket:
         csv_fieldnames.insert(1, "bucket")
-
-    processed = set()
+    # Row values in header order, captured once (row_out always carries every column).
+    csv_row_values = operator.itemgetter(*csv_fieldnames)
+    # CSV columns that are the same for every row of the run.
+    const_csv: Dict[str, Any] = {
+        "run_id": stem,
+        "rubric_file": cfg.rubric_file,
+        "price_input_per_1m": pricing.input_usd,
+        "price_cached_input_per_1m": pricing.cached_input_usd,
+        "price_output_per_1m": pricing.output_usd,
+        "price_web_search_per_1k": tool_pricing.per_1k_calls_usd,
+    }
+
+    processed: Container[str] = frozenset()
+    resume_index: _ResumeIndex | None = None
     if args.resume:
-        processed = {_normalize_for_dedupe(u) for u in _iter_processed_websites_from_jsonl(out_path)}
-        processed.discard("")
+        resume_index = _ResumeIndex(out_path)
+        resume_index.sync()
+        processed = resume_index
+    else:
+        _ResumeIndex.discard_for(out_path)
 
     # Build the evaluation set:
-    # - if --random-sample is set, reservoir-sample unique URLs while streaming the input
-    # - else, filter/dedupe/resume over all rows
-    filtered_rows: List[Dict[str, str]] = []
-    seen = set()
+    # - if --random-sample is set, sample unique URL keys in one pass, then re-read the input for their rows
+    # - else, filter/dedupe/resume lazily as rows are evaluated
+    rows: Iterable[Dict[str, str]]
+    total_rows: int | None = args.total
 
     def _row_website(r: Dict[str, str]) -> str:
         return (r.get(args.url_column) or r.get("Website") or "").strip()
 
     if args.random_sample is not None:
         k = max(0, int(args.random_sample))
-        rng = random.Random(int(args.seed))
+        if args.limit is not None:
+            k = min(k, max(0, args.limit))
+        eligible_keys = (
+            _normalize_for_dedupe(_row_website(r))
+            for r in _eligible_rows(
+                rows_iter, url_column=args.url_column, processed=processed, dedupe=False, resume=args.resume
+            )
+        )
+        pending = _sample_keys(eligible_keys, k=k, seed=int(args.seed))
+        # Second pass: the first row of each sampled key, in input order.
         reservoir: List[Dict[str, str]] = []
-        unique_seen: set[str] = set()
-        n_unique = 0
-        for r in rows_iter:
-            website = _row_website(r)
-            if not website:
-                continue
-            key = _normalize_for_dedupe(website)
-            if not key:
-                continue
-            if args.resume and key in processed:
-                continue
-            if key in unique_seen:
-                continue
-            unique_seen.add(key)
-            n_unique += 1
-            if len(reservoir) < k:
+        for r in _open_rows() if pending else ():
+            key = _normalize_for_dedupe(_row_website(r))
+            if key in pending:
+                pending.discard(key)
                 reservoir.append(r)
-            else:
-                j = rng.randrange(n_unique)
-                if j < k:
-                    reservoir[j] = r
-        filtered_rows = reservoir
+                if not pending:
+                    break
+        rows = reservoir
+        total_rows = len(reservoir)
     else:
-        # Optional dedupe: keep the first occurrence.
-        for r in rows_iter:
-            website = (r.get(args.url_column) or r.get("Website") or "").strip()
-            if not website:
-                continue
-            key = _normalize_for_dedupe(website) if args.dedupe or args.resume else website
-            if not key:
-                continue
-            if args.resume and key in processed:
-                continue
-            if args.dedupe:
-                if key in seen:
-                    continue
-                seen.add(key)
-            filtered_rows.append(r)
-
-    if args.limit is not None:
-        filtered_rows = filtered_rows[: max(0, args.limit)]
+        rows = _eligible_rows(
+            rows_iter, url_column=args.url_column, processed=processed, dedupe=args.dedupe, resume=args.resume
+        )
+        if args.limit is not None:
+            rows = itertools.islice(rows, max(0, args.limit))
+            if total_rows is None or total_rows > args.limit:
+                total_rows = max(0, args.limit)
 
     # If we used random sampling, write out the sampled URLs for reproducibility.
     if args.random_sample is not None:
         sample_path = out_dir / f"{stem}_sample_urls.txt"
-        with sample_path.open("w", encoding="utf-8") as sf:
-            for r in filtered_rows:
-                website = _row_website(r)
-                name = (r.get(args.name_column) or r.get("Firma") or "").strip()
-                if name:
-                    sf.write(f"{website}\t{name}\n")
-                else:
-                    sf.write(f"{website}\n")
+        lines = []
+        for r in reservoir:
+            website = _row_website(r)
+            name = (r.get(args.name_column) or r.get("Firma") or "").strip()
+            lines.append(f"{website}\t{name}\n" if name else f"{website}\n")
+        sample_path.write_text("".join(lines), encoding="utf-8")
         print(f"Wrote sampled URL list: {sample_path}", flush=True)
 
     # If resuming and output files already exist, append; else create new.
@@ -639,23 +1033,89 @@ def main() -> int:
     completed_ok = 0
     completed_err = 0
 
-    with out_path.open(out_mode, encoding="utf-8") as out, out_csv_path.open(csv_mode, encoding="utf-8", newline="") as out_csv:
-        writer = csv.DictWriter(out_csv, fieldnames=csv_fieldnames, extrasaction="ignore")
+    def _use_gzip(path: Path, mode: str) -> bool:
+        # Appends keep the existing file's format; new files follow --gzip-out / a .gz name.
+        if mode == "a":
+            return _is_gzip_file(path)
+        return bool(args.gzip_out) or path.suffix == ".gz"
+
+    with _open_output(out_path, out_mode + "b", gz=_use_gzip(out_path, out_mode)) as out, _open_output(
+        out_csv_path, csv_mode, gz=_use_gzip(out_csv_path, csv_mode)
+    ) as out_csv:
+        output = _BackgroundWriter(out, out_csv, flush_every=args.flush_every or max(64, cfg.progress_every))
         if csv_mode == "w":
-            writer.writeheader()
+            output.put(None, csv_fieldnames)
 
-        total_rows = len(filtered_rows)
+        total_label = "?" if total_rows is None else str(total_rows)
+        workers = max(1, int(args.workers or 1))
         write_lock = threading.Lock()
 
+        def _do_eval_once(
+            url: str,
+            *,
+            max_tool_calls: int | None,
+            extra_user_instructions: str | None,
+            second_query_on_uncertainty: bool,
+        ) -> Dict[str, Any]:
+            use_debug = cfg.debug_web_search or bool(extra_user_instructions and extra_user_instructions.strip())
+            if use_debug:
+                res, use, ws = eval_debug(
+                    url,
+                    cfg.model,
+                    max_tool_calls=max_tool_calls,
+                    extra_user_instructions=extra_user_instructions,
+                    second_query_on_uncertainty=second_query_on_uncertainty,
+                )
+                citations = (ws or {}).get("url_citations") or []
+                by_kind_completed = (ws or {}).get("by_kind_completed") or {}
+                q = int(by_kind_completed.get("query", 0) or 0)
+                o = int(by_kind_completed.get("open", 0) or 0)
+                u = int(by_kind_completed.get("unknown", 0) or 0)
+                billed_q = int(q)
+                tool_total = int((ws or {}).get("completed", 0) or 0)
+                flex_meta_local = (ws or {}).get("flex") if isinstance(ws, dict) else {}
+                return {
+                    "model_result": res,
+                    "usage": use,
+                    "ws_debug": ws,
+                    "url_citations": citations,
+                    "web_search_calls": billed_q,
+                    "web_search_calls_query": q,
+                    "web_search_calls_open": o,
+                    "web_search_calls_unknown": u,
+                    "web_search_tool_calls_total": tool_total,
+                    "flex_meta": flex_meta_local or {},
+                }
+
+            res, use, billed_q, citations = eval_artifacts(
+                url,
+                cfg.model,
+                max_tool_calls=max_tool_calls,
+                second_query_on_uncertainty=second_query_on_uncertainty,
+            )
+            return {
+                "model_result": res,
+                "usage": use,
+                "ws_debug": None,
+                "url_citations": citations,
+                "web_search_calls": int(billed_q),
+                "web_search_calls_query": 0,
+                "web_search_calls_open": 0,
+                "web_search_calls_unknown": 0,
+                "web_search_tool_calls_total": int(billed_q),
+                "flex_meta": {},
+            }
+
         def _process_row(i: int, r: Dict[str, str]) -> None:
             nonlocal completed_ok, completed_err
-            website = (r.get(args.url_column) or r.get("Website") or "").strip()
-            name = (r.get(args.name_column) or r.get("Firma") or "").strip()
+            website = (r.get(cfg.url_column) or r.get("Website") or "").strip()
+            name = (r.get(cfg.name_column) or r.get("Firma") or "").strip()
             if not website:
                 return
 
             with write_lock:
-                print(f"[{i}/{total_rows}] Evaluating: {name} | {website}", flush=True)
+                # Per-row lines are flushed with the next progress line (a terminal line-buffers them anyway).
+                print(f"[{i}/{total_label}] Evaluating: {name} | {website}", flush=not cfg.progress_every)
 
             t0 = time.monotonic()
             ws_debug: Dict[str, Any] | None = None
@@ -688,10 +1148,14 @@ def main() -> int:
             flex_retries = 0
             flex_sleep = 0.0
             flex_fallback_used = False
+            local_used = False
+            local_debug = None
+            local_sticky = False
+            local_sticky_reasons: list[str] = []
 
             try:
                 # Optional: separate functional shop (cart/checkout) check (API-free).
-                if args.check_functional_shop:
+                if cfg.check_functional_shop:
                     try:
                         fs = detect_shop_functionality(website)
                         cart_local_presence = str(fs.presence or "")
@@ -708,7 +1172,7 @@ def main() -> int:
                         cart_local_blocked = []
                         cart_local_error = f"{type(e).__name__}:{e}"
 
-                if args.check_functional_shop and args.check_functional_shop_playwright:
+                if cfg.check_functional_shop and cfg.check_functional_shop_playwright:
                     try:
                         pw = detect_shop_functionality_playwright(website)
                         cart_pw_presence = str(pw.presence or "")
@@ -726,7 +1190,7 @@ def main() -> int:
                         cart_pw_error = f"{type(e).__name__}:{e}"
 
                 # Combine cart presence from either method.
-                if args.check_functional_shop:
+                if cfg.check_functional_shop:
                     # Prefer "has_cart_checkout" if either finds it.
                     if cart_local_presence == "has_cart_checkout" or cart_pw_presence == "has_cart_checkout":
                         cart_presence = "has_cart_checkout"
@@ -760,15 +1224,11 @@ def main() -> int:
                         cart_presence_source = "local" if cart_local_presence else ""
 
                 # Optional API-free shortcut
-                local_used = False
-                local_debug = None
-                local_sticky = False
-                local_sticky_reasons: list[str] = []
-                if args.local_first or args.local_only:
+                if cfg.local_first or cfg.local_only:
                     ld = detect_platform_local(
                         website,
-                        playwright_fallback_on_blocked=bool(args.playwright_fallback_on_blocked),
-                        playwright_fallback_on_unknown=bool(args.playwright_fallback_on_unknown),
+                        playwright_fallback_on_blocked=cfg.playwright_fallback_on_blocked,
+                        playwright_fallback_on_unknown=cfg.playwright_fallback_on_unknown,
                     )
                     local_result = ld.model_result
                     local_debug = ld.debug
@@ -781,20 +1241,10 @@ def main() -> int:
                     local_plat = str(local_result.get("final_platform") or "").strip().lower()
                     # If requested: ONLY use OpenAI as a last-resort fallback when local still returns unknown.
                     # Otherwise, accept the local result (even if low confidence) to avoid misleading "upgrades".
-                    if args.local_first and bool(args.openai_fallback_on_unknown) and local_plat != "unknown":
+                    if cfg.local_first and cfg.openai_fallback_on_unknown and local_plat != "unknown":
                         local_used = True
                         model_result = local_result
-                        usage = type(
-                            "_Usage",
-                            (),
-                            {
-                                "input_tokens": 0,
-                                "output_tokens": 0,
-                                "total_tokens": 0,
-                                "input_tokens_details": type("X", (), {"cached_tokens": 0})(),
-                                "output_tokens_details": type("Y", (), {"reasoning_tokens": 0})(),
-                            },
-                        )()
+                        usage = _ZERO_USAGE
                         web_search_calls = 0
                         url_citations = []
                         ws_debug = None
@@ -804,35 +1254,15 @@ def main() -> int:
                         web_search_tool_calls_total = 0
                         retry_used = False
                         retry_selected = "first"
-                        usage_input_tokens = 0
-                        usage_output_tokens = 0
-                        usage_total_tokens = 0
-                        cached_tokens = 0
-                        reasoning_tokens = 0
-                        token_cost_usd_raw = 0.0
-                        token_cost_usd = 0.0
-                        flex_attempts = 0
-                        flex_retries = 0
-                        flex_sleep = 0.0
-                        flex_fallback_used = False
-                    if args.local_only or (
+                        # Token usage, cost and flex totals keep their zero defaults from above.
+                    if cfg.local_only or (
                         (local_conf in ("high", "medium"))
                         and local_plat != "unknown"
                         and (not local_sticky)
                     ):
                         local_used = True
                         model_result = local_result
-                        usage = type(
-                            "_Usage",
-                            (),
-                            {
-                                "input_tokens": 0,
-                                "output_tokens": 0,
-                                "total_tokens": 0,
-                                "input_tokens_details": type("X", (), {"cached_tokens": 0})(),
-                                "output_tokens_details": type("Y", (), {"reasoning_tokens": 0})(),
-                            },
-                        )()
+                        usage = _ZERO_USAGE
                         web_search_calls = 0
                         url_citations = []
                         ws_debug = None
@@ -842,20 +1272,9 @@ def main() -> int:
                         web_search_tool_calls_total = 0
                         retry_used = False
                         retry_selected = "first"
-                        # Ensure token usage vars remain zero
-                        usage_input_tokens = 0
-                        usage_output_tokens = 0
-                        usage_total_tokens = 0
-                        cached_tokens = 0
-                        reasoning_tokens = 0
-                        token_cost_usd_raw = 0.0
-                        token_cost_usd = 0.0
-                        flex_attempts = 0
-                        flex_retries = 0
-                        flex_sleep = 0.0
-                        flex_fallback_used = False
-
-                if not local_used and args.local_only:
+                        # Token usage, cost and flex totals keep their zero defaults from above.
+
+                if not local_used and cfg.local_only:
                     # Should never happen (local_only always sets local_used), but keep safe.
                     raise RuntimeError("local_only set but local detection did not run")
 
@@ -865,7 +1284,7 @@ def main() -> int:
                     # If we ran local-first and it didn't conclusively identify the platform, guide the model with hints.
                     local_hint = None
                     eval_target_url = website
-                    if args.local_first and local_debug and isinstance(local_debug, dict):
+                    if cfg.local_first and local_debug and isinstance(local_debug, dict):
                         attempts = local_debug.get("attempts") or []
                         cand_urls: list[str] = []
                         if isinstance(attempts, list):
@@ -878,7 +1297,7 @@ def main() -> int:
                             reasons = list(sticky.get("reasons") or [])
                         # If OpenAI fallback-on-unknown is enabled, prefer evaluating the best "shop-like" candidate URL
                         # rather than the corporate homepage (when we have one).
-                        if bool(args.openai_fallback_on_unknown) and isinstance(attempts, list):
+                        if cfg.openai_fallback_on_unknown and isinstance(attempts, list):
                             best = None
                             best_score = -1
                             for a in attempts:
@@ -913,94 +1332,21 @@ def main() -> int:
                         )
 
                 if not local_used:
-                    def _do_eval_once(
-                        *,
-                        max_tool_calls: int | None,
-                        extra_user_instructions: str | None,
-                        second_query_on_uncertainty: bool,
-                    ) -> Dict[str, Any]:
-                        use_debug = bool(args.debug_web_search) or bool(
-                            extra_user_instructions and extra_user_instructions.strip()
-                        )
-                        if use_debug:
-                            res, use, ws = evaluate_company_with_usage_and_web_search_debug(
-                                eval_target_url,
-                                args.model,
-                                rubric_file=args.rubric_file,
-                                max_tool_calls=max_tool_calls,
-                                reasoning_effort=args.reasoning_effort,
-                                prompt_cache=args.prompt_cache,
-                                prompt_cache_retention=args.prompt_cache_retention,
-                                service_tier=args.service_tier,
-                                timeout_seconds=timeout_seconds,
-                                flex_max_retries=args.flex_max_retries,
-                                flex_fallback_to_auto=args.flex_fallback_to_auto,
-                                include_sources=False,
-                                extra_user_instructions=extra_user_instructions,
-                                second_query_on_uncertainty=second_query_on_uncertainty,
-                            )
-                            citations = (ws or {}).get("url_citations") or []
-                            by_kind_completed = (ws or {}).get("by_kind_completed") or {}
-                            q = int(by_kind_completed.get("query", 0) or 0)
-                            o = int(by_kind_completed.get("open", 0) or 0)
-                            u = int(by_kind_completed.get("unknown", 0) or 0)
-                            billed_q = int(q)
-                            tool_total = int((ws or {}).get("completed", 0) or 0)
-                            flex_meta_local = (ws or {}).get("flex") if isinstance(ws, dict) else {}
-                            return {
-                                "model_result": res,
-                                "usage": use,
-                                "ws_debug": ws,
-                                "url_citations": citations,
-                                "web_search_calls": billed_q,
-                                "web_search_calls_query": q,
-                                "web_search_calls_open": o,
-                                "web_search_calls_unknown": u,
-                                "web_search_tool_calls_total": tool_total,
-                                "flex_meta": flex_meta_local or {},
-                            }
-
-                        res, use, billed_q, citations = evaluate_company_with_usage_and_web_search_artifacts(
-                            eval_target_url,
-                            args.model,
-                            rubric_file=args.rubric_file,
-                            max_tool_calls=max_tool_calls,
-                            reasoning_effort=args.reasoning_effort,
-                            prompt_cache=args.prompt_cache,
-                            prompt_cache_retention=args.prompt_cache_retention,
-                            service_tier=args.service_tier,
-                            timeout_seconds=timeout_seconds,
-                            flex_max_retries=args.flex_max_retries,
-                            flex_fallback_to_auto=args.flex_fallback_to_auto,
-                            second_query_on_uncertainty=second_query_on_uncertainty,
-                        )
-                        return {
-                            "model_result": res,
-                            "usage": use,
-                            "ws_debug": None,
-                            "url_citations": citations,
-                            "web_search_calls": int(billed_q),
-                            "web_search_calls_query": 0,
-                            "web_search_calls_open": 0,
-                            "web_search_calls_unknown": 0,
-                            "web_search_tool_calls_total": int(billed_q),
-                            "flex_meta": {},
-                        }
-
                     a1 = _do_eval_once(
-                        max_tool_calls=args.max_tool_calls,
+                        eval_target_url,
+                        max_tool_calls=cfg.max_tool_calls,
                         extra_user_instructions=local_hint,
-                        second_query_on_uncertainty=bool(args.second_query_on_uncertainty) or bool(local_sticky),
+                        second_query_on_uncertainty=cfg.second_query_on_uncertainty or bool(local_sticky),
                     )
                     attempts: list[Dict[str, Any]] = [a1]
 
                     selected = a1
                     conf1 = str((a1.get("model_result") or {}).get("confidence") or "").strip().lower()
-                    if args.retry_disambiguation_on_low_confidence and conf1 == "low":
+                    if cfg.retry_disambiguation_on_low_confidence and conf1 == "low":
                         retry_used = True
-                        retry_max = int(args.retry_max_tool_calls)
-                        if args.max_tool_calls is not None:
-                            retry_max = max(int(args.max_tool_calls), retry_max)
+                        retry_max = int(cfg.retry_max_tool_calls)
+                        if cfg.max_tool_calls is not None:
+                            retry_max = max(int(cfg.max_tool_calls), retry_max)
                         disambig_prompt = (
                                 "Perform TWO distinct web searches before deciding.\n"
                                 "1) Search for direct platform markers tied to the provided domain (e.g., '<domain> Magento', '<domain> Shopware', '<domain> WooCommerce', '<domain> Shopify').\n"
@@ -1008,6 +1354,7 @@ def main() -> int:
                                 "If evidence conflicts or is not clearly about the provided domain, choose unknown with low confidence.\n"
                         )
                         a2 = _do_eval_once(
+                            eval_target_url,
                             max_tool_calls=retry_max,
                             extra_user_instructions=disambig_prompt,
                             second_query_on_uncertainty=False,
@@ -1021,39 +1368,42 @@ def main() -> int:
                     model_result = selected["model_result"]
                     usage = selected["usage"]
                     url_citations = selected["url_citations"]
-                    ws_debug = selected["ws_debug"] if args.debug_web_search else None
-
-                    # Aggregate tool usage across attempts (billing happens for both calls).
-                    web_search_calls = sum(int(a.get("web_search_calls", 0) or 0) for a in attempts)
-                    web_search_calls_query = sum(int(a.get("web_search_calls_query", 0) or 0) for a in attempts)
-                    web_search_calls_open = sum(int(a.get("web_search_calls_open", 0) or 0) for a in attempts)
-                    web_search_calls_unknown = sum(int(a.get("web_search_calls_unknown", 0) or 0) for a in attempts)
-                    web_search_tool_calls_total = sum(int(a.get("web_search_tool_calls_total", 0) or 0) for a in attempts)
-
-                    # Aggregate usage + token cost across attempts.
-                    usage_input_tokens = sum(int(a["usage"].input_tokens) for a in attempts)
-                    usage_output_tokens = sum(int(a["usage"].output_tokens) for a in attempts)
-                    usage_total_tokens = sum(int(a["usage"].total_tokens) for a in attempts)
-                    cached_tokens = sum(
-                        int(getattr(getattr(a["usage"], "input_tokens_details", None), "cached_tokens", 0) or 0)
-                        for a in attempts
-                    )
-                    reasoning_tokens = sum(
-                        int(getattr(getattr(a["usage"], "output_tokens_details", None), "reasoning_tokens", 0) or 0)
-                        for a in attempts
-                    )
-                    token_cost_usd_raw = sum(compute_cost_usd(a["usage"], pricing) for a in attempts)
-                    token_cost_usd = (token_cost_usd_raw * flex_discount) if apply_flex_discount else token_cost_usd_raw
-
-                    # Flex stats (if available) are best-effort aggregates (debug path only).
-                    flex_attempts = sum(int((a.get("flex_meta") or {}).get("attempts", 0) or 0) for a in attempts)
-                    flex_retries = sum(int((a.get("flex_meta") or {}).get("retries", 0) or 0) for a in attempts)
-                    flex_sleep = sum(
-                        float((a.get("flex_meta") or {}).get("sleep_seconds_total", 0.0) or 0.0) for a in attempts
-                    )
-                    flex_fallback_used = any(bool((a.get("flex_meta") or {}).get("fallback_used", False)) for a in attempts)
+                    ws_debug = selected["ws_debug"] if cfg.debug_web_search else None
+
+                    # Aggregate tool usage, tokens, cost and flex stats across attempts in one pass
+                    # (billing happens for every call; flex stats are best-effort, debug path only).
+                    web_search_calls = web_search_calls_query = web_search_calls_open = 0
+                    web_search_calls_unknown = web_search_tool_calls_total = 0
+                    usage_input_tokens = usage_output_tokens = usage_total_tokens = 0
+                    cached_tokens = reasoning_tokens = 0
+                    flex_attempts = flex_retries = 0
+                    flex_sleep = 0.0
+                    flex_fallback_used = False
+                    for a in attempts:
+                        web_search_calls += int(a.get("web_search_calls", 0) or 0)
+                        web_search_calls_query += int(a.get("web_search_calls_query", 0) or 0)
+                        web_search_calls_open += int(a.get("web_search_calls_open", 0) or 0)
+                        web_search_calls_unknown += int(a.get("web_search_calls_unknown", 0) or 0)
+                        web_search_tool_calls_total += int(a.get("web_search_tool_calls_total", 0) or 0)
+                        use = a["usage"]
+                        itd = getattr(use, "input_tokens_details", None)
+                        otd = getattr(use, "output_tokens_details", None)
+                        usage_input_tokens += int(use.input_tokens)
+                        usage_output_tokens += int(use.output_tokens)
+                        usage_total_tokens += int(use.total_tokens)
+                        cached_tokens += int(getattr(itd, "cached_tokens", 0) or 0)
+                        reasoning_tokens += int(getattr(otd, "reasoning_tokens", 0) or 0)
+                        flex_meta = a.get("flex_meta") or {}
+                        if flex_meta:
+                            flex_attempts += int(flex_meta.get("attempts", 0) or 0)
+                            flex_retries += int(flex_meta.get("retries", 0) or 0)
+                            flex_sleep += float(flex_meta.get("sleep_seconds_total", 0.0) or 0.0)
+                            if flex_meta.get("fallback_used"):
+                                flex_fallback_used = True
+                    token_cost_usd_raw = sum(compute_cost_usd_batch([a["usage"] for a in attempts], pricing))
+                    token_cost_usd = token_cost_usd_raw * token_cost_multiplier
             except Exception as e:
-                if not args.continue_on_error:
+                if not cfg.continue_on_error:
                     raise
                 error = f"{type(e).__name__}: {e}"
                 model_result = {
@@ -1066,17 +1416,7 @@ def main() -> int:
                     "signals": [],
                     "reasoning": "",
                 }
-                usage = type(
-                    "_Usage",
-                    (),
-                    {
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "total_tokens": 0,
-                        "input_tokens_details": type("X", (), {"cached_tokens": 0})(),
-                        "output_tokens_details": type("Y", (), {"reasoning_tokens": 0})(),
-                    },
-                )()
+                usage = _ZERO_USAGE
                 web_search_calls = 0
                 url_citations = []
                 ws_debug = {"flex": {"attempts": 0, "retries": 0, "sleep_seconds_total": 0.0, "fallback_used": False}}
@@ -1095,21 +1435,25 @@ def main() -> int:
             signals = model_result.get("signals") or []
             web_search_tool_cost_usd = compute_web_search_tool_cost_usd(web_search_calls, tool_pricing)
             cost_usd = token_cost_usd + web_search_tool_cost_usd
+            # Encoded once for the CSV cells and reused by the JSONL record.
+            signals_json = _dumps_cell(signals)
+            url_citations_json = _dumps_cell(url_citations or [])
 
             record = {
                 "name": name,
                 "website": website,
+                "website_key": _normalize_for_dedupe(website),
                 "shop_presence": shop_presence,
                 "final_platform": final_platform,
                 "other_platform_label": other_platform_label,
                 "confidence": confidence,
                 "evidence_tier": evidence_tier,
-                "signals": signals,
+                "signals": _reuse_cell(signals, signals_json),
                 "reasoning": model_result.get("reasoning"),
-                "url_citations": url_citations,
+                "url_citations": _reuse_cell(url_citations, url_citations_json),
                 "duration_seconds": duration_seconds,
                 "detector": "local" if local_used else "openai",
-                "local_debug": local_debug if (args.local_first or args.local_only) else None,
+                "local_debug": local_debug if (cfg.local_first or cfg.local_only) else None,
                 "cart_check": {
                     "presence": cart_presence,
                     "source": cart_presence_source,
@@ -1129,10 +1473,10 @@ def main() -> int:
                         "blocked_reasons": cart_pw_blocked,
                         "error": cart_pw_error,
                     }
-                    if args.check_functional_shop_playwright
+                    if cfg.check_functional_shop_playwright
                     else None,
                 }
-                if args.check_functional_shop
+                if cfg.check_functional_shop
                 else None,
                 "flex": {
                     "attempts": flex_attempts,
@@ -1156,16 +1500,16 @@ def main() -> int:
                 "web_search_calls_query": int(web_search_calls_query),
                 "web_search_calls_open": int(web_search_calls_open),
                 "web_search_calls_unknown": int(web_search_calls_unknown),
-                "web_search_debug": ws_debug if args.debug_web_search else None,
+                "web_search_debug": ws_debug if cfg.debug_web_search else None,
                 "retry": {"used": bool(retry_used), "selected": retry_selected},
-                "raw": model_result,
             }
+            if not cfg.minimal_jsonl:
+                record["raw"] = model_result
             if include_bucket:
                 record["bucket"] = (r.get(bucket_col) or r.get("bucket") or "").strip()
 
-            sources = url_citations or []
             row_out: Dict[str, Any] = {
-                "run_id": stem,
+                **const_csv,
                 "name": record["name"],
                 "website": record["website"],
                 "shop_presence": shop_presence,
@@ -1174,12 +1518,11 @@ def main() -> int:
                 "input_url": model_result.get("input_url"),
                 "confidence": confidence,
                 "evidence_tier": evidence_tier,
-                "signals_json": json.dumps(signals, ensure_ascii=False),
+                "signals_json": signals_json,
                 "reasoning": model_result.get("reasoning"),
-                "url_citations_json": json.dumps(sources, ensure_ascii=False),
-                "rubric_file": args.rubric_file,
-                "model": ("local" if ("local_used" in locals() and local_used) else args.model),
-                "service_tier": ("local" if ("local_used" in locals() and local_used) else args.service_tier),
+                "url_citations_json": url_citations_json,
+                "model": "local" if local_used else cfg.model,
+                "service_tier": "local" if local_used else cfg.service_tier,
                 "input_tokens": usage_input_tokens,
                 "cached_input_tokens": cached_tokens,
                 "output_tokens": usage_output_tokens,
@@ -1193,10 +1536,6 @@ def main() -> int:
                 "web_search_calls_query": int(web_search_calls_query),
                 "web_search_calls_open": int(web_search_calls_open),
                 "web_search_calls_unknown": int(web_search_calls_unknown),
-                "price_input_per_1m": pricing.input_usd,
-                "price_cached_input_per_1m": pricing.cached_input_usd,
-                "price_output_per_1m": pricing.output_usd,
-                "price_web_search_per_1k": tool_pricing.per_1k_calls_usd,
                 "duration_seconds": round(duration_seconds, 3),
                 "flex_attempts": flex_attempts,
                 "flex_retries": flex_retries,
@@ -1205,22 +1544,22 @@ def main() -> int:
                 "retry_used": int(bool(retry_used)),
                 "retry_selected": retry_selected,
                 "detector": "local" if local_used else "openai",
-                "local_is_sticky": int(bool(local_sticky)) if (args.local_first or args.local_only) else "",
-                "local_sticky_reasons_json": json.dumps(local_sticky_reasons, ensure_ascii=False)
-                if (args.local_first or args.local_only)
+                "local_is_sticky": int(bool(local_sticky)) if (cfg.local_first or cfg.local_only) else "",
+                "local_sticky_reasons_json": _dumps_cell(local_sticky_reasons)
+                if (cfg.local_first or cfg.local_only)
                 else "",
                 "cart_presence": cart_presence,
                 "cart_presence_source": cart_presence_source,
                 "cart_presence_local": cart_local_presence,
                 "cart_presence_playwright": cart_pw_presence,
-                "cart_signals_local_json": json.dumps(cart_local_signals, ensure_ascii=False),
-                "cart_signals_playwright_json": json.dumps(cart_pw_signals, ensure_ascii=False),
-                "cart_checked_urls_local_json": json.dumps(cart_local_checked, ensure_ascii=False),
-                "cart_checked_urls_playwright_json": json.dumps(cart_pw_checked, ensure_ascii=False),
+                "cart_signals_local_json": _dumps_cell(cart_local_signals),
+                "cart_signals_playwright_json": _dumps_cell(cart_pw_signals),
+                "cart_checked_urls_local_json": _dumps_cell(cart_local_checked),
+                "cart_checked_urls_playwright_json": _dumps_cell(cart_pw_checked),
                 "cart_http_status_local": "" if cart_local_http_status is None else int(cart_local_http_status),
                 "cart_http_status_playwright": "" if cart_pw_http_status is None else int(cart_pw_http_status),
-                "cart_blocked_reasons_local_json": json.dumps(cart_local_blocked, ensure_ascii=False),
-                "cart_blocked_reasons_playwright_json": json.dumps(cart_pw_blocked, ensure_ascii=False),
+                "cart_blocked_reasons_local_json": _dumps_cell(cart_local_blocked),
+                "cart_blocked_reasons_playwright_json": _dumps_cell(cart_pw_blocked),
                 "cart_error_local": cart_local_error,
                 "cart_error_playwright": cart_pw_error,
                 "error": error or "",
@@ -1228,45 +1567,57 @@ def main() -> int:
             if include_bucket:
                 row_out["bucket"] = record.get("bucket", "")
 
+            csv_values = csv_row_values(row_out)
+
             with write_lock:
                 if error:
                     completed_err += 1
                 else:
                     completed_ok += 1
 
-                if args.progress_every and ((completed_ok + completed_err) % max(1, args.progress_every) == 0):
+                if cfg.progress_every and ((completed_ok + completed_err) % max(1, cfg.progress_every) == 0):
                     elapsed = time.monotonic() - run_started_at
                     done = completed_ok + completed_err
                     rate = done / elapsed if elapsed > 0 else 0.0
-                    remaining = max(0, total_rows - done)
-                    eta = (remaining / rate) if rate > 0 else float("inf")
+                    eta_part = ""
+                    if total_rows is not None:
+                        remaining = max(0, total_rows - done)
+                        eta = (remaining / rate) if rate > 0 else float("inf")
+                        eta_part = f" eta={eta/60:.1f}m"
                     print(
-                        f"Progress: {done}/{total_rows} (ok={completed_ok}, err={completed_err}) "
-                        f"elapsed={elapsed/60:.1f}m eta={eta/60:.1f}m",
+                        f"Progress: {done}/{total_label} (ok={completed_ok}, err={completed_err}) "
+                        f"elapsed={elapsed/60:.1f}m{eta_part}",
                         flush=True,
                     )
 
-                # JSONL (full raw)
-                out.write(json.dumps(record, ensure_ascii=False) + "\n")
-                out.flush()
+            # JSONL (full raw) + CSV (flattened), serialized and written by the background writer.
+            output.put(record, csv_values)
 
-                # CSV (flattened)
-                writer.writerow(row_out)
-                out_csv.flush()
+            if workers <= 1:
+                time.sleep(max(0.0, cfg.sleep))
 
-            time.sleep(max(0.0, args.sleep))
-
-        workers = max(1, int(args.workers or 1))
-        if workers <= 1:
-            for i, r in enumerate(filtered_rows, start=1):
-                _process_row(i, r)
-        else:
-            futures = []
-            with ThreadPoolExecutor(max_workers=workers) as ex:
-                for i, r in enumerate(filtered_rows, start=1):
-                    futures.append(ex.submit(_process_row, i, r))
-                for fut in as_completed(futures):
-                    fut.result()
+        try:
+            if workers <= 1:
+                for i, r in enumerate(rows, start=1):
+                    _process_row(i, r)
+            else:
+                # Keep a bounded number of rows in flight so the input is consumed as workers free up.
+                in_flight: set = set()
+                with ThreadPoolExecutor(max_workers=workers) as ex:
+                    for i, r in enumerate(rows, start=1):
+                        if len(in_flight) >= 2 * workers:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for fut in done:
+                                fut.result()
+                        in_flight.add(ex.submit(_process_row, i, r))
+                    for fut in as_completed(in_flight):
+                        fut.result()
+        finally:
+            # Drains queued rows before the files close (also when a row raised).
+            output.close()
+
+    if resume_index is not None:
+        resume_index.close()
 
     print(f"\nWrote results (jsonl): {out_path}", flush=True)
     print(f"Wrote results (csv):   {out_csv_path}", flush=True)
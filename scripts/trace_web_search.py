@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
+import functools
 import os
 import random
 import re
@@ -19,6 +19,13 @@ from dotenv import load_dotenv
 from shoptech_eval import evaluate_company_with_usage_and_web_search_debug
 from shoptech_eval.rubric_loader import DEFAULT_RUBRIC_FILE
 
+from scripts._common import (
+    ZERO_USAGE as _ZERO_USAGE,
+    dumps_cell as _dumps_cell,
+    dumps_line as _dumps_line,
+    iter_csv_rows as _iter_csv_rows,
+)
+
 
 def _run_stamp() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -37,33 +44,6 @@ def _suffix_slug(s: str) -> str:
     return "".join(safe).strip("_")
 
 
-def _detect_csv_delimiter(sample: str) -> str:
-    header = ""
-    for line in (sample or "").splitlines():
-        if line.strip():
-            header = line
-            break
-    if header:
-        counts = {d: header.count(d) for d in [",", ";", "\t", "|"]}
-        best = max(counts.items(), key=lambda kv: kv[1])[0]
-        if counts[best] > 0:
-            return best
-    return ","
-
-
-def _iter_csv_rows(path: Path, delimiter: str | None) -> Iterable[Dict[str, str]]:
-    # Use utf-8-sig to handle BOM-prefixed CSV headers.
-    with path.open("r", encoding="utf-8-sig", newline="") as f:
-        delim = (delimiter or "").strip()
-        if not delim:
-            head = f.read(4096)
-            f.seek(0)
-            delim = _detect_csv_delimiter(head)
-        reader = csv.DictReader(f, delimiter=delim)
-        for r in reader:
-            yield r
-
-
 def _iter_url_list(path: Path) -> Iterable[Dict[str, str]]:
     with path.open("r", encoding="utf-8", errors="replace") as f:
         for line in f:
@@ -74,12 +54,17 @@ def _iter_url_list(path: Path) -> Iterable[Dict[str, str]]:
 
 
 def _normalize_for_dedupe(url: str) -> str:
-    u = (url or "").strip()
-    if not u:
-        return ""
-    u = re.sub(r"^https?://", "", u, flags=re.I)
-    u = u.rstrip("/")
-    return u.lower()
+    u = (url or "").strip().lower()
+    if u.startswith("https://"):
+        u = u[8:]
+    elif u.startswith("http://"):
+        u = u[7:]
+    return u.rstrip("/")
+
+
+# action_hint is the stringified action of the call, e.g. "{'type': 'search', 'query': '...'}".
+_QUERY_HINT_RE = re.compile(r"'query'\s*:\s*'([^']+)'")
+_URL_HINT_RE = re.compile(r"'url'\s*:\s*'([^']+)'")
 
 
 def _extract_queries_and_opens(ws_debug: Dict[str, Any]) -> Tuple[List[str], List[str]]:
@@ -98,7 +83,7 @@ def _extract_queries_and_opens(ws_debug: Dict[str, Any]) -> Tuple[List[str], Lis
             else:
                 # Best-effort: query sometimes lives inside action_hint.
                 ah = str(c.get("action_hint") or "")
-                m = re.search(r"'query'\s*:\s*'([^']+)'", ah)
+                m = _QUERY_HINT_RE.search(ah)
                 if m:
                     queries.append(m.group(1))
         elif kind == "open":
@@ -107,12 +92,34 @@ def _extract_queries_and_opens(ws_debug: Dict[str, Any]) -> Tuple[List[str], Lis
                 opens.append(u)
             else:
                 ah = str(c.get("action_hint") or "")
-                m = re.search(r"'url'\s*:\s*'([^']+)'", ah)
+                m = _URL_HINT_RE.search(ah)
                 if m:
                     opens.append(m.group(1))
     return queries, opens
 
 
+# Inputs up to this size are deduped in memory and sampled with random.sample; larger ones stream through
+# the reservoir.
+_SAMPLE_IN_MEMORY_MAX_BYTES = 50 << 20
+
+
+def _sample_unique(
+    rows: Iterable[Dict[str, str]],
+    *,
+    url_column: str,
+    k: int,
+    seed: int,
+) -> List[Dict[str, str]]:
+    unique: List[Dict[str, str]] = []
+    seen: set[str] = set()
+    for r in rows:
+        key = _normalize_for_dedupe(r.get(url_column) or r.get("Website") or "")
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(r)
+    return random.Random(int(seed)).sample(unique, min(k, len(unique)))
+
+
 def _reservoir_sample_unique(
     rows: Iterable[Dict[str, str]],
     *,
@@ -142,6 +149,18 @@ def _reservoir_sample_unique(
     return reservoir
 
 
+# Keep generic: ask for a second query that includes 'impressum', 'gmbh', and a location hint if relevant.
+# This is intentionally light-touch and only used in the tracer (--force-second-query).
+_FORCE_SECOND_QUERY_INSTRUCTIONS = (
+    "DEBUG REQUIREMENT: Perform TWO distinct web searches before scoring.\n"
+    "1) Search using the domain/company name (e.g., '<domain>').\n"
+    "2) Search again using a disambiguation query that adds legal-entity/location hints, e.g. "
+    "'<name> GmbH impressum', '<name> Munich impressum', '<name> HRB'.\n"
+    "If the two searches surface conflicting/similarly-named entities, prefer sources that match the provided domain and "
+    "DACH legal/imprint details; otherwise explicitly note uncertainty."
+)
+
+
 def main() -> int:
     load_dotenv(override=False)
     if hasattr(sys.stdout, "reconfigure"):
@@ -196,7 +215,17 @@ def main() -> int:
     ap.add_argument(
         "--prompt-cache",
         action="store_true",
-        default=(os.environ.get("SHOPTECH_PROMPT_CACHE", "").strip() in ("1", "true", "TRUE", "yes", "YES")),
+        default=(
+            (os.environ["SHOPTECH_PROMPT_CACHE"].strip() in ("1", "true", "TRUE", "yes", "YES"))
+            if os.environ.get("SHOPTECH_PROMPT_CACHE", "").strip()
+            else None
+        ),
+    )
+    ap.add_argument(
+        "--no-prompt-cache",
+        dest="prompt_cache",
+        action="store_false",
+        help="Disable prompt caching (overrides the default/env).",
     )
     ap.add_argument("--prompt-cache-retention", default=os.environ.get("SHOPTECH_PROMPT_CACHE_RETENTION") or None)
     ap.add_argument("--service-tier", default=os.environ.get("SHOPTECH_SERVICE_TIER", "auto"))
@@ -220,12 +249,17 @@ def main() -> int:
         raise SystemExit("input-format must be auto/csv/txt")
 
     if fmt == "csv":
-        rows_iter = _iter_csv_rows(input_path, args.csv_delimiter)
+        rows_iter = _iter_csv_rows(
+            input_path, args.csv_delimiter, columns=(args.url_column, args.name_column, "Website", "Firma")
+        )
     else:
         rows_iter = _iter_url_list(input_path)
 
     k = max(1, int(args.sample))
-    rows = _reservoir_sample_unique(rows_iter, url_column=args.url_column, k=k, seed=int(args.seed))
+    sample_fn = (
+        _sample_unique if input_path.stat().st_size <= _SAMPLE_IN_MEMORY_MAX_BYTES else _reservoir_sample_unique
+    )
+    rows = sample_fn(rows_iter, url_column=args.url_column, k=k, seed=int(args.seed))
     if not rows:
         print("No rows with URL found.", file=sys.stderr)
         return 2
@@ -270,13 +304,31 @@ def main() -> int:
     total_counts: List[int] = []
     durations: List[float] = []
 
-    with out_jsonl.open("w", encoding="utf-8") as jf, out_csv.open("w", encoding="utf-8", newline="") as cf:
-        w = csv.DictWriter(cf, fieldnames=csv_fields, extrasaction="ignore")
-        w.writeheader()
+    # Loop-invariant settings, resolved once instead of read off `args` for every company.
+    url_column, name_column = args.url_column, args.name_column
+    model, service_tier = args.model, args.service_tier
+    max_tool_calls = int(args.max_tool_calls)
+    sleep_seconds = max(0.0, float(args.sleep))
+    trace_one = functools.partial(
+        evaluate_company_with_usage_and_web_search_debug,
+        rubric_file=args.rubric_file,
+        max_tool_calls=args.max_tool_calls,
+        reasoning_effort=args.reasoning_effort,
+        prompt_cache=args.prompt_cache,
+        prompt_cache_retention=args.prompt_cache_retention,
+        service_tier=service_tier,
+        timeout_seconds=args.timeout_seconds,
+        include_sources=bool(args.include_sources),
+        extra_user_instructions=_FORCE_SECOND_QUERY_INSTRUCTIONS if args.force_second_query else None,
+    )
+
+    with out_jsonl.open("wb") as jf, out_csv.open("w", encoding="utf-8", newline="") as cf:
+        w = csv.writer(cf)
+        w.writerow(csv_fields)
 
         for i, r in enumerate(rows, start=1):
-            website = (r.get(args.url_column) or r.get("Website") or "").strip()
-            name = (r.get(args.name_column) or r.get("Firma") or "").strip()
+            website = (r.get(url_column) or r.get("Website") or "").strip()
+            name = (r.get(name_column) or r.get("Firma") or "").strip()
             if not website:
                 continue
 
@@ -284,31 +336,7 @@ def main() -> int:
             t0 = time.monotonic()
             error = None
             try:
-                extra = None
-                if args.force_second_query:
-                    # Keep generic: ask for a second query that includes 'impressum', 'gmbh', and a location hint if relevant.
-                    # This is intentionally light-touch and only used in the tracer.
-                    extra = (
-                        "DEBUG REQUIREMENT: Perform TWO distinct web searches before scoring.\n"
-                        "1) Search using the domain/company name (e.g., '<domain>').\n"
-                        "2) Search again using a disambiguation query that adds legal-entity/location hints, e.g. "
-                        "'<name> GmbH impressum', '<name> Munich impressum', '<name> HRB'.\n"
-                        "If the two searches surface conflicting/similarly-named entities, prefer sources that match the provided domain and "
-                        "DACH legal/imprint details; otherwise explicitly note uncertainty."
-                    )
-                result, usage, ws_debug = evaluate_company_with_usage_and_web_search_debug(
-                    website,
-                    args.model,
-                    rubric_file=args.rubric_file,
-                    max_tool_calls=args.max_tool_calls,
-                    reasoning_effort=args.reasoning_effort,
-                    prompt_cache=args.prompt_cache,
-                    prompt_cache_retention=args.prompt_cache_retention,
-                    service_tier=args.service_tier,
-                    timeout_seconds=args.timeout_seconds,
-                    include_sources=bool(args.include_sources),
-                    extra_user_instructions=extra,
-                )
+                result, usage, ws_debug = trace_one(website, model)
             except Exception as e:
                 error = f"{type(e).__name__}: {e}"
                 result = {
@@ -319,17 +347,7 @@ def main() -> int:
                     "signals": [],
                     "reasoning": "",
                 }
-                usage = type(
-                    "_Usage",
-                    (),
-                    {
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "total_tokens": 0,
-                        "input_tokens_details": type("X", (), {"cached_tokens": 0})(),
-                        "output_tokens_details": type("Y", (), {"reasoning_tokens": 0})(),
-                    },
-                )()
+                usage = _ZERO_USAGE
                 ws_debug = {"completed": 0, "by_kind_completed": {}, "calls": []}
 
             dt = time.monotonic() - t0
@@ -351,9 +369,9 @@ def main() -> int:
                 "run_id": stem,
                 "website": website,
                 "name": name,
-                "model": args.model,
-                "service_tier": args.service_tier,
-                "max_tool_calls": int(args.max_tool_calls),
+                "model": model,
+                "service_tier": service_tier,
+                "max_tool_calls": max_tool_calls,
                 "duration_seconds": dt,
                 "web_search_debug": ws_debug,
                 "queries": queries,
@@ -368,39 +386,41 @@ def main() -> int:
                 },
                 "error": error,
             }
-            jf.write(json.dumps(record, ensure_ascii=False) + "\n")
+            jf.write(_dumps_line(record))
             jf.flush()
 
+            u = record["usage"]
+            # Values in csv_fields order.
             w.writerow(
-                {
-                    "run_id": stem,
-                    "website": website,
-                    "name": name,
-                    "model": args.model,
-                    "service_tier": args.service_tier,
-                    "max_tool_calls": int(args.max_tool_calls),
-                    "duration_seconds": round(dt, 3),
-                    "tool_calls_total": total,
-                    "query_calls": qn,
-                    "open_calls": on,
-                    "unknown_calls": un,
-                    "queries_json": json.dumps(queries, ensure_ascii=False),
-                    "opens_json": json.dumps(opens, ensure_ascii=False),
-                    "final_platform": result.get("final_platform"),
-                    "confidence": result.get("confidence"),
-                    "evidence_tier": result.get("evidence_tier"),
-                    "signals_json": json.dumps(result.get("signals") or [], ensure_ascii=False),
-                    "reasoning": result.get("reasoning"),
-                    "input_tokens": record["usage"]["input_tokens"],
-                    "cached_input_tokens": record["usage"]["cached_input_tokens"],
-                    "output_tokens": record["usage"]["output_tokens"],
-                    "reasoning_tokens": record["usage"]["reasoning_tokens"],
-                    "total_tokens": record["usage"]["total_tokens"],
-                    "error": error or "",
-                }
+                (
+                    stem,
+                    website,
+                    name,
+                    model,
+                    service_tier,
+                    max_tool_calls,
+                    round(dt, 3),
+                    total,
+                    qn,
+                    on,
+                    un,
+                    _dumps_cell(queries),
+                    _dumps_cell(opens),
+                    result.get("final_platform"),
+                    result.get("confidence"),
+                    result.get("evidence_tier"),
+                    _dumps_cell(result.get("signals") or []),
+                    result.get("reasoning"),
+                    u["input_tokens"],
+                    u["cached_input_tokens"],
+                    u["output_tokens"],
+                    u["reasoning_tokens"],
+                    u["total_tokens"],
+                    error or "",
+                )
             )
             cf.flush()
-            time.sleep(max(0.0, float(args.sleep)))
+            time.sleep(sleep_seconds)
 
     # Summary
     print(f"\nWrote trace JSONL: {out_jsonl}", flush=True)
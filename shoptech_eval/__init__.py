@@ -1,17 +1,29 @@
 __all__ = [
+    "DiskCache",
+    "EvalOptions",
+    "NullCache",
     "evaluate_company",
     "evaluate_company_with_usage",
     "evaluate_company_with_usage_and_web_search_calls",
     "evaluate_company_with_usage_and_web_search_debug",
     "evaluate_company_with_usage_and_web_search_artifacts",
+    "evaluate_companies_async",
+    "aevaluate_company_with_usage_and_web_search_debug",
+    "new_async_client",
 ]
 
+from .result_cache import DiskCache
 from .evaluator import (
+    EvalOptions,
+    NullCache,
     evaluate_company,
     evaluate_company_with_usage,
     evaluate_company_with_usage_and_web_search_calls,
     evaluate_company_with_usage_and_web_search_debug,
     evaluate_company_with_usage_and_web_search_artifacts,
+    evaluate_companies_async,
+    aevaluate_company_with_usage_and_web_search_debug,
+    new_async_client,
 )
 
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Iterable, List, Optional
 
 from openai.types.responses.response_usage import ResponseUsage
 
@@ -25,12 +25,25 @@ class GeminiPricing:
     search_usd_per_1k: float = 35.00
 
 
-def compute_cost_usd(usage: ResponseUsage, pricing: PricingPer1M) -> float:
-    """Compute USD cost from token usage using per-1M token pricing."""
-    cached = int(getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0) or 0)
-    input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
-    output_tokens = int(getattr(usage, "output_tokens", 0) or 0)
-
+def _token_counts(usage: Any) -> tuple[int, int, int]:
+    """Returns (input_tokens, cached_input_tokens, output_tokens)."""
+    # Fast path: ResponseUsage (and our zero-usage stand-ins) expose these fields directly as ints.
+    try:
+        input_tokens = usage.input_tokens or 0
+        output_tokens = usage.output_tokens or 0
+    except AttributeError:
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+    try:
+        cached = usage.input_tokens_details.cached_tokens or 0
+    except AttributeError:
+        cached = 0
+    if type(input_tokens) is int and type(cached) is int and type(output_tokens) is int:
+        return input_tokens, cached, output_tokens
+    return int(input_tokens), int(cached), int(output_tokens)
+
+
+def _cost_from_counts(input_tokens: int, cached: int, output_tokens: int, pricing: PricingPer1M) -> float:
     non_cached = max(0, input_tokens - cached)
     return (
         (non_cached / 1_000_000.0) * pricing.input_usd
@@ -39,6 +52,19 @@ def compute_cost_usd(usage: ResponseUsage, pricing: PricingPer1M) -> float:
     )
 
 
+def compute_cost_usd(usage: ResponseUsage, pricing: PricingPer1M) -> float:
+    """Compute USD cost from token usage using per-1M token pricing."""
+    return _cost_from_counts(*_token_counts(usage), pricing)
+
+
+def compute_cost_usd_batch(usages: Iterable[Any], pricing: PricingPer1M) -> List[float]:
+    """Per-item USD costs for many usages (e.g. all attempts/companies of a run) in one pass.
+
+    Same formula as `compute_cost_usd`; sum the result for a total.
+    """
+    return [_cost_from_counts(*_token_counts(u), pricing) for u in usages]
+
+
 def compute_web_search_tool_cost_usd(web_search_calls: int, pricing: WebSearchPricing) -> float:
     calls = max(0, int(web_search_calls))
     return calls * (pricing.per_1k_calls_usd / 1000.0)
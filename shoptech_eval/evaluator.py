@@ -1,14 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import email.utils
+import functools
+import importlib.util
 import json
+import re
+import threading
 import time
-from typing import Any, Dict
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Callable, Dict, Iterable
+from urllib.parse import urlsplit
 import random
 
-from openai import OpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
 from openai.types.responses.response_usage import ResponseUsage
 import hashlib
 
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover (optional speedup)
+    _orjson = None
+
 from .rubric_loader import load_rubric_text
 from .schema import OUTPUT_SCHEMA_WITH_SOURCES, json_schema_text_config
 
@@ -43,120 +57,139 @@ Attribution discipline:
 """
 
 
+# Prompt caching only kicks in once the shared prefix reaches ~1024 tokens (~4KB of text).
+_PROMPT_CACHE_MIN_CHARS = 4096
+_DEFAULT_PROMPT_CACHE_RETENTION = "24h"
+
+
+def _http_client_kwargs() -> Dict[str, Any]:
+    """Connection-pool tuning for long runs: bigger keep-alive pool, HTTP/2 when the optional `h2` package is installed."""
+    try:
+        import httpx
+    except Exception:  # pragma: no cover (SDK transport differs)
+        return {}
+    return {
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(max_connections=128, max_keepalive_connections=64, keepalive_expiry=60.0),
+    }
+
+
+_CLIENT_LOCK = threading.Lock()
+_CLIENT: Any = None
+
+
+def _get_client() -> Any:
+    """Return a process-wide OpenAI client so keep-alive connections are reused across companies.
+
+    Created lazily, since OPENAI_API_KEY may be loaded after import.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            http_kwargs = _http_client_kwargs()
+            _CLIENT = OpenAI(http_client=DefaultHttpxClient(**http_kwargs)) if http_kwargs else OpenAI()
+        return _CLIENT
+
+
+@functools.lru_cache(maxsize=32)
+def _build_system_prompt(rubric_file: str | None) -> tuple[str, str, str]:
+    """Returns (system_prompt, prompt_cache_key, rubric_path).
+
+    The rubric is static across a run, so the file read and SHA-256 digest are done once per rubric file.
+    The cache key only depends on the system prompt, so every URL (and retry) with the same rubric shares one slot.
+    """
+    rubric_path, rubric_text = load_rubric_text(rubric_file)
+    system_prompt = f"{BASE_SYSTEM_PROMPT}\n\nRubric file: {rubric_path}\n\n{rubric_text}\n"
+    h = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
+    return system_prompt, f"shoptech:{h}", rubric_path
+
+
+def _iter_output_texts(resp: Any) -> Iterable[str]:
+    for item in getattr(resp, "output", None) or ():
+        for c in getattr(item, "content", None) or ():
+            t = getattr(c, "text", None)
+            if isinstance(t, str) and t and not t.isspace():
+                yield t
+
+
 def _extract_json_text(resp: Any) -> str:
-    if hasattr(resp, "output_text") and isinstance(resp.output_text, str) and resp.output_text.strip():
-        return resp.output_text
+    text = getattr(resp, "output_text", None)
+    if isinstance(text, str) and text and not text.isspace():
+        return text
 
+    # Typical responses carry a single text part: return it without building a list or joining.
     try:
-        parts = []
-        for item in getattr(resp, "output", []) or []:
-            for c in getattr(item, "content", []) or []:
-                t = getattr(c, "text", None)
-                if isinstance(t, str) and t.strip():
-                    parts.append(t)
-        if parts:
-            return "\n".join(parts)
+        parts = _iter_output_texts(resp)
+        first = next(parts, None)
+        if first is not None:
+            rest = list(parts)
+            return "\n".join((first, *rest)) if rest else first
     except Exception:
         pass
 
     raise RuntimeError("Could not extract text output from OpenAI response.")
 
 
-def evaluate_company(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    second_query_on_uncertainty: bool = False,
-) -> Dict[str, Any]:
-    result, _usage, _web_search_calls = _evaluate_company_raw(
-        url,
-        model,
-        rubric_file=rubric_file,
-        max_tool_calls=max_tool_calls,
-        reasoning_effort=reasoning_effort,
-        prompt_cache=prompt_cache,
-        prompt_cache_retention=prompt_cache_retention,
-        service_tier=service_tier,
-        timeout_seconds=timeout_seconds,
-        flex_max_retries=flex_max_retries,
-        flex_fallback_to_auto=flex_fallback_to_auto,
-        second_query_on_uncertainty=second_query_on_uncertainty,
-    )
+class NullCache:
+    """Result cache that never hits; any object with the same `get`/`set` shape (e.g. `diskcache.Cache`) can replace it."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return default
+
+    def set(self, key: str, value: Any) -> None:
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class EvalOptions:
+    """Per-call evaluation settings (the keyword arguments accepted by every `evaluate_company*` wrapper)."""
+
+    rubric_file: str | None = None
+    max_tool_calls: int | None = None
+    reasoning_effort: str | None = None
+    prompt_cache: bool | None = None
+    prompt_cache_retention: str | None = None
+    service_tier: str | None = None
+    timeout_seconds: float | None = None
+    flex_max_retries: int | None = None
+    flex_fallback_to_auto: bool | None = None
+    include_sources: bool = False
+    extra_user_instructions: str | None = None
+    second_query_on_uncertainty: bool = False
+    stream: bool = False
+    # Result-cache lookups key on the site (host without www., no path/query) so URL variants share one entry.
+    cache_by_site: bool = False
+    # With stream=True: called with each output_text delta as it arrives (e.g. to act on early fields).
+    on_text_delta: Callable[[str], None] | None = field(default=None, compare=False)
+    # Full-response reuse across runs, keyed by _result_cache_key(); see NullCache for the interface.
+    result_cache: Any = field(default_factory=NullCache, compare=False)
+
+
+def _resolve_options(options: EvalOptions | None, kwargs: Dict[str, Any]) -> EvalOptions:
+    # Unknown keyword arguments raise TypeError, same as the explicit signatures did.
+    if options is None:
+        return EvalOptions(**kwargs)
+    return replace(options, **kwargs) if kwargs else options
+
+
+def evaluate_company(url: str, model: str, *, options: EvalOptions | None = None, **kwargs: Any) -> Dict[str, Any]:
+    result, _usage, _ws_stats = _evaluate_company_raw(url, model, _resolve_options(options, kwargs), need_debug=False)
     return result
 
 
 def evaluate_company_with_usage(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    second_query_on_uncertainty: bool = False,
+    url: str, model: str, *, options: EvalOptions | None = None, **kwargs: Any
 ) -> tuple[Dict[str, Any], ResponseUsage]:
-    result, usage, _web_search_calls = _evaluate_company_raw(
-        url,
-        model,
-        rubric_file=rubric_file,
-        max_tool_calls=max_tool_calls,
-        reasoning_effort=reasoning_effort,
-        prompt_cache=prompt_cache,
-        prompt_cache_retention=prompt_cache_retention,
-        service_tier=service_tier,
-        timeout_seconds=timeout_seconds,
-        flex_max_retries=flex_max_retries,
-        flex_fallback_to_auto=flex_fallback_to_auto,
-        second_query_on_uncertainty=second_query_on_uncertainty,
-    )
+    result, usage, _ws_stats = _evaluate_company_raw(url, model, _resolve_options(options, kwargs), need_debug=False)
     if usage is None:
         raise RuntimeError("OpenAI response did not include usage; cannot compute cost.")
     return result, usage
 
 
 def evaluate_company_with_usage_and_web_search_calls(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    second_query_on_uncertainty: bool = False,
+    url: str, model: str, *, options: EvalOptions | None = None, **kwargs: Any
 ) -> tuple[Dict[str, Any], ResponseUsage, int]:
-    result, usage, ws_stats = _evaluate_company_raw(
-        url,
-        model,
-        rubric_file=rubric_file,
-        max_tool_calls=max_tool_calls,
-        reasoning_effort=reasoning_effort,
-        prompt_cache=prompt_cache,
-        prompt_cache_retention=prompt_cache_retention,
-        service_tier=service_tier,
-        timeout_seconds=timeout_seconds,
-        flex_max_retries=flex_max_retries,
-        flex_fallback_to_auto=flex_fallback_to_auto,
-        second_query_on_uncertainty=second_query_on_uncertainty,
-    )
+    result, usage, ws_stats = _evaluate_company_raw(url, model, _resolve_options(options, kwargs))
     if usage is None:
         raise RuntimeError("OpenAI response did not include usage; cannot compute cost.")
     return result, usage, _billable_web_search_calls(ws_stats)
@@ -189,117 +222,166 @@ def _billable_web_search_calls(ws_stats: Dict[str, Any]) -> int:
         return 0
 
 
-def _web_search_call_debug(resp: Any) -> Dict[str, Any]:
-    """Extract debug info about web search tool usage from a Responses API response."""
-    output = getattr(resp, "output", []) or []
-    output_item_types = [getattr(it, "type", None) for it in output]
+_CALL_FIELDS = ("id", "type", "status", "query", "url", "input", "arguments", "action", "name")
+
 
-    def _safe_model_dump(obj: Any) -> Dict[str, Any]:
-        if obj is None:
+def _safe_model_dump(obj: Any) -> Dict[str, Any]:
+    if obj is None:
+        return {}
+    if isinstance(obj, dict):
+        return obj
+    md = getattr(obj, "model_dump", None)
+    if callable(md):
+        try:
+            d = md()
+            return d if isinstance(d, dict) else {}
+        except Exception:
             return {}
-        if isinstance(obj, dict):
-            return obj
-        md = getattr(obj, "model_dump", None)
-        if callable(md):
-            try:
-                d = md()
-                return d if isinstance(d, dict) else {}
-            except Exception:
-                return {}
-        # Fall back to shallow attribute extraction for likely fields.
-        out: Dict[str, Any] = {}
-        for k in ("id", "type", "status", "query", "url", "input", "arguments", "action", "name"):
+    # Fall back to shallow attribute extraction for likely fields.
+    out: Dict[str, Any] = {}
+    for k in _CALL_FIELDS:
+        try:
+            v = getattr(obj, k, None)
+        except Exception:
+            v = None
+        if v is not None:
+            out[k] = v
+    return out
+
+
+def _call_fields(it: Any) -> Dict[str, Any]:
+    """Read the handful of fields we need from a web_search_call without a full recursive model_dump()."""
+    raw: Dict[str, Any] = {}
+    if not isinstance(it, dict):
+        for k in _CALL_FIELDS:
             try:
-                v = getattr(obj, k, None)
+                v = getattr(it, k, None)
             except Exception:
                 v = None
             if v is not None:
-                out[k] = v
-        return out
-
-    def _classify_call(it: Any) -> Dict[str, Any]:
-        """Best-effort classification of a web_search_call as query vs open/visit."""
-        raw = _safe_model_dump(it)
-
-        # Try common shapes: top-level query/url, or nested under input/arguments.
-        action = raw.get("action") or raw.get("name") or ""
-        inp = raw.get("input") or raw.get("arguments") or {}
-        if not isinstance(inp, dict):
-            inp = {}
-
-        query = raw.get("query") or inp.get("query") or inp.get("q") or inp.get("search_query") or inp.get("searchTerm")
-        url = raw.get("url") or inp.get("url") or inp.get("link") or inp.get("target_url")
-
-        # Normalize action string.
-        action_s = str(action or "").strip().lower()
-
-        kind = "unknown"
-        if isinstance(query, str) and query.strip():
-            kind = "query"
-        elif isinstance(url, str) and url.strip():
-            kind = "open"
-        else:
-            # Heuristics: action/name hints.
-            if any(tok in action_s for tok in ("search", "query")):
-                kind = "query"
-            elif any(tok in action_s for tok in ("open", "visit", "fetch", "browse")):
-                kind = "open"
-
-        # Only include compact, useful fields.
-        out: Dict[str, Any] = {
-            "id": getattr(it, "id", None),
-            "status": getattr(it, "status", None) or "unknown",
-            "kind": kind,
-        }
-        if isinstance(query, str) and query.strip():
-            out["query"] = query.strip()
-        if isinstance(url, str) and url.strip():
-            out["url"] = url.strip()
-        if action_s:
-            out["action_hint"] = action_s
-        return out
-
-    def _extract_url_citations() -> list[dict[str, str]]:
-        citations: list[dict[str, str]] = []
-        seen: set[str] = set()
-        for item in output:
-            if getattr(item, "type", None) != "message":
-                continue
-            for c in getattr(item, "content", []) or []:
-                anns = getattr(c, "annotations", None) or []
-                for ann in anns:
-                    ann_type = getattr(ann, "type", None)
-                    if ann_type != "url_citation":
-                        continue
-                    uc = getattr(ann, "url_citation", None)
-                    url = getattr(uc, "url", None) if uc is not None else None
-                    title = getattr(uc, "title", None) if uc is not None else None
-                    if isinstance(url, str) and url and url not in seen:
-                        citations.append({"url": url, "title": title or ""})
-                        seen.add(url)
-        return citations
+                raw[k] = v
+    if not raw:
+        return _safe_model_dump(it)
+    # Nested SDK objects (e.g. action={type, query}) are small; dump them so downstream sees plain dicts.
+    for k in ("action", "input", "arguments"):
+        v = raw.get(k)
+        if v is not None and not isinstance(v, (dict, str)):
+            raw[k] = _safe_model_dump(v)
+    return raw
+
+
+# Action/name hint substring -> kind. Ordered: query tokens win over open tokens.
+_ACTION_KIND_MAP = {
+    "search": "query",
+    "query": "query",
+    "open": "open",
+    "visit": "open",
+    "fetch": "open",
+    "browse": "open",
+}
+_INPUT_QUERY_KEYS = ("query", "q", "search_query", "searchTerm")
+_INPUT_URL_KEYS = ("url", "link", "target_url")
+
+
+def _first_nonempty(d: Dict[str, Any], keys: tuple[str, ...]) -> Any:
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
+
+
+def _kind_from_action_hint(action_s: str) -> str:
+    # Heuristics: action/name hints (only needed when no query/url was found).
+    if action_s:
+        for tok, kind in _ACTION_KIND_MAP.items():
+            if tok in action_s:
+                return kind
+    return "unknown"
+
+
+def _classify_call(it: Any) -> Dict[str, Any]:
+    """Best-effort classification of a web_search_call as query vs open/visit."""
+    raw = _call_fields(it)
+
+    # Try common shapes: top-level query/url, or nested under input/arguments.
+    action = raw.get("action") or raw.get("name") or ""
+    inp = raw.get("input") or raw.get("arguments") or {}
+    if not isinstance(inp, dict):
+        inp = {}
+
+    query = raw.get("query") or _first_nonempty(inp, _INPUT_QUERY_KEYS)
+    url = raw.get("url") or _first_nonempty(inp, _INPUT_URL_KEYS)
+    query_s = query.strip() if isinstance(query, str) else ""
+    url_s = url.strip() if isinstance(url, str) else ""
+
+    # Normalize action string (kept as action_hint for downstream tooling).
+    action_s = str(action).strip().lower() if action else ""
+
+    if query_s:
+        kind = "query"
+    elif url_s:
+        kind = "open"
+    else:
+        kind = _kind_from_action_hint(action_s)
+
+    # Only include compact, useful fields.
+    out: Dict[str, Any] = {
+        "id": getattr(it, "id", None),
+        "status": getattr(it, "status", None) or "unknown",
+        "kind": kind,
+    }
+    if query_s:
+        out["query"] = query_s
+    if url_s:
+        out["url"] = url_s
+    if action_s:
+        out["action_hint"] = action_s
+    return out
+
 
+def _web_search_call_debug(resp: Any) -> Dict[str, Any]:
+    """Extract debug info about web search tool usage from a Responses API response (single pass over output)."""
+    output = getattr(resp, "output", []) or []
+
+    output_item_types: list[Any] = []
     calls = []
     by_status: Dict[str, int] = {}
     by_kind: Dict[str, int] = {}
     by_kind_completed: Dict[str, int] = {}
     total = 0
     completed = 0
+    # url -> title; dict insertion order keeps first-seen citation order.
+    citations: Dict[str, str] = {}
 
     for it in output:
-        if getattr(it, "type", None) != "web_search_call":
-            continue
-        total += 1
-        status = getattr(it, "status", None) or "unknown"
-        by_status[status] = by_status.get(status, 0) + 1
-        if status == "completed":
-            completed += 1
-        c = _classify_call(it)
-        kind = c.get("kind") or "unknown"
-        by_kind[str(kind)] = by_kind.get(str(kind), 0) + 1
-        if status == "completed":
-            by_kind_completed[str(kind)] = by_kind_completed.get(str(kind), 0) + 1
-        calls.append(c)
+        it_type = getattr(it, "type", None)
+        output_item_types.append(it_type)
+
+        if it_type == "web_search_call":
+            total += 1
+            status = getattr(it, "status", None) or "unknown"
+            by_status[status] = by_status.get(status, 0) + 1
+            if status == "completed":
+                completed += 1
+            c = _classify_call(it)
+            kind = c.get("kind") or "unknown"
+            by_kind[str(kind)] = by_kind.get(str(kind), 0) + 1
+            if status == "completed":
+                by_kind_completed[str(kind)] = by_kind_completed.get(str(kind), 0) + 1
+            calls.append(c)
+        elif it_type == "message":
+            for c in getattr(it, "content", []) or []:
+                anns = getattr(c, "annotations", None) or []
+                for ann in anns:
+                    ann_type = getattr(ann, "type", None)
+                    if ann_type != "url_citation":
+                        continue
+                    uc = getattr(ann, "url_citation", None)
+                    url = getattr(uc, "url", None) if uc is not None else None
+                    title = getattr(uc, "title", None) if uc is not None else None
+                    if isinstance(url, str) and url:
+                        citations.setdefault(url, title or "")
 
     return {
         "output_item_types": output_item_types,
@@ -309,63 +391,22 @@ def _web_search_call_debug(resp: Any) -> Dict[str, Any]:
         "by_kind": by_kind,
         "by_kind_completed": by_kind_completed,
         "calls": calls,
-        "url_citations": _extract_url_citations(),
+        "url_citations": [{"url": u, "title": t} for u, t in citations.items()],
     }
 
 
 def evaluate_company_with_usage_and_web_search_debug(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    include_sources: bool = False,
-    extra_user_instructions: str | None = None,
-    second_query_on_uncertainty: bool = False,
+    url: str, model: str, *, options: EvalOptions | None = None, **kwargs: Any
 ) -> tuple[Dict[str, Any], ResponseUsage, Dict[str, Any]]:
     """Returns model JSON + usage + debug info about web_search_call items."""
-    result, usage, ws_stats = _evaluate_company_raw(
-        url,
-        model,
-        rubric_file=rubric_file,
-        max_tool_calls=max_tool_calls,
-        reasoning_effort=reasoning_effort,
-        prompt_cache=prompt_cache,
-        prompt_cache_retention=prompt_cache_retention,
-        service_tier=service_tier,
-        timeout_seconds=timeout_seconds,
-        flex_max_retries=flex_max_retries,
-        flex_fallback_to_auto=flex_fallback_to_auto,
-        include_sources=include_sources,
-        extra_user_instructions=extra_user_instructions,
-        second_query_on_uncertainty=second_query_on_uncertainty,
-    )
+    result, usage, ws_stats = _evaluate_company_raw(url, model, _resolve_options(options, kwargs))
     if usage is None:
         raise RuntimeError("OpenAI response did not include usage; cannot compute cost.")
     return result, usage, ws_stats
 
 
 def evaluate_company_with_usage_and_web_search_artifacts(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    second_query_on_uncertainty: bool = False,
+    url: str, model: str, *, options: EvalOptions | None = None, **kwargs: Any
 ) -> tuple[Dict[str, Any], ResponseUsage, int, list[dict[str, str]]]:
     """
     Returns:
@@ -374,20 +415,7 @@ def evaluate_company_with_usage_and_web_search_artifacts(
     - billable web search tool calls (query-type)
     - URL citations extracted from response annotations (when available)
     """
-    result, usage, ws_stats = _evaluate_company_raw(
-        url,
-        model,
-        rubric_file=rubric_file,
-        max_tool_calls=max_tool_calls,
-        reasoning_effort=reasoning_effort,
-        prompt_cache=prompt_cache,
-        prompt_cache_retention=prompt_cache_retention,
-        service_tier=service_tier,
-        timeout_seconds=timeout_seconds,
-        flex_max_retries=flex_max_retries,
-        flex_fallback_to_auto=flex_fallback_to_auto,
-        second_query_on_uncertainty=second_query_on_uncertainty,
-    )
+    result, usage, ws_stats = _evaluate_company_raw(url, model, _resolve_options(options, kwargs))
     if usage is None:
         raise RuntimeError("OpenAI response did not include usage; cannot compute cost.")
     web_search_calls = _billable_web_search_calls(ws_stats)
@@ -402,87 +430,86 @@ def _normalize_service_tier(service_tier: str | None) -> str | None:
     return st
 
 
-def _is_resource_unavailable_429(exc: Exception) -> bool:
-    # Flex may return 429 "Resource Unavailable" (not charged).
+def _status_code(exc: Exception) -> Any:
     status = getattr(exc, "status_code", None)
     if status is None:
         resp = getattr(exc, "response", None)
         status = getattr(resp, "status_code", None)
-    if status != 429:
+    return status
+
+
+def _short_message(exc: Exception) -> str:
+    # SDK errors carry a short `.message`; str(exc) can embed whole response bodies, so cap it.
+    msg = getattr(exc, "message", None)
+    if not isinstance(msg, str):
+        msg = str(exc)
+    return msg[:512].lower()
+
+
+def _is_resource_unavailable_429(exc: Exception) -> bool:
+    # Flex may return 429 "Resource Unavailable" (not charged).
+    if _status_code(exc) != 429:
         return False
-    msg = str(exc).lower()
-    return "resource unavailable" in msg
+    return "resource unavailable" in _short_message(exc)
 
 
 def _is_prompt_cache_retention_unsupported_400(exc: Exception) -> bool:
-    status = getattr(exc, "status_code", None)
-    if status is None:
-        resp = getattr(exc, "response", None)
-        status = getattr(resp, "status_code", None)
-    if status != 400:
+    if _status_code(exc) != 400:
         return False
-    msg = str(exc).lower()
+    msg = _short_message(exc)
     return "prompt_cache_retention" in msg and "not supported" in msg
 
 
-def _evaluate_company_raw(
-    url: str,
-    model: str,
-    *,
-    rubric_file: str | None = None,
-    max_tool_calls: int | None = None,
-    reasoning_effort: str | None = None,
-    prompt_cache: bool | None = None,
-    prompt_cache_retention: str | None = None,
-    service_tier: str | None = None,
-    timeout_seconds: float | None = None,
-    flex_max_retries: int | None = None,
-    flex_fallback_to_auto: bool | None = None,
-    include_sources: bool = False,
-    extra_user_instructions: str | None = None,
-    second_query_on_uncertainty: bool = False,
-) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
-    client = OpenAI()
-    rubric_path, rubric_text = load_rubric_text(rubric_file)
-    system_prompt = f"{BASE_SYSTEM_PROMPT}\n\nRubric file: {rubric_path}\n\n{rubric_text}\n"
+# Models seen rejecting prompt_cache_retention; later requests omit it instead of repeating the 400 round-trip.
+_MODELS_WITHOUT_RETENTION: set[str] = set()
 
-    normalized_url = url.strip()
-    if normalized_url and not normalized_url.lower().startswith(("http://", "https://")):
-        normalized_url = f"https://{normalized_url}"
 
-    # Put dynamic content (URL) at the end so more of the prompt prefix can be cached.
+# Invariant request parts: shared (read-only) across calls.
+_WEB_SEARCH_TOOLS = [{"type": "web_search_preview"}]
+_TEXT_CFG_DEFAULT = json_schema_text_config()
+_TEXT_CFG_WITH_SOURCES = json_schema_text_config(schema=OUTPUT_SCHEMA_WITH_SOURCES)
+
+_SOURCES_INSTRUCTION = (
+    "- Include a short sources list in JSON under key `sources` (max 8 items).\n"
+    "  - Each item: {url, title (optional), note (very short)}.\n"
+    "  - URLs are allowed ONLY inside `sources`, not in `reasoning`.\n"
+)
+
+# Production-safe toggle: do NOT force a second search, but allow it for sticky cases.
+_SECOND_QUERY_BLOCK = (
+    "\nExtra instructions:\n"
+    "- Default to ONE web search query.\n"
+    "- If (and only if) the first query does NOT yield trustworthy platform evidence for the provided domain "
+    "(e.g., domain is blocked/parked, results are about other domains/entities, or evidence conflicts), "
+    "you SHOULD run exactly ONE additional query focused on platform detection for that domain.\n"
+    "- Do NOT use a second query just to gather extra detail when the platform is already clear.\n"
+    "- Do not use more than two queries total.\n"
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _extra_instruction_block(second_query_on_uncertainty: bool, extra_user_instructions: str | None) -> str:
+    if extra_user_instructions and extra_user_instructions.strip():
+        return f"\nExtra instructions (debug):\n{extra_user_instructions.strip()}\n"
+    if second_query_on_uncertainty:
+        return _SECOND_QUERY_BLOCK
+    return ""
+
+
+@functools.lru_cache(maxsize=64)
+def _user_prompt_head(max_tool_calls: int | None, include_sources: bool, extra_instruction_block: str) -> str:
+    """Everything in the user prompt except the trailing URL line (invariant across URLs in a run).
+
+    Per-call knobs (tool budget, extra instructions) go after the fixed instructions, so a retry with
+    different knobs still shares the system prompt + fixed instructions as its cached prefix.
+    """
     tool_budget_line = (
         f"- Tool-call budget: you can make at most {max_tool_calls} web search tool call(s). Use them wisely.\n"
         if max_tool_calls is not None
         else ""
     )
-
-    sources_instruction = ""
-    text_cfg = json_schema_text_config()
-    if include_sources:
-        sources_instruction = (
-            "- Include a short sources list in JSON under key `sources` (max 8 items).\n"
-            "  - Each item: {url, title (optional), note (very short)}.\n"
-            "  - URLs are allowed ONLY inside `sources`, not in `reasoning`.\n"
-        )
-        text_cfg = json_schema_text_config(schema=OUTPUT_SCHEMA_WITH_SOURCES)
-
-    extra_instruction_block = ""
-    if extra_user_instructions and extra_user_instructions.strip():
-        extra_instruction_block = f"\nExtra instructions (debug):\n{extra_user_instructions.strip()}\n"
-    elif second_query_on_uncertainty:
-        # Production-safe toggle: do NOT force a second search, but allow it for sticky cases.
-        extra_instruction_block = (
-            "\nExtra instructions:\n"
-            "- Default to ONE web search query.\n"
-            "- If (and only if) the first query does NOT yield trustworthy platform evidence for the provided domain "
-            "(e.g., domain is blocked/parked, results are about other domains/entities, or evidence conflicts), "
-            "you SHOULD run exactly ONE additional query focused on platform detection for that domain.\n"
-            "- Do NOT use a second query just to gather extra detail when the platform is already clear.\n"
-            "- Do not use more than two queries total.\n"
-        )
-
-    user_prompt = f"""\
+    sources_instruction = _SOURCES_INSTRUCTION if include_sources else ""
+    return f"""\
 Detect which ecommerce platform powers the shop at the provided domain.
 
 Instructions:
@@ -495,8 +522,8 @@ Instructions:
 - Also check for common shop routing patterns:
   - follow obvious “Shop / Store / Warenkorb / Checkout” links on the site
   - if the site is a brochure/brand page, check whether a clearly-linked shop lives on a subdomain like shop.<root-domain>
-{tool_budget_line}- Be conservative when evidence is missing.
-{extra_instruction_block}- In the JSON output:
+- Be conservative when evidence is missing.
+- In the JSON output:
   - set input_url exactly to the Shop website URL below
   - set shop_presence:
     - shop: ecommerce platform present on the target domain or a clearly-linked shop subdomain under the same root (even if limited/coming-soon)
@@ -509,43 +536,90 @@ Instructions:
   - keep reasoning SHORT (2-4 sentences, <=600 chars). State the strongest evidence tier/signals and any key uncertainty.
   - if the site is unreachable/blocked/ambiguous or evidence conflicts, set final_platform=unknown and confidence=low
 {sources_instruction}  - do NOT include URLs in `reasoning`.
-
-Shop website URL: {normalized_url}
+{tool_budget_line}{extra_instruction_block}
 """
 
+
+_SCHEME_RE = re.compile(r"^https?://", re.I)
+
+
+def _normalize_url(url: str) -> str:
+    normalized_url = url.strip()
+    if normalized_url and not _SCHEME_RE.match(normalized_url):
+        normalized_url = f"https://{normalized_url}"
+    return normalized_url
+
+
+def _site_key(url: str) -> str:
+    """`https://www.Acme.com/de?x=1` -> `acme.com`; other subdomains (e.g. shop.acme.com) stay distinct."""
+    normalized_url = _normalize_url(url)
+    host = urlsplit(normalized_url).hostname or normalized_url.lower()
+    return host.removeprefix("www.")
+
+
+def _result_cache_key(url: str, model: str, options: EvalOptions) -> str:
+    # Everything that changes the model's answer: URL, model, rubric/system prompt and the prompt knobs.
+    _system_prompt, prompt_sha, _rubric_path = _build_system_prompt(options.rubric_file)
+    parts = (
+        f"site:{_site_key(url)}" if options.cache_by_site else _normalize_url(url),
+        model,
+        prompt_sha,
+        repr(options.max_tool_calls),
+        options.reasoning_effort or "",
+        repr(bool(options.include_sources)),
+        options.extra_user_instructions or "",
+        repr(bool(options.second_query_on_uncertainty)),
+    )
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _prepare_request(url: str, model: str, options: EvalOptions) -> tuple[Dict[str, Any], str | None]:
+    """Build the `responses.create` kwargs. Returns (create_kwargs, normalized_service_tier)."""
+    system_prompt, prompt_cache_key, _rubric_path = _build_system_prompt(options.rubric_file)
+
+    normalized_url = _normalize_url(url)
+
+    # Put dynamic content (URL) at the end so more of the prompt prefix can be cached.
+    head = _user_prompt_head(
+        options.max_tool_calls,
+        bool(options.include_sources),
+        _extra_instruction_block(bool(options.second_query_on_uncertainty), options.extra_user_instructions),
+    )
+    user_prompt = f"{head}Shop website URL: {normalized_url}\n"
+
     create_kwargs: Dict[str, Any] = {
         "model": model,
         "input": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        "tools": [{"type": "web_search_preview"}],
-        "text": text_cfg,
+        "tools": _WEB_SEARCH_TOOLS,
+        "text": _TEXT_CFG_WITH_SOURCES if options.include_sources else _TEXT_CFG_DEFAULT,
     }
-    st = _normalize_service_tier(service_tier)
+    st = _normalize_service_tier(options.service_tier)
     if st is not None:
         create_kwargs["service_tier"] = st
-    if max_tool_calls is not None:
-        create_kwargs["max_tool_calls"] = max_tool_calls
-    if reasoning_effort:
-        create_kwargs["reasoning"] = {"effort": reasoning_effort}
+    if options.max_tool_calls is not None:
+        create_kwargs["max_tool_calls"] = options.max_tool_calls
+    if options.reasoning_effort:
+        create_kwargs["reasoning"] = {"effort": options.reasoning_effort}
     # Prompt caching: allows repeated static input (rubric + system instructions) to be billed at cached rate.
+    # Default (None): on whenever the static prefix is large enough to be cacheable.
+    prompt_cache = options.prompt_cache
+    if prompt_cache is None:
+        prompt_cache = len(system_prompt) >= _PROMPT_CACHE_MIN_CHARS
     if prompt_cache:
-        h = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:12]
-        create_kwargs["prompt_cache_key"] = f"shoptech:{model}:{h}"
-        if prompt_cache_retention:
-            create_kwargs["prompt_cache_retention"] = prompt_cache_retention
+        create_kwargs["prompt_cache_key"] = prompt_cache_key
+        # Models that reject retention hit the 400 fallback in the request loop once, then are remembered.
+        if model not in _MODELS_WITHOUT_RETENTION:
+            create_kwargs["prompt_cache_retention"] = options.prompt_cache_retention or _DEFAULT_PROMPT_CACHE_RETENTION
 
-    # Flex processing may be slower; allow a larger timeout and retries on 429 Resource Unavailable.
-    call_client = client
-    if timeout_seconds is not None and hasattr(client, "with_options"):
-        call_client = client.with_options(timeout=float(timeout_seconds))
+    return create_kwargs, st
 
-    max_retries = int(flex_max_retries) if flex_max_retries is not None else 0
-    fallback = bool(flex_fallback_to_auto) if flex_fallback_to_auto is not None else False
 
+def _new_retry_meta(st: str | None) -> Dict[str, Any]:
     # Track Flex retry behavior for observability in large runs.
-    retry_meta: Dict[str, Any] = {
+    return {
         "service_tier_requested": (st or "auto"),
         "service_tier_used": (st or "auto"),
         "attempts": 0,
@@ -554,46 +628,331 @@ Shop website URL: {normalized_url}
         "fallback_used": False,
     }
 
-    for attempt in range(max_retries + 1):
+
+# Exponential backoff (1s base, capped at 60s); later attempts reuse the capped last entry.
+_BACKOFF_SECONDS = tuple(min(60.0, 2.0**a) for a in range(8))
+
+
+def _backoff_delay(attempt: int) -> float:
+    # Exponential backoff with +/-20% jitter.
+    return _BACKOFF_SECONDS[min(attempt, len(_BACKOFF_SECONDS) - 1)] * random.uniform(0.8, 1.2)
+
+
+_RETRY_AFTER_CAP_SECONDS = 300.0
+
+
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Server-requested wait from `retry-after-ms` / `retry-after` (seconds or HTTP date) on the error response."""
+    return _retry_after_from_headers(getattr(getattr(exc, "response", None), "headers", None))
+
+
+def _retry_after_from_headers(headers: Any) -> float | None:
+    if not headers:
+        return None
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms:
+            return min(_RETRY_AFTER_CAP_SECONDS, max(0.0, float(ms) / 1000.0))
+        ra = headers.get("retry-after")
+        if not ra:
+            return None
+        try:
+            seconds = float(ra)
+        except ValueError:
+            seconds = email.utils.parsedate_to_datetime(ra).timestamp() - time.time()
+    except Exception:
+        return None
+    return min(_RETRY_AFTER_CAP_SECONDS, max(0.0, seconds))
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    # Honor the server's Retry-After (plus a little jitter so a fan-out doesn't retry in lockstep);
+    # fall back to jittered exponential backoff when it is absent.
+    retry_after = _retry_after_seconds(exc)
+    if retry_after is not None:
+        return retry_after + random.uniform(0.0, 0.5)
+    return _backoff_delay(attempt)
+
+
+class _RequestRetry:
+    """What follows a failed `responses.create`; shared by the sync and async request loops.
+
+    Handles the prompt-cache-retention 400 (resend once without it), Flex 429 backoff and the optional
+    fallback to standard processing, recording everything in `meta` (the ws_stats["flex"] block).
+    """
+
+    def __init__(self, model: str, st: str | None, options: EvalOptions, create_kwargs: Dict[str, Any]) -> None:
+        self.model = model
+        self.st = st
+        self.create_kwargs = create_kwargs
+        self.max_retries = int(options.flex_max_retries) if options.flex_max_retries is not None else 0
+        self.fallback = bool(options.flex_fallback_to_auto) if options.flex_fallback_to_auto is not None else False
+        self.meta = _new_retry_meta(st)
+
+    def send(self) -> Dict[str, Any]:
+        # Counts the attempt and returns the kwargs to send.
+        self.meta["attempts"] += 1
+        return self.create_kwargs
+
+    def after_error(self, exc: Exception) -> float:
+        """Seconds to wait before sending again (0 = resend now); re-raises `exc` when there is nothing left to try."""
+        kw = self.create_kwargs
+        # Some models don't support prompt_cache_retention even if prompt caching is enabled.
+        # If we hit that, retry once without the retention parameter.
+        if kw.get("prompt_cache_retention") is not None and _is_prompt_cache_retention_unsupported_400(exc):
+            kw.pop("prompt_cache_retention", None)
+            _MODELS_WITHOUT_RETENTION.add(self.model)
+            return 0.0
+
+        # Flex processing may be slower; retry on 429 Resource Unavailable.
+        if self.st != "flex" or self.meta["fallback_used"] or not _is_resource_unavailable_429(exc):
+            raise exc
+
+        retries = int(self.meta["retries"])
+        if retries >= self.max_retries:
+            # Flex is unavailable and retries are exhausted: optionally fall back to standard processing.
+            if not self.fallback:
+                raise exc
+            kw.pop("service_tier", None)
+            self.meta["fallback_used"] = True
+            self.meta["service_tier_used"] = "auto"
+            return 0.0
+
+        self.meta["retries"] = retries + 1
+        delay = _retry_delay(exc, retries)
+        self.meta["sleep_seconds_total"] = float(self.meta["sleep_seconds_total"]) + float(delay)
+        return delay
+
+
+def _json_loads(text: str | bytes) -> Any:
+    # orjson is an optional, faster drop-in for parsing model output; fall back to the stdlib.
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
+
+def _parse_response(
+    resp: Any, retry_meta: Dict[str, Any], streamed_text: bytes | None = None, need_debug: bool = True
+) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+    # Streamed output_text deltas are already the full JSON; skip re-walking the response.
+    result = _json_loads(streamed_text) if streamed_text else _json_loads(_extract_json_text(resp))
+    # Callers that only want the JSON skip the pass over output items; retry metadata is always attached.
+    ws_stats = _web_search_call_debug(resp) if need_debug else {}
+    ws_stats["flex"] = retry_meta
+    return result, resp.usage, ws_stats
+
+
+_OUTPUT_TEXT_DELTA = "response.output_text.delta"
+
+
+def _create(
+    call_client: Any, create_kwargs: Dict[str, Any], stream: bool, on_text_delta: Callable[[str], None] | None = None
+) -> tuple[Any, bytes | None]:
+    # Streaming accumulates output_text deltas as they arrive; SDKs without `.stream` fall back to create().
+    if not stream or not hasattr(call_client.responses, "stream"):
+        return call_client.responses.create(**create_kwargs), None
+    buf = bytearray()
+    with call_client.responses.stream(**create_kwargs) as s:
+        for event in s:
+            if getattr(event, "type", None) == _OUTPUT_TEXT_DELTA:
+                buf += event.delta.encode("utf-8")
+                if on_text_delta is not None:
+                    on_text_delta(event.delta)
+        resp = s.get_final_response()
+    return resp, bytes(buf)
+
+
+async def _create_async(
+    call_client: Any, create_kwargs: Dict[str, Any], stream: bool, on_text_delta: Callable[[str], None] | None = None
+) -> tuple[Any, bytes | None]:
+    if not stream or not hasattr(call_client.responses, "stream"):
+        return await call_client.responses.create(**create_kwargs), None
+    buf = bytearray()
+    async with call_client.responses.stream(**create_kwargs) as s:
+        async for event in s:
+            if getattr(event, "type", None) == _OUTPUT_TEXT_DELTA:
+                buf += event.delta.encode("utf-8")
+                if on_text_delta is not None:
+                    on_text_delta(event.delta)
+        resp = await s.get_final_response()
+    return resp, bytes(buf)
+
+
+def _timeout_client(client: Any, timeout_seconds: float) -> Any:
+    # with_options() returns a shallow copy that shares the connection pool; build it once per (client, timeout).
+    # The views are kept on the client itself, so they are released together with it.
+    views = getattr(client, "_shoptech_timeout_views", None)
+    if views is None:
+        views = {}
         try:
-            retry_meta["attempts"] += 1
-            resp = call_client.responses.create(**create_kwargs)
+            client._shoptech_timeout_views = views
+        except AttributeError:  # client type without an instance __dict__: no caching
+            return client.with_options(timeout=timeout_seconds)
+    view = views.get(timeout_seconds)
+    if view is None:
+        view = views[timeout_seconds] = client.with_options(timeout=timeout_seconds)
+    return view
+
+
+def _client_with_timeout(client: Any, timeout_seconds: float | None) -> Any:
+    if timeout_seconds is None or not hasattr(client, "with_options"):
+        return client
+    return _timeout_client(client, float(timeout_seconds))
+
+
+def _mark_cache_hit(
+    hit: tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]],
+) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+    # Callers tell replayed results apart (nothing was billed for them) via ws_stats["cache_hit"].
+    result, usage, ws_stats = hit
+    return result, usage, {**ws_stats, "cache_hit": True}
+
+
+def _cache_lookup(
+    url: str, model: str, options: EvalOptions
+) -> tuple[str | None, tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]] | None]:
+    # Returns (cache_key, hit); cache_key is None when result caching is off.
+    cache = options.result_cache
+    if isinstance(cache, NullCache):
+        return None, None
+    cache_key = _result_cache_key(url, model, options)
+    hit = cache.get(cache_key)
+    return cache_key, (_mark_cache_hit(hit) if hit is not None else None)
+
+
+def _evaluate_company_raw(
+    url: str,
+    model: str,
+    options: EvalOptions,
+    *,
+    need_debug: bool = True,
+) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+    cache_key, hit = _cache_lookup(url, model, options)
+    if hit is not None:
+        return hit
+    # Cached entries may later be served to debug callers, so always store the full stats.
+    out = _evaluate_company_uncached(url, model, options, need_debug=need_debug or cache_key is not None)
+    if cache_key is not None:
+        options.result_cache.set(cache_key, out)
+    return out
+
+
+def _evaluate_company_uncached(
+    url: str,
+    model: str,
+    options: EvalOptions,
+    *,
+    need_debug: bool = True,
+) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+    create_kwargs, st = _prepare_request(url, model, options)
+    call_client = _client_with_timeout(_get_client(), options.timeout_seconds)
+    retry = _RequestRetry(model, st, options, create_kwargs)
+    while True:
+        try:
+            resp, streamed = _create(call_client, retry.send(), options.stream, options.on_text_delta)
             break
         except Exception as e:  # pragma: no cover (SDK exception types vary)
-            # Some models don't support prompt_cache_retention even if prompt caching is enabled.
-            # If we hit that, retry once without the retention parameter.
-            if create_kwargs.get("prompt_cache_retention") is not None and _is_prompt_cache_retention_unsupported_400(e):
-                create_kwargs.pop("prompt_cache_retention", None)
-                retry_meta["attempts"] += 1
-                resp = call_client.responses.create(**create_kwargs)
-                break
-
-            if st != "flex" or not _is_resource_unavailable_429(e):
-                raise
-
-            # If Flex is unavailable and we've exhausted retries, optionally fall back to standard processing.
-            if attempt >= max_retries:
-                if fallback:
-                    create_kwargs.pop("service_tier", None)
-                    retry_meta["fallback_used"] = True
-                    retry_meta["service_tier_used"] = "auto"
-                    retry_meta["attempts"] += 1
-                    resp = call_client.responses.create(**create_kwargs)
-                    break
-                raise
-
-            # Exponential backoff with jitter.
-            retry_meta["retries"] += 1
-            base = 1.0
-            delay = min(60.0, base * (2**attempt))
-            delay = delay * (0.8 + 0.4 * random.random())
-            retry_meta["sleep_seconds_total"] = float(retry_meta["sleep_seconds_total"]) + float(delay)
+            delay = retry.after_error(e)
+        if delay:
             time.sleep(delay)
+    return _parse_response(resp, retry.meta, streamed, need_debug)
 
-    text = _extract_json_text(resp)
-    result = json.loads(text)
-    ws_stats = _web_search_call_debug(resp)
-    ws_stats["flex"] = retry_meta
-    return result, resp.usage, ws_stats
 
+def new_async_client(*, on_rate_limited: Callable[[float | None], None] | None = None) -> AsyncOpenAI:
+    """Build an `AsyncOpenAI` client with the same pool tuning as the sync client; share one per event loop.
+
+    `on_rate_limited(retry_after_seconds)` is called for every HTTP 429, including the ones the SDK
+    retries internally and never surfaces as an exception.
+    """
+    http_kwargs = _http_client_kwargs()
+    if on_rate_limited is not None:
+
+        async def _on_response(response: Any) -> None:
+            if response.status_code == 429:
+                on_rate_limited(_retry_after_from_headers(response.headers))
+
+        http_kwargs["event_hooks"] = {"response": [_on_response]}
+    return AsyncOpenAI(http_client=DefaultAsyncHttpxClient(**http_kwargs)) if http_kwargs else AsyncOpenAI()
+
+
+@contextlib.asynccontextmanager
+async def _async_client_scope(client: Any) -> AsyncIterator[Any]:
+    # Yields `client`; without one, a new pooled client that is closed on exit.
+    if client is not None:
+        yield client
+        return
+    owned = new_async_client()
+    try:
+        yield owned
+    finally:
+        await owned.close()
+
+
+async def aevaluate_company_with_usage_and_web_search_debug(
+    url: str, model: str, *, client: Any = None, options: EvalOptions | None = None, **kwargs: Any
+) -> tuple[Dict[str, Any], ResponseUsage, Dict[str, Any]]:
+    """Async `evaluate_company_with_usage_and_web_search_debug`; pass `client` to reuse one `AsyncOpenAI` across calls.
+
+    Without `client`, a client is created for this call and closed before returning.
+    """
+    async with _async_client_scope(client) as c:
+        result, usage, ws_stats = await _evaluate_company_raw_async(c, url, model, _resolve_options(options, kwargs))
+    if usage is None:
+        raise RuntimeError("OpenAI response did not include usage; cannot compute cost.")
+    return result, usage, ws_stats
+
+
+async def _evaluate_company_raw_async(
+    client: Any,
+    url: str,
+    model: str,
+    options: EvalOptions,
+    *,
+    need_debug: bool = True,
+) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+    """Async twin of `_evaluate_company_raw` (same cache, request, retry and parsing behavior) on an `AsyncOpenAI` client."""
+    cache_key, hit = _cache_lookup(url, model, options)
+    if hit is not None:
+        return hit
+    create_kwargs, st = _prepare_request(url, model, options)
+    call_client = _client_with_timeout(client, options.timeout_seconds)
+    retry = _RequestRetry(model, st, options, create_kwargs)
+    while True:
+        try:
+            resp, streamed = await _create_async(call_client, retry.send(), options.stream, options.on_text_delta)
+            break
+        except Exception as e:  # pragma: no cover (SDK exception types vary)
+            delay = retry.after_error(e)
+        if delay:
+            await asyncio.sleep(delay)
+    out = _parse_response(resp, retry.meta, streamed, need_debug or cache_key is not None)
+    if cache_key is not None:
+        options.result_cache.set(cache_key, out)
+    return out
+
+
+async def evaluate_companies_async(
+    urls: Iterable[str],
+    model: str,
+    *,
+    concurrency: int = 32,
+    return_exceptions: bool = False,
+    client: Any = None,
+    options: EvalOptions | None = None,
+    **kwargs: Any,
+) -> list[Any]:
+    """Evaluate many URLs concurrently (at most `concurrency` requests in flight) on one shared `AsyncOpenAI` client.
+
+    Returns one (result, usage, web_search_debug) tuple per URL, in input order.
+    With return_exceptions=True, failed URLs yield the exception instead of aborting the batch.
+    Pass `client` to reuse your own client; otherwise one is created and closed before returning.
+    """
+    opts = _resolve_options(options, kwargs)
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    async with _async_client_scope(client) as shared:
+
+        async def _one(u: str) -> tuple[Dict[str, Any], ResponseUsage | None, Dict[str, Any]]:
+            async with sem:
+                return await _evaluate_company_raw_async(shared, u, model, opts)
 
+        return list(await asyncio.gather(*(_one(u) for u in urls), return_exceptions=return_exceptions))
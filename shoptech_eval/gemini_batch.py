@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import contextlib
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from google.genai import types
+
+from .gemini_evaluator import (
+    _api_key,
+    _client,
+    _grounding,
+    _json_loads,
+    _parse_json_text,
+    _system_instruction,
+    _user_prompt,
+)
+from .jsonl import write_jsonl
+from .schema import OUTPUT_SCHEMA
+
+
+@dataclass(frozen=True, slots=True)
+class GeminiBatchRequestLine:
+    key: str
+    request: Dict[str, Any]
+
+
+def build_gemini_request(url: str, *, system_instruction: str) -> Dict[str, Any]:
+    """Build a GenerateContentRequest (REST JSON) matching the interactive Gemini evaluator settings."""
+    return {
+        "contents": [{"role": "user", "parts": [{"text": _user_prompt(url)}]}],
+        "systemInstruction": {"parts": [{"text": system_instruction}]},
+        "tools": [{"googleSearch": {}}],
+        # The REST API takes standard JSON Schema here, so the SDK-only key stripping is not needed.
+        "generationConfig": {
+            "responseMimeType": "application/json",
+            "responseJsonSchema": OUTPUT_SCHEMA,
+            "temperature": 0.0,
+        },
+    }
+
+
+def build_gemini_batch_lines(urls: Iterable[str], *, rubric_file: str | None = None) -> List[GeminiBatchRequestLine]:
+    system_instruction = _system_instruction(rubric_file)
+    # key is the input position so duplicate URLs stay distinct.
+    return [
+        GeminiBatchRequestLine(key=str(idx), request=build_gemini_request(url, system_instruction=system_instruction))
+        for idx, url in enumerate(urls)
+    ]
+
+
+def write_gemini_batch_input_jsonl(lines: Iterable[GeminiBatchRequestLine], out_path: Path) -> None:
+    write_jsonl(({"key": line.key, "request": line.request} for line in lines), out_path)
+
+
+@dataclass(frozen=True, slots=True)
+class GeminiBatchParsedResult:
+    key: str
+    model_result: Optional[Dict[str, Any]]
+    usage: Any
+    search_queries: int
+    grounding: Dict[str, Any]
+    error: Optional[Dict[str, Any]]
+
+
+def _parse_gemini_batch_line(obj: Dict[str, Any]) -> GeminiBatchParsedResult:
+    key = str(obj.get("key", ""))
+    body = obj.get("response")
+    err = obj.get("error")
+    if not isinstance(body, dict):
+        return GeminiBatchParsedResult(
+            key=key,
+            model_result=None,
+            usage=None,
+            search_queries=0,
+            grounding={"web_search_queries": [], "grounding_chunks": []},
+            error=err if isinstance(err, dict) else {"message": "missing response"},
+        )
+    response = types.GenerateContentResponse.model_validate(body)
+    search_queries, grounding = _grounding(response, True)
+    try:
+        model_result = _parse_json_text(response.text) if response.text else None
+    except ValueError as e:  # truncated/refused output; keep parsing the rest of the file
+        model_result, error = None, {"message": str(e)}
+    else:
+        error = None if model_result is not None else {"message": "Gemini returned empty text."}
+    return GeminiBatchParsedResult(
+        key=key,
+        model_result=model_result,
+        usage=response.usage_metadata,
+        search_queries=search_queries,
+        grounding=grounding,
+        error=error,
+    )
+
+
+def parse_gemini_batch_output_jsonl(path: Path) -> Iterator[GeminiBatchParsedResult]:
+    with path.open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield _parse_gemini_batch_line(_json_loads(line))
+
+
+_GEMINI_BATCH_TERMINAL_STATES = frozenset(
+    {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+)
+
+
+def _gemini_batch_result(parsed: GeminiBatchParsedResult) -> Any:
+    """Map one parsed output line to the evaluator's (result, usage, search_queries, grounding) tuple, or an exception."""
+    if parsed.error is not None or parsed.model_result is None:
+        return RuntimeError(f"Gemini batch request {parsed.key!r} failed: {parsed.error}")
+    return parsed.model_result, parsed.usage, parsed.search_queries, parsed.grounding
+
+
+def evaluate_companies_gemini_batch(
+    urls: Iterable[str],
+    model_name: str = "gemini-3-flash-preview",
+    *,
+    rubric_file: str | None = None,
+    api_key: str | None = None,
+    work_dir: Path | None = None,
+    poll_interval_seconds: float = 30.0,
+    max_poll_interval_seconds: float = 600.0,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """Evaluate URLs as one Gemini Batch API job, mirroring `openai_batch.evaluate_companies_batch`.
+
+    Blocks until the job reaches a terminal state, then returns one (result, usage, search_queries,
+    grounding) tuple per URL in input order. With return_exceptions=True, failed URLs (including all
+    of them when the job itself fails) yield the exception instead of aborting. The input/output
+    JSONL files go to a temporary directory unless `work_dir` is given, in which case they are kept.
+    """
+    urls = list(urls)
+    # A directory per run, so concurrent jobs never share input/output files.
+    dir_ctx: Any = tempfile.TemporaryDirectory() if work_dir is None else contextlib.nullcontext(work_dir)
+    with dir_ctx as d:
+        in_path = Path(d) / "batch_input.jsonl"
+        write_gemini_batch_input_jsonl(build_gemini_batch_lines(urls, rubric_file=rubric_file), in_path)
+
+        client = _client(_api_key(api_key))
+        uploaded = client.files.upload(
+            file=str(in_path),
+            config=types.UploadFileConfig(display_name=in_path.name, mime_type="jsonl"),
+        )
+        job = client.batches.create(model=model_name, src=uploaded.name, config={"display_name": "shoptech-eval"})
+
+        delay = float(poll_interval_seconds)
+        while getattr(job.state, "name", str(job.state)) not in _GEMINI_BATCH_TERMINAL_STATES:
+            time.sleep(delay)
+            delay = min(float(max_poll_interval_seconds), delay * 2)
+            job = client.batches.get(name=job.name)
+
+        results: List[Any] = [None] * len(urls)
+        dest_file = getattr(getattr(job, "dest", None), "file_name", None)
+        if dest_file:
+            # A failed job can still carry partial output; keep whatever lines it has.
+            out_path = Path(d) / "batch_output.jsonl"
+            out_path.write_bytes(client.files.download(file=dest_file))
+            for parsed in parse_gemini_batch_output_jsonl(out_path):
+                results[int(parsed.key)] = _gemini_batch_result(parsed)
+
+    state = getattr(job.state, "name", str(job.state))
+    for idx, r in enumerate(results):
+        if r is None:
+            results[idx] = RuntimeError(
+                f"Gemini batch {job.name} ended with state={state} ({getattr(job, 'error', None)}); no result for {urls[idx]!r}"
+            )
+        if isinstance(results[idx], Exception) and not return_exceptions:
+            raise results[idx]
+    return results
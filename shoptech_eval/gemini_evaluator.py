@@ -1,42 +1,75 @@
+import asyncio
+import functools
+import hashlib
 import json
 import os
-from typing import Any, Dict, Tuple
+import re
+from typing import Any, Dict, Iterable, List, Tuple
 
 from google import genai
 from google.genai import types
 
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover (optional speedup)
+    _orjson = None
+
 from .rubric_loader import load_rubric_text
 from .schema import OUTPUT_SCHEMA
 
 
+_GEMINI_UNSUPPORTED_KEYS = frozenset({"additionalProperties"})
+
+
 def _gemini_schema(schema: Any) -> Any:
     """
     Gemini's response_schema is not full JSON Schema.
     In particular, it rejects fields like `additionalProperties`.
     We strip unsupported keys recursively while keeping the core shape constraints.
+
+    Copy-on-write: subtrees that need no stripping are returned as-is (not cloned), so treat the
+    result as read-only.
     """
     if isinstance(schema, dict):
-        cleaned: Dict[str, Any] = {}
-        for k, v in schema.items():
-            if k in ("additionalProperties",):
-                continue
-            cleaned[k] = _gemini_schema(v)
+        cleaned = {k: _gemini_schema(v) for k, v in schema.items() if k not in _GEMINI_UNSUPPORTED_KEYS}
+        if len(cleaned) == len(schema) and all(cleaned[k] is v for k, v in schema.items()):
+            return schema
         return cleaned
     if isinstance(schema, list):
-        return [_gemini_schema(x) for x in schema]
+        items = [_gemini_schema(x) for x in schema]
+        if all(a is b for a, b in zip(items, schema)):
+            return schema
+        return items
     return schema
 
 
-def _extract_grounding_debug(response: Any) -> Dict[str, Any]:
-    """Extract grounding details (queries + chunks) from a Gemini response."""
+# OUTPUT_SCHEMA is a module constant, so clean it once rather than per request.
+_GEMINI_SCHEMA = _gemini_schema(OUTPUT_SCHEMA)
+
+
+def _grounding(response: Any, want_debug: bool) -> Tuple[int, Dict[str, Any]]:
+    """Returns (web_search_queries_count, debug) from one lookup of the grounding metadata.
+
+    debug holds queries + grounding chunks when `want_debug`, else empty lists.
+    """
     out: Dict[str, Any] = {"web_search_queries": [], "grounding_chunks": []}
     candidates = getattr(response, "candidates", None) or []
     if not candidates:
-        return out
+        return 0, out
 
     gm = getattr(candidates[0], "grounding_metadata", None)
     if gm is None:
-        return out
+        return 0, out
+
+    # Estimate number of web search queries from grounding metadata (when available).
+    count = 0
+    if hasattr(gm, "web_search_queries"):
+        try:
+            count = len(gm.web_search_queries or [])
+        except Exception:
+            count = 0
+    if not want_debug:
+        return count, out
 
     # Best-effort: pydantic model_dump (google-genai uses pydantic models).
     if hasattr(gm, "model_dump"):
@@ -44,7 +77,7 @@ def _extract_grounding_debug(response: Any) -> Dict[str, Any]:
             dumped = gm.model_dump()
             out["web_search_queries"] = dumped.get("web_search_queries") or []
             out["grounding_chunks"] = dumped.get("grounding_chunks") or []
-            return out
+            return count, out
         except Exception:
             pass
 
@@ -59,7 +92,12 @@ def _extract_grounding_debug(response: Any) -> Dict[str, Any]:
             out["grounding_chunks"] = list(getattr(gm, "grounding_chunks") or [])
         except Exception:
             out["grounding_chunks"] = []
-    return out
+    return count, out
+
+
+def _extract_grounding_debug(response: Any) -> Dict[str, Any]:
+    """Extract grounding details (queries + chunks) from a Gemini response."""
+    return _grounding(response, True)[1]
 
 # Shared base logic (similar to OpenAI evaluator)
 BASE_SYSTEM_PROMPT = """\
@@ -89,6 +127,10 @@ def evaluate_company_gemini_with_debug(
     *,
     rubric_file: str | None = None,
     api_key: str | None = None,
+    stream: bool = False,
+    result_cache: Any = None,
+    force_refresh: bool = False,
+    cache_ttl: float | None = None,
 ) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
     """Like evaluate_company_gemini, but also returns grounding debug info."""
     result, usage, search_queries, debug = _evaluate_company_gemini_raw(
@@ -96,6 +138,10 @@ def evaluate_company_gemini_with_debug(
         model_name=model_name,
         rubric_file=rubric_file,
         api_key=api_key,
+        stream=stream,
+        result_cache=result_cache,
+        force_refresh=force_refresh,
+        cache_ttl=cache_ttl,
         debug_grounding=True,
     )
     return result, usage, search_queries, debug
@@ -107,11 +153,23 @@ def evaluate_company_gemini(
     *,
     rubric_file: str | None = None,
     api_key: str | None = None,
+    stream: bool = False,
+    result_cache: Any = None,
+    force_refresh: bool = False,
+    cache_ttl: float | None = None,
 ) -> Tuple[Dict[str, Any], Any, int]:
     """
     Evaluates a company using the new Google Gen AI SDK (v1.0+)
     with Google Search grounding.
     
+    With stream=True the response is consumed via generate_content_stream (text chunks are
+    accumulated as they arrive; usage and grounding come from the final chunk).
+
+    `result_cache` is any object with `get`/`set` (e.g. `diskcache.Cache(".cache/gemini_eval")`);
+    hits are keyed by (normalized URL, model, rubric hash) and skip the API call entirely.
+    `force_refresh` ignores existing entries; `cache_ttl` (seconds) is passed as `expire=` to `set`.
+    Replayed hits carry `cache_hit: True` in the debug dict of evaluate_company_gemini_with_debug.
+
     Returns:
         (result_dict, usage_metadata, search_queries_count)
     """
@@ -120,34 +178,58 @@ def evaluate_company_gemini(
         model_name=model_name,
         rubric_file=rubric_file,
         api_key=api_key,
+        stream=stream,
+        result_cache=result_cache,
+        force_refresh=force_refresh,
+        cache_ttl=cache_ttl,
         debug_grounding=False,
     )
     return result, usage, search_queries
 
 
-def _evaluate_company_gemini_raw(
-    *,
-    url: str,
-    model_name: str,
-    rubric_file: str | None,
-    api_key: str | None,
-    debug_grounding: bool,
-) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+def _api_key(api_key: str | None) -> str:
     key = api_key or os.environ.get("GEMINI_API_KEY")
     if not key:
         raise RuntimeError("Missing GEMINI_API_KEY environment variable.")
+    return key
+
 
-    client = genai.Client(api_key=key)
+@functools.lru_cache(maxsize=4)
+def _client(key: str) -> Any:
+    # One client (and HTTP connection pool) per API key; the SDK client is safe to share across threads/tasks.
+    return genai.Client(api_key=key)
 
-    # Load rubric
+
+@functools.lru_cache(maxsize=8)
+def _system_instruction(rubric_file: str | None) -> str:
     rubric_path, rubric_text = load_rubric_text(rubric_file)
-    system_instruction = f"{BASE_SYSTEM_PROMPT}\n\nRubric file: {rubric_path}\n\n{rubric_text}\n"
+    return f"{BASE_SYSTEM_PROMPT}\n\nRubric file: {rubric_path}\n\n{rubric_text}\n"
+
+
+_SCHEME_RE = re.compile(r"^https?://", re.I)
 
+
+def _normalize_url(url: str) -> str:
     normalized_url = url.strip()
-    if normalized_url and not normalized_url.lower().startswith(("http://", "https://")):
+    if normalized_url and not _SCHEME_RE.match(normalized_url):
         normalized_url = f"https://{normalized_url}"
+    return normalized_url
+
+
+@functools.lru_cache(maxsize=8)
+def _rubric_hash(rubric_file: str | None) -> str:
+    return hashlib.sha256(_system_instruction(rubric_file).encode("utf-8")).hexdigest()[:16]
+
+
+def _result_cache_key(url: str, model_name: str, rubric_file: str | None) -> str:
+    parts = (_normalize_url(url), model_name, _rubric_hash(rubric_file))
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _user_prompt(url: str) -> str:
+    normalized_url = _normalize_url(url)
 
-    user_prompt = f"""\
+    return f"""\
 Detect which ecommerce platform powers the shop at the provided domain.
 
 Instructions:
@@ -162,43 +244,170 @@ Instructions:
 Shop website URL: {normalized_url}
 """
 
+
+def _json_loads(text: str | bytes) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either the same way.
+    if _orjson is not None:
+        return _orjson.loads(text)
+    return json.loads(text)
+
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.S)
+
+
+def _parse_json_text(text: str) -> Dict[str, Any]:
+    try:
+        return _json_loads(text)
+    except json.JSONDecodeError as e:
+        # Gemini sometimes wraps the JSON in a ```json fence; unwrap it in one regex pass.
+        m = _FENCE_RE.match(text)
+        if m is None:
+            raise ValueError(f"Gemini returned non-JSON text ({e}): {text[:200]!r}") from e
+        return _json_loads(m.group(1))
+
+
+_GOOGLE_SEARCH_TOOLS = [types.Tool(google_search=types.GoogleSearch())]
+
+
+@functools.lru_cache(maxsize=8)
+def _generate_config(rubric_file: str | None) -> Any:
+    # Only the system instruction varies (per rubric), so build each config once; the SDK does not mutate it.
     # Using the new SDK syntax for tools (google_search) and JSON schema
-    response = client.models.generate_content(
-        model=model_name,
-        contents=user_prompt,
-        config=types.GenerateContentConfig(
-            system_instruction=system_instruction,
-            tools=[types.Tool(google_search=types.GoogleSearch())],
-            response_mime_type="application/json",
-            response_schema=_gemini_schema(OUTPUT_SCHEMA),
-            temperature=0.0,
-        ),
+    return types.GenerateContentConfig(
+        system_instruction=_system_instruction(rubric_file),
+        tools=_GOOGLE_SEARCH_TOOLS,
+        response_mime_type="application/json",
+        response_schema=_GEMINI_SCHEMA,
+        temperature=0.0,
     )
 
-    if not response.text:
-        raise RuntimeError("Gemini returned empty text.")
 
-    try:
-        data = json.loads(response.text)
-    except json.JSONDecodeError:
-        # Fallback cleanup just in case
-        text = response.text.strip()
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.endswith("```"):
-            text = text[:-3]
-        data = json.loads(text.strip())
+def _parse_gemini_response(
+    response: Any, debug_grounding: bool, text: str | None = None
+) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+    text = response.text if text is None else text
+    if not text:
+        raise RuntimeError("Gemini returned empty text.")
 
-    # Estimate number of web search queries from grounding metadata (when available).
-    search_queries_count = 0
-    candidates = getattr(response, "candidates", None) or []
-    if candidates:
-        gm = getattr(candidates[0], "grounding_metadata", None)
-        if gm is not None and hasattr(gm, "web_search_queries"):
-            try:
-                search_queries_count = len(gm.web_search_queries or [])
-            except Exception:
-                search_queries_count = 0
-
-    debug = _extract_grounding_debug(response) if debug_grounding else {"web_search_queries": [], "grounding_chunks": []}
+    data = _parse_json_text(text)
+    search_queries_count, debug = _grounding(response, debug_grounding)
     return data, response.usage_metadata, search_queries_count, debug
+
+
+def _evaluate_company_gemini_raw(
+    *,
+    url: str,
+    model_name: str,
+    rubric_file: str | None,
+    api_key: str | None,
+    debug_grounding: bool,
+    stream: bool = False,
+    result_cache: Any = None,
+    force_refresh: bool = False,
+    cache_ttl: float | None = None,
+) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+    cache_key = None
+    if result_cache is not None:
+        cache_key = _result_cache_key(url, model_name, rubric_file)
+        if not force_refresh:
+            hit = result_cache.get(cache_key)
+            if hit is not None:
+                # As on the OpenAI side: replays are flagged so cost summaries do not bill them again.
+                result, usage, search_queries, debug = hit
+                return result, usage, search_queries, {**debug, "cache_hit": True}
+
+    # Cached entries may later be served to debug callers, so always store the grounding details.
+    out = _generate_and_parse(
+        url=url,
+        model_name=model_name,
+        rubric_file=rubric_file,
+        api_key=api_key,
+        debug_grounding=debug_grounding or cache_key is not None,
+        stream=stream,
+    )
+    if cache_key is not None:
+        if cache_ttl is None:
+            result_cache.set(cache_key, out)
+        else:
+            result_cache.set(cache_key, out, expire=cache_ttl)
+    return out
+
+
+def _generate_and_parse(
+    *,
+    url: str,
+    model_name: str,
+    rubric_file: str | None,
+    api_key: str | None,
+    debug_grounding: bool,
+    stream: bool,
+) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+    client = _client(_api_key(api_key))
+
+    if not stream:
+        response = client.models.generate_content(
+            model=model_name,
+            contents=_user_prompt(url),
+            config=_generate_config(rubric_file),
+        )
+        return _parse_gemini_response(response, debug_grounding)
+
+    chunks: List[str] = []
+    response = None
+    for response in client.models.generate_content_stream(
+        model=model_name,
+        contents=_user_prompt(url),
+        config=_generate_config(rubric_file),
+    ):
+        if response.text:
+            chunks.append(response.text)
+    if response is None:
+        raise RuntimeError("Gemini returned an empty stream.")
+    # The final chunk carries usage_metadata and grounding_metadata for the whole response.
+    return _parse_gemini_response(response, debug_grounding, "".join(chunks))
+
+
+async def aevaluate_company_gemini(
+    url: str,
+    model_name: str = "gemini-3-flash-preview",
+    *,
+    rubric_file: str | None = None,
+    api_key: str | None = None,
+    debug_grounding: bool = False,
+    client: Any = None,
+) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+    """Async variant of evaluate_company_gemini_with_debug (uses `client.aio`); pass `client` to share one across calls."""
+    client = client or _client(_api_key(api_key))
+    response = await client.aio.models.generate_content(
+        model=model_name,
+        contents=_user_prompt(url),
+        config=_generate_config(rubric_file),
+    )
+    return _parse_gemini_response(response, debug_grounding)
+
+
+async def aevaluate_many(
+    urls: Iterable[str],
+    model_name: str = "gemini-3-flash-preview",
+    *,
+    concurrency: int = 8,
+    rubric_file: str | None = None,
+    api_key: str | None = None,
+    debug_grounding: bool = False,
+    return_exceptions: bool = False,
+) -> List[Any]:
+    """Evaluate URLs concurrently (at most `concurrency` in flight) on one shared client.
+
+    Returns one (result, usage, search_queries_count, debug) tuple per URL, in input order.
+    With return_exceptions=True, failed URLs yield the exception instead of aborting the batch.
+    """
+    client = _client(_api_key(api_key))
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _one(u: str) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+        async with sem:
+            return await aevaluate_company_gemini(
+                u, model_name, rubric_file=rubric_file, debug_grounding=debug_grounding, client=client
+            )
+
+    return list(await asyncio.gather(*(_one(u) for u in urls), return_exceptions=return_exceptions))
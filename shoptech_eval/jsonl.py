@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+try:
+    import orjson as _orjson
+except Exception:  # pragma: no cover (optional speedup)
+    _orjson = None
+
+
+def dumps_line(obj: Dict[str, Any]) -> bytes:
+    # One JSONL line as UTF-8 bytes; orjson when available (non-str keys allowed, as with json.dumps).
+    # The stdlib fallback matches it: compact-enough output, no ASCII escaping, newline appended.
+    if _orjson is not None:
+        return _orjson.dumps(obj, option=_orjson.OPT_APPEND_NEWLINE | _orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+_WRITE_CHUNK_BYTES = 1 << 20
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], out_path: Path) -> None:
+    """Write `rows` as JSONL, creating parent directories.
+
+    Batch request bodies each carry the full rubric, so lines are flushed in ~1 MiB chunks rather
+    than one write per row.
+    """
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    buf = bytearray()
+    with out_path.open("wb") as f:
+        for row in rows:
+            buf += dumps_line(row)
+            if len(buf) >= _WRITE_CHUNK_BYTES:
+                f.write(buf)
+                buf.clear()
+        f.write(buf)
@@ -1,17 +1,26 @@
 from __future__ import annotations
 
 import csv
-import json
+import sys
+import tempfile
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from .evaluator import BASE_SYSTEM_PROMPT
-from .rubric_loader import load_rubric_text
+from openai.types.responses import Response
+
+from . import evaluator
+from .evaluator import EvalOptions
+from .jsonl import write_jsonl
 from .schema import json_schema_text_config
 
+# Static per-request pieces; bodies are only serialized, never mutated, so sharing is safe.
+_TEXT_CFG = json_schema_text_config()
+_WEB_SEARCH_TOOLS = [{"type": "web_search_preview"}]
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BatchRequestLine:
     custom_id: str
     method: str
@@ -30,14 +39,18 @@ def build_responses_body(
     prompt_cache_key: str | None = None,
     prompt_cache_retention: str | None = None,
     enable_web_search: bool = True,
+    system_prompt: str | None = None,
 ) -> Dict[str, Any]:
-    """Build a /v1/responses body matching our single-call evaluator settings."""
-    rubric_path, rubric_text = load_rubric_text(rubric_file)
-    system_prompt = f"{BASE_SYSTEM_PROMPT}\n\nRubric file: {rubric_path}\n\n{rubric_text}\n"
+    """Build a /v1/responses body matching our single-call evaluator settings.
+
+    Pass a precomputed `system_prompt` when building many bodies so they all reference one string;
+    otherwise it is derived from `rubric_file`.
+    """
+    if system_prompt is None:
+        # Same (cached) system prompt as the interactive evaluator.
+        system_prompt, _prompt_cache_key, _rubric_path = evaluator._build_system_prompt(rubric_file)
 
-    normalized_url = (company_url or "").strip()
-    if normalized_url and not normalized_url.lower().startswith(("http://", "https://")):
-        normalized_url = f"https://{normalized_url}"
+    normalized_url = evaluator._normalize_url(company_url or "")
 
     tool_budget_line = (
         f"- Tool-call budget: you can make at most {max_tool_calls} web search tool call(s). Use them wisely.\n"
@@ -67,10 +80,10 @@ Shop website URL: {normalized_url}
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        "text": json_schema_text_config(),
+        "text": _TEXT_CFG,
     }
     if enable_web_search:
-        body["tools"] = [{"type": "web_search_preview"}]
+        body["tools"] = _WEB_SEARCH_TOOLS
     if max_tool_calls is not None:
         body["max_tool_calls"] = max_tool_calls
     if reasoning_effort:
@@ -86,24 +99,13 @@ Shop website URL: {normalized_url}
 
 
 def write_batch_input_jsonl(lines: Iterable[BatchRequestLine], out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as f:
-        for line in lines:
-            f.write(
-                json.dumps(
-                    {
-                        "custom_id": line.custom_id,
-                        "method": line.method,
-                        "url": line.url,
-                        "body": line.body,
-                    },
-                    ensure_ascii=False,
-                )
-                + "\n"
-            )
+    write_jsonl(
+        ({"custom_id": line.custom_id, "method": line.method, "url": line.url, "body": line.body} for line in lines),
+        out_path,
+    )
 
 
-def build_irene_batch_lines(
+def iter_irene_batch_lines(
     sample_csv_path: Path,
     *,
     model: str,
@@ -114,92 +116,74 @@ def build_irene_batch_lines(
     prompt_cache_retention: str | None = None,
     custom_id_prefix: str = "irene",
     enable_web_search: bool = True,
-) -> List[BatchRequestLine]:
-    rows: List[Dict[str, str]] = []
-    with sample_csv_path.open("r", encoding="utf-8", newline="") as f:
-        r = csv.DictReader(f)
-        for row in r:
-            rows.append(row)
+) -> Iterator[BatchRequestLine]:
+    """Stream batch lines from the sample CSV row by row (e.g. straight into `write_batch_input_jsonl`)."""
+    # One rubric-sized string referenced by every body (the wire format still repeats it per line).
+    system_prompt = sys.intern(evaluator._build_system_prompt(rubric_file)[0])
 
-    lines: List[BatchRequestLine] = []
-    for idx, row in enumerate(rows, start=1):
-        website = (row.get("Website") or "").strip()
-        if not website:
-            continue
+    with sample_csv_path.open("r", encoding="utf-8", newline="") as f:
+        for idx, row in enumerate(csv.DictReader(f), start=1):
+            website = (row.get("Website") or "").strip()
+            if not website:
+                continue
 
-        body = build_responses_body(
-            website,
-            model,
-            rubric_file=rubric_file,
-            max_tool_calls=max_tool_calls,
-            reasoning_effort=reasoning_effort,
-            prompt_cache=prompt_cache,
-            prompt_cache_retention=prompt_cache_retention,
-            enable_web_search=enable_web_search,
-        )
-        firma = (row.get("Name") or row.get("Firma") or "").strip().replace(" ", "_")
-        custom_id = f"{custom_id_prefix}-{idx}-{firma}" if firma else f"{custom_id_prefix}-{idx}"
-        lines.append(BatchRequestLine(custom_id=custom_id, method="POST", url="/v1/responses", body=body))
+            body = build_responses_body(
+                website,
+                model,
+                rubric_file=rubric_file,
+                max_tool_calls=max_tool_calls,
+                reasoning_effort=reasoning_effort,
+                prompt_cache=prompt_cache,
+                prompt_cache_retention=prompt_cache_retention,
+                enable_web_search=enable_web_search,
+                system_prompt=system_prompt,
+            )
+            firma = (row.get("Name") or row.get("Firma") or "").strip().replace(" ", "_")
+            custom_id = f"{custom_id_prefix}-{idx}-{firma}" if firma else f"{custom_id_prefix}-{idx}"
+            yield BatchRequestLine(custom_id=custom_id, method="POST", url="/v1/responses", body=body)
 
-    return lines
 
+def build_irene_batch_lines(sample_csv_path: Path, **kwargs: Any) -> List[BatchRequestLine]:
+    """List form of `iter_irene_batch_lines` (same keyword arguments)."""
+    return list(iter_irene_batch_lines(sample_csv_path, **kwargs))
 
-def _extract_json_text_from_body(body: Dict[str, Any]) -> str:
-    # Prefer output_text convenience field.
-    out_text = body.get("output_text")
-    if isinstance(out_text, str) and out_text.strip():
-        return out_text
 
-    # Fallback traverse output message content.
+def _scan_output(body: Dict[str, Any]) -> Tuple[str, int, List[Dict[str, str]]]:
+    """Single pass over body["output"]: (message text, completed web_search_call count, deduped URL citations)."""
     parts: List[str] = []
-    for item in body.get("output", []) or []:
-        if not isinstance(item, dict):
-            continue
-        for c in item.get("content", []) or []:
-            if isinstance(c, dict):
-                t = c.get("text")
-                if isinstance(t, str) and t.strip():
-                    parts.append(t)
-    if parts:
-        return "\n".join(parts)
-    raise RuntimeError("Could not extract text output from batch response body.")
-
-
-def _count_completed_web_search_calls_from_body(body: Dict[str, Any]) -> int:
-    n = 0
-    for item in body.get("output", []) or []:
-        if not isinstance(item, dict):
-            continue
-        if item.get("type") != "web_search_call":
-            continue
-        if item.get("status") == "completed":
-            n += 1
-    return n
-
-
-def _extract_url_citations_from_body(body: Dict[str, Any]) -> List[Dict[str, str]]:
+    web_search_calls = 0
     citations: List[Dict[str, str]] = []
     seen: set[str] = set()
-    for item in body.get("output", []) or []:
+    for item in body.get("output") or ():
         if not isinstance(item, dict):
             continue
-        if item.get("type") != "message":
+        item_get = item.get
+        item_type = item_get("type")
+        if item_type == "web_search_call":
+            if item_get("status") == "completed":
+                web_search_calls += 1
+            continue
+        if item_type != "message":
             continue
-        for c in item.get("content", []) or []:
+        for c in item_get("content") or ():
             if not isinstance(c, dict):
                 continue
-            for ann in c.get("annotations", []) or []:
-                if not isinstance(ann, dict):
-                    continue
-                if ann.get("type") != "url_citation":
+            t = c.get("text")
+            if isinstance(t, str) and t.strip():
+                parts.append(t)
+            for ann in c.get("annotations") or ():
+                if not isinstance(ann, dict) or ann.get("type") != "url_citation":
                     continue
                 uc = ann.get("url_citation") or {}
                 url = uc.get("url")
-                title = uc.get("title", "")
                 if isinstance(url, str) and url and url not in seen:
-                    citations.append({"url": url, "title": title or ""})
                     seen.add(url)
-    return citations
+                    citations.append({"url": url, "title": uc.get("title") or ""})
+
+    # Prefer output_text convenience field.
+    out_text = body.get("output_text")
+    text = out_text if isinstance(out_text, str) and out_text.strip() else "\n".join(parts)
+    return text, web_search_calls, citations
 
 
 def _usage_from_body(body: Dict[str, Any]) -> Dict[str, Any]:
@@ -207,7 +191,7 @@ def _usage_from_body(body: Dict[str, Any]) -> Dict[str, Any]:
     return usage if isinstance(usage, dict) else {}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BatchParsedResult:
     custom_id: str
     status_code: int
@@ -219,12 +203,13 @@ class BatchParsedResult:
 
 
 def parse_batch_output_jsonl(path: Path) -> Iterator[BatchParsedResult]:
-    with path.open("r", encoding="utf-8") as f:
+    # Read bytes: orjson (via evaluator._json_loads) parses them without a str decode per line.
+    with path.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            obj = json.loads(line)
+            obj = evaluator._json_loads(line)
             custom_id = obj.get("custom_id", "")
             resp = obj.get("response")
             err = obj.get("error")
@@ -244,28 +229,146 @@ def parse_batch_output_jsonl(path: Path) -> Iterator[BatchParsedResult]:
             if not isinstance(body, dict):
                 body = {}
 
+            text, web_search_calls, url_citations = _scan_output(body)
             if status_code != 200:
                 yield BatchParsedResult(
                     custom_id=custom_id,
                     status_code=status_code,
                     model_result=None,
                     usage=_usage_from_body(body),
-                    web_search_calls=_count_completed_web_search_calls_from_body(body),
-                    url_citations=_extract_url_citations_from_body(body),
+                    web_search_calls=web_search_calls,
+                    url_citations=url_citations,
                     error=err if isinstance(err, dict) else None,
                 )
                 continue
 
-            text = _extract_json_text_from_body(body)
-            model_result = json.loads(text)
+            if not text:
+                raise RuntimeError("Could not extract text output from batch response body.")
+            model_result = evaluator._json_loads(text)
             yield BatchParsedResult(
                 custom_id=custom_id,
                 status_code=status_code,
                 model_result=model_result,
                 usage=_usage_from_body(body),
-                web_search_calls=_count_completed_web_search_calls_from_body(body),
-                url_citations=_extract_url_citations_from_body(body),
+                web_search_calls=web_search_calls,
+                url_citations=url_citations,
                 error=None,
             )
 
 
+_BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def _batch_result_triple(obj: Dict[str, Any]) -> Any:
+    """Map one batch output line to the evaluator's (result, usage, web_search_debug) triple, or an exception."""
+    resp = obj.get("response") or {}
+    status_code = int(resp.get("status_code", 0) or 0)
+    body = resp.get("body") or {}
+    if status_code != 200 or not isinstance(body, dict):
+        return RuntimeError(f"Batch request {obj.get('custom_id')!r} failed: status={status_code} error={obj.get('error')}")
+    retry_meta = evaluator._new_retry_meta("batch")
+    retry_meta["attempts"] = 1
+    # construct() builds nested SDK objects without strict validation, matching how the SDK parses live responses.
+    try:
+        return evaluator._parse_response(Response.construct(**body), retry_meta)
+    except Exception as e:  # e.g. truncated/refused output that is not JSON; keep the rest of the batch
+        return e
+
+
+def _run_batch_job(
+    lines: List[BatchRequestLine],
+    *,
+    completion_window: str,
+    poll_interval_seconds: float,
+    max_poll_interval_seconds: float,
+) -> Tuple[Any, Dict[str, Any]]:
+    """Upload `lines`, create the batch and poll until it is terminal. Returns (batch, {custom_id: result triple or exception})."""
+    client = evaluator._get_client()
+    with tempfile.TemporaryDirectory() as tmp:
+        in_path = Path(tmp) / "batch_input.jsonl"
+        write_batch_input_jsonl(lines, in_path)
+        with in_path.open("rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+
+    batch = client.batches.create(
+        input_file_id=input_file.id, endpoint="/v1/responses", completion_window=completion_window
+    )
+    delay = float(poll_interval_seconds)
+    while batch.status not in _BATCH_TERMINAL_STATUSES:
+        time.sleep(delay)
+        delay = min(float(max_poll_interval_seconds), delay * 2)
+        batch = client.batches.retrieve(batch.id)
+
+    by_id: Dict[str, Any] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            obj = evaluator._json_loads(line)
+            by_id[str(obj["custom_id"])] = _batch_result_triple(obj)
+    return batch, by_id
+
+
+def evaluate_companies_batch(
+    urls: Iterable[str],
+    model: str,
+    *,
+    options: EvalOptions | None = None,
+    completion_window: str = "24h",
+    poll_interval_seconds: float = 30.0,
+    max_poll_interval_seconds: float = 600.0,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> List[Any]:
+    """Evaluate URLs through the OpenAI Batch API (about half the interactive token price, up to 24h turnaround).
+
+    Request bodies come from the same builder as the interactive evaluator, so prompts, schema and
+    prompt caching match. Blocks until the batch reaches a terminal status, then returns one
+    (result, usage, web_search_debug) tuple per URL in input order. With return_exceptions=True,
+    failed URLs yield the exception instead of aborting.
+
+    `result_cache` works as for the interactive evaluator: cached URLs are answered from it (marked
+    `cache_hit`) and left out of the batch, and successful batch results are stored. No batch is
+    submitted when every URL is cached.
+    """
+    opts = evaluator._resolve_options(options, kwargs)
+    urls = list(urls)
+    results: List[Any] = [None] * len(urls)
+    cache_keys: List[str | None] = [None] * len(urls)
+    lines: List[BatchRequestLine] = []
+    for idx, u in enumerate(urls):
+        cache_keys[idx], hit = evaluator._cache_lookup(u, model, opts)
+        if hit is not None:
+            results[idx] = hit
+            continue
+        body, _st = evaluator._prepare_request(u, model, opts)
+        # Batch pricing replaces service tiers; custom_id is the input position so duplicate URLs stay distinct.
+        body.pop("service_tier", None)
+        # No 400 fallback once a batch is submitted, so only send retention when the caller asked for it.
+        if not opts.prompt_cache_retention:
+            body.pop("prompt_cache_retention", None)
+        lines.append(BatchRequestLine(custom_id=str(idx), method="POST", url="/v1/responses", body=body))
+
+    if lines:
+        batch, by_id = _run_batch_job(
+            lines,
+            completion_window=completion_window,
+            poll_interval_seconds=poll_interval_seconds,
+            max_poll_interval_seconds=max_poll_interval_seconds,
+        )
+        for line in lines:
+            idx = int(line.custom_id)
+            r = by_id.get(line.custom_id)
+            if r is None:
+                r = RuntimeError(f"Batch {batch.id} ended with status={batch.status!r}; no result for {urls[idx]!r}")
+            elif not isinstance(r, Exception) and cache_keys[idx] is not None:
+                opts.result_cache.set(cache_keys[idx], r)
+            results[idx] = r
+
+    if not return_exceptions:
+        for r in results:
+            if isinstance(r, Exception):
+                raise r
+    return results
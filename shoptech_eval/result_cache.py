@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+
+class DiskCache:
+    """
+    Persistent result cache (stdlib sqlite3 + pickle) with the `get`/`set` shape of `diskcache.Cache`.
+
+    Plugs into `EvalOptions.result_cache` and the Gemini evaluator's `result_cache` argument.
+    Entries expire after `default_ttl` seconds (None = never) unless `set(..., expire=...)` overrides it.
+    """
+
+    def __init__(self, directory: str | Path, *, default_ttl: float | None = None) -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.directory / "results.sqlite3"), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, expires_at REAL, value BLOB NOT NULL)"
+            )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT expires_at, value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return default
+            expires_at, blob = row
+            if expires_at is not None and expires_at <= time.time():
+                with self._conn:
+                    self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return default
+        return pickle.loads(blob)
+
+    def set(self, key: str, value: Any, expire: float | None = None) -> None:
+        ttl = self.default_ttl if expire is None else expire
+        expires_at = (time.time() + float(ttl)) if ttl is not None else None
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, expires_at, value) VALUES (?, ?, ?)", (key, expires_at, blob)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 
 
 DEFAULT_RUBRIC_FILE = Path("rubrics/shop_platform_rubric_v1.md")
 
 
+@lru_cache(maxsize=8)
 def load_rubric_text(rubric_file: str | None) -> tuple[str, str]:
-    """Returns (rubric_path_str, rubric_text)."""
+    """Returns (rubric_path_str, rubric_text).
+
+    Cached per `rubric_file`: rubrics are static for the life of a run, so each file is read once.
+    """
     path = Path(rubric_file) if rubric_file else DEFAULT_RUBRIC_FILE
     text = path.read_text(encoding="utf-8").strip()
     if not text:
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Any, Callable
 
+import pytest
 
 # Ensure the repo root is importable in all environments (esp. Windows + pytest import modes).
 ROOT = Path(__file__).resolve().parents[1]
@@ -10,3 +12,27 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 
+@pytest.fixture(autouse=True)
+def _clear_prompt_caches():
+    # Prompt builders are lru_cached; tests that monkeypatch the rubric loader must not leak into others.
+    from shoptech_eval import evaluator
+
+    evaluator._build_system_prompt.cache_clear()
+    yield
+    evaluator._build_system_prompt.cache_clear()
+
+
+@pytest.fixture
+def fake_openai(monkeypatch: pytest.MonkeyPatch) -> Callable[..., Any]:
+    """Install `fake_client` as the evaluator's OpenAI client (if given) and a small fixed rubric."""
+    from shoptech_eval import evaluator
+
+    def _install(fake_client: Any = None) -> Any:
+        if fake_client is not None:
+            monkeypatch.setattr(evaluator, "OpenAI", lambda **_kw: fake_client)
+            monkeypatch.setattr(evaluator, "_CLIENT", None)  # _get_client builds from the patched OpenAI
+        monkeypatch.setattr(evaluator, "load_rubric_text", lambda _: ("rubrics/test.md", "RUBRIC_BODY"))
+        evaluator._build_system_prompt.cache_clear()
+        return fake_client
+
+    return _install
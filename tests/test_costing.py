@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from shoptech_eval.costing import PricingPer1M, compute_cost_usd
+from shoptech_eval.costing import PricingPer1M, compute_cost_usd, compute_cost_usd_batch
 
 
 class _Usage:
@@ -23,3 +23,11 @@ def test_compute_cost_usd_accounts_for_cached_tokens() -> None:
     assert abs(cost - 15.5925) < 1e-9
 
 
+
+
+def test_compute_cost_usd_batch_matches_scalar() -> None:
+    pricing = PricingPer1M(input_usd=1.75, cached_input_usd=0.175, output_usd=14.0)
+    usages = [_Usage(), _Usage()]
+    costs = compute_cost_usd_batch(usages, pricing)
+    assert costs == [compute_cost_usd(u, pricing) for u in usages]
+    assert compute_cost_usd_batch([], pricing) == []
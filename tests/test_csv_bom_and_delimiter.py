@@ -4,6 +4,7 @@ import json
 import sys
 from pathlib import Path
 
+import scripts._common as common
 import scripts.evaluate_list as runner
 
 
@@ -87,3 +88,20 @@ def test_semicolon_csv_with_bom_and_commas_in_fields_parses_correctly(tmp_path:
     assert rec["website"] == "acme.example"
 
 
+
+
+def test_projected_csv_rows_match_dictreader_for_requested_columns(tmp_path: Path) -> None:
+    sample = tmp_path / "wide.csv"
+    sample.write_text("\ufeffName;Website;Notes;Extra\nA;a.com;x;y\n\nB;b.com\n", encoding="utf-8")
+
+    full = list(runner._iter_csv_rows(sample, csv_delimiter=None))
+    projected = list(runner._iter_csv_rows(sample, csv_delimiter=None, columns=["Website", "Name", "Missing"]))
+
+    assert projected == [{"Website": "a.com", "Name": "A"}, {"Website": "b.com", "Name": "B"}]
+    assert [{k: r[k] for k in ("Website", "Name")} for r in full] == projected
+
+
+def test_detect_csv_delimiter_uses_first_nonblank_header_line() -> None:
+    assert common.detect_csv_delimiter(b"\n\xef\xbb\xbfName;Website;Notes\nA;a.com;\"x, y, z\"\n") == ";"
+    assert common.detect_csv_delimiter(b"Name\tWebsite\n") == "\t"
+    assert common.detect_csv_delimiter(b"Website\na.com\n") == ","  # single column
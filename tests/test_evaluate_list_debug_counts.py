@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
 import sys
+import time
 from pathlib import Path
 
+import pytest
+
 import scripts.evaluate_list as runner
 
 
@@ -87,3 +91,75 @@ def test_evaluate_list_debug_web_search_counts_query_vs_open(tmp_path: Path, mon
     assert rec["web_search_tool_cost_usd"] == 0.01
 
 
+
+
+def test_evaluate_list_concurrency_writes_every_row_without_sleeping(tmp_path: Path, monkeypatch) -> None:
+    sample = tmp_path / "sample.txt"
+    sample.write_text("".join(f"s{i}.com\n" for i in range(7)), encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    out_csv = tmp_path / "out.csv"
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    class _Usage:
+        input_tokens = 0
+        output_tokens = 0
+        total_tokens = 0
+        input_tokens_details = type("X", (), {"cached_tokens": 0})()
+        output_tokens_details = type("Y", (), {"reasoning_tokens": 0})()
+
+    def _fake_eval(url: str, *_a, **_kw):
+        return ({"input_url": url, "confidence": "high", "final_platform": "shopify"}, _Usage(), 0, [])
+
+    def _no_sleep(_s: float) -> None:
+        raise AssertionError("--sleep should not apply to concurrent runs")
+
+    monkeypatch.setattr(runner, "evaluate_company_with_usage_and_web_search_artifacts", _fake_eval)
+    monkeypatch.setattr(runner.time, "sleep", _no_sleep)
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["evaluate_list.py", "--input", str(sample), "--out", str(out), "--out-csv", str(out_csv), "--concurrency", "3"],
+    )
+
+    assert runner.main() == 0
+    websites = sorted(json.loads(line)["website"] for line in out.read_text(encoding="utf-8").splitlines())
+    assert websites == [f"s{i}.com" for i in range(7)]
+    with out_csv.open(encoding="utf-8", newline="") as f:
+        assert len(list(csv.DictReader(f))) == 7
+
+
+def test_background_writer_writes_in_order_and_surfaces_errors() -> None:
+    out, out_csv = io.BytesIO(), io.StringIO()
+    w = runner._BackgroundWriter(out, out_csv, maxsize=16, batch_rows=4)
+    w.put(None, ["website"])
+    for i in range(50):
+        w.put({"i": i}, [f"s{i}.com"])
+    w.close()
+    assert [json.loads(line) for line in out.getvalue().splitlines()] == [{"i": i} for i in range(50)]
+    assert out_csv.getvalue().split() == ["website"] + [f"s{i}.com" for i in range(50)]
+
+    class _Broken(io.BytesIO):
+        def write(self, _b: bytes) -> int:
+            raise OSError("disk full")
+
+    w = runner._BackgroundWriter(_Broken(), io.StringIO())
+    w.put({"x": 1}, ["x"])
+    with pytest.raises(OSError, match="disk full"):
+        w.close()
+
+
+def test_background_writer_flushes_periodically_not_per_row() -> None:
+    class _CountingBytes(io.BytesIO):
+        flushes = 0
+
+        def flush(self) -> None:
+            type(self).flushes += 1
+
+    w = runner._BackgroundWriter(_CountingBytes(), io.StringIO(), flush_every=1000, flush_seconds=0.05)
+    for i in range(20):
+        w.put({"i": i}, [str(i)])
+    deadline = time.monotonic() + 5
+    while _CountingBytes.flushes == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 1 <= _CountingBytes.flushes < 20  # flushed once the rows were old, without waiting for close()
+    w.close()
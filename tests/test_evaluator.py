@@ -60,19 +60,8 @@ def test_extract_json_text_fallback_traversal() -> None:
     assert evaluator._extract_json_text(resp) == '{"a": \n1}'
 
 
-def test_evaluate_company_builds_prompt_and_normalizes_url(monkeypatch: Any) -> None:
-    fake_client = _FakeOpenAI()
-
-    def _fake_openai_ctor() -> _FakeOpenAI:
-        return fake_client
-
-    monkeypatch.setattr(evaluator, "OpenAI", _fake_openai_ctor)
-
-    # Make rubric deterministic and small.
-    def _fake_load_rubric_text(_: Optional[str]) -> tuple[str, str]:
-        return ("rubrics/test.md", "RUBRIC_BODY")
-
-    monkeypatch.setattr(evaluator, "load_rubric_text", _fake_load_rubric_text)
+def test_evaluate_company_builds_prompt_and_normalizes_url(fake_openai: Any) -> None:
+    fake_client = fake_openai(_FakeOpenAI())
 
     payload = {
         "input_url": "https://example.com",
@@ -108,3 +97,352 @@ def test_evaluate_company_builds_prompt_and_normalizes_url(monkeypatch: Any) ->
     assert "Shop website URL: https://example.com" in user_msg
 
 
+
+
+def test_build_system_prompt_reads_rubric_once_per_key(monkeypatch: Any) -> None:
+    reads: list[Optional[str]] = []
+
+    def _fake_load_rubric_text(rubric_file: Optional[str]) -> tuple[str, str]:
+        reads.append(rubric_file)
+        return ("rubrics/test.md", "RUBRIC_BODY")
+
+    monkeypatch.setattr(evaluator, "load_rubric_text", _fake_load_rubric_text)
+
+    first = evaluator._build_system_prompt("rubrics/test.md")
+    second = evaluator._build_system_prompt("rubrics/test.md")
+    assert first == second
+    assert reads == ["rubrics/test.md"]
+
+    system_prompt, cache_key, rubric_path = first
+    assert "RUBRIC_BODY" in system_prompt
+    assert rubric_path == "rubrics/test.md"
+    # Model is not part of the key so all models/retries with the same rubric share one cache slot.
+    assert cache_key.startswith("shoptech:")
+    assert "gpt-test" not in cache_key
+
+
+def test_evaluate_companies_async_bounds_concurrency_and_keeps_order(monkeypatch: Any, fake_openai: Any) -> None:
+    import asyncio
+
+    fake_openai()
+
+    state = {"in_flight": 0, "max_in_flight": 0, "closed": 0}
+
+    class _FakeAsyncResponses:
+        async def create(self, **kwargs: Any) -> _FakeResponse:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            await asyncio.sleep(0.01)
+            state["in_flight"] -= 1
+            url = kwargs["input"][1]["content"].rsplit("Shop website URL: ", 1)[1].strip()
+            return _FakeResponse(output_text=json.dumps({"input_url": url}))
+
+    class _FakeAsyncOpenAI:
+        def __init__(self, **_kw: Any) -> None:
+            self.responses = _FakeAsyncResponses()
+
+        async def close(self) -> None:
+            state["closed"] += 1
+
+    monkeypatch.setattr(evaluator, "AsyncOpenAI", _FakeAsyncOpenAI)
+
+    urls = [f"shop{i}.example" for i in range(6)]
+    out = asyncio.run(evaluator.evaluate_companies_async(urls, "gpt-test", concurrency=2))
+
+    assert [r[0]["input_url"] for r in out] == [f"https://{u}" for u in urls]
+    assert state["max_in_flight"] == 2
+    assert state["closed"] == 1  # the client it created is not leaked
+    assert out[0][2]["flex"]["attempts"] == 1
+
+
+def test_get_client_is_reused_across_calls(monkeypatch: Any) -> None:
+    created: list[_FakeOpenAI] = []
+
+    def _ctor(**_kw: Any) -> _FakeOpenAI:
+        c = _FakeOpenAI()
+        created.append(c)
+        return c
+
+    monkeypatch.setattr(evaluator, "OpenAI", _ctor)
+    monkeypatch.setattr(evaluator, "_CLIENT", None)
+    first = evaluator._get_client()
+    assert evaluator._get_client() is first
+    assert len(created) == 1
+
+
+def test_get_client_passes_tuned_http_client(monkeypatch: Any) -> None:
+    seen: Dict[str, Any] = {}
+
+    def _ctor(**kw: Any) -> _FakeOpenAI:
+        seen.update(kw)
+        return _FakeOpenAI()
+
+    monkeypatch.setattr(evaluator, "OpenAI", _ctor)
+    monkeypatch.setattr(evaluator, "_CLIENT", None)
+    monkeypatch.setattr(evaluator, "_http_client_kwargs", lambda: {"http2": False, "limits": "L"})
+    monkeypatch.setattr(evaluator, "DefaultHttpxClient", lambda **kw: ("http_client", kw))
+
+    evaluator._get_client()
+    assert seen["http_client"] == ("http_client", {"http2": False, "limits": "L"})
+
+
+def test_new_async_client_reports_every_429(monkeypatch: Any) -> None:
+    import asyncio
+    from types import SimpleNamespace
+
+    seen: Dict[str, Any] = {}
+    monkeypatch.setattr(evaluator, "DefaultAsyncHttpxClient", lambda **kw: seen.update(kw))
+    monkeypatch.setattr(evaluator, "AsyncOpenAI", lambda **kw: kw)
+
+    retry_afters: List[float | None] = []
+    evaluator.new_async_client(on_rate_limited=retry_afters.append)
+    (hook,) = seen["event_hooks"]["response"]
+    asyncio.run(hook(SimpleNamespace(status_code=200, headers={})))
+    asyncio.run(hook(SimpleNamespace(status_code=429, headers={"retry-after": "2"})))
+    asyncio.run(hook(SimpleNamespace(status_code=429, headers={})))
+    assert retry_afters == [2.0, None]
+
+
+def test_backoff_delay_is_capped_and_jittered() -> None:
+    assert 0.8 <= evaluator._backoff_delay(0) <= 1.2
+    assert 3.2 <= evaluator._backoff_delay(2) <= 4.8
+    assert 48.0 <= evaluator._backoff_delay(50) <= 72.0
+
+
+def test_eval_options_match_keyword_arguments(fake_openai: Any) -> None:
+    fake_client = _FakeOpenAI()
+    fake_openai(fake_client)
+    fake_client.responses.response_to_return = _FakeResponse(output_text='{"input_url": "https://a.com"}')
+
+    evaluator.evaluate_company("a.com", "gpt-test", include_sources=True, max_tool_calls=2)
+    via_kwargs = fake_client.responses.last_kwargs
+
+    opts = evaluator.EvalOptions(include_sources=True, max_tool_calls=1)
+    evaluator.evaluate_company("a.com", "gpt-test", options=opts, max_tool_calls=2)
+    assert fake_client.responses.last_kwargs == via_kwargs
+    assert via_kwargs is not None and "sources" in json.dumps(via_kwargs["text"])
+
+    try:
+        evaluator.evaluate_company("a.com", "gpt-test", not_an_option=True)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("unknown keyword should raise TypeError")
+
+
+def test_stream_option_parses_accumulated_deltas(fake_openai: Any) -> None:
+    class _Event:
+        def __init__(self, type_: str, delta: str = "") -> None:
+            self.type = type_
+            self.delta = delta
+
+    class _Stream:
+        def __enter__(self) -> "_Stream":
+            return self
+
+        def __exit__(self, *_exc: Any) -> None:
+            return None
+
+        def __iter__(self) -> Any:
+            yield _Event("response.created")
+            yield _Event("response.output_text.delta", '{"input_url": ')
+            yield _Event("response.output_text.delta", '"https://a.com"}')
+
+        def get_final_response(self) -> _FakeResponse:
+            # output_text deliberately differs: the streamed deltas must win.
+            return _FakeResponse(output_text='{"input_url": "unused"}')
+
+    fake_client = _FakeOpenAI()
+    fake_client.responses.stream = lambda **_kw: _Stream()  # type: ignore[attr-defined]
+    fake_openai(fake_client)
+
+    deltas: List[str] = []
+    result = evaluator.evaluate_company("a.com", "gpt-test", stream=True, on_text_delta=deltas.append)
+    assert result == {"input_url": "https://a.com"}
+    assert deltas == ['{"input_url": ', '"https://a.com"}']
+
+
+def test_result_cache_skips_repeat_requests(fake_openai: Any) -> None:
+    class _DictCache(dict):
+        def set(self, key: str, value: Any) -> None:
+            self[key] = value
+
+    calls: List[Dict[str, Any]] = []
+    fake_client = _FakeOpenAI()
+    fake_client.responses.response_to_return = _FakeResponse(output_text='{"input_url": "https://a.com"}')
+    original_create = fake_client.responses.create
+    fake_client.responses.create = lambda **kw: (calls.append(kw), original_create(**kw))[1]  # type: ignore[method-assign]
+    fake_openai(fake_client)
+
+    opts = evaluator.EvalOptions(result_cache=_DictCache())
+    first = evaluator.evaluate_company("a.com", "gpt-test", options=opts)
+    # Same normalized URL hits the cache; a different prompt knob does not.
+    assert evaluator.evaluate_company("https://a.com", "gpt-test", options=opts) == first
+    assert len(calls) == 1
+    evaluator.evaluate_company("a.com", "gpt-test", options=opts, include_sources=True)
+    assert len(calls) == 2
+
+
+def test_retention_rejection_is_remembered_per_model(monkeypatch: Any, fake_openai: Any) -> None:
+    class _BadRequest(Exception):
+        status_code = 400
+        message = "Error code: 400 - prompt_cache_retention is not supported for this model"
+
+    sent: List[Dict[str, Any]] = []
+    fake_client = _FakeOpenAI()
+
+    def _create(**kw: Any) -> _FakeResponse:
+        sent.append(dict(kw))
+        if "prompt_cache_retention" in kw:
+            raise _BadRequest()
+        return _FakeResponse(output_text='{"input_url": "https://a.com"}')
+
+    fake_client.responses.create = _create  # type: ignore[method-assign]
+    fake_openai(fake_client)
+    monkeypatch.setattr(evaluator, "_MODELS_WITHOUT_RETENTION", set())
+
+    evaluator.evaluate_company("a.com", "gpt-old", prompt_cache=True)
+    evaluator.evaluate_company("b.com", "gpt-old", prompt_cache=True)
+    assert ["prompt_cache_retention" in kw for kw in sent] == [True, False, False]
+
+
+def test_plain_wrappers_skip_web_search_debug_pass(monkeypatch: Any, fake_openai: Any) -> None:
+    fake_client = _FakeOpenAI()
+    fake_client.responses.response_to_return = _FakeResponse(output_text='{"input_url": "https://a.com"}')
+    fake_openai(fake_client)
+
+    debug_calls: List[Any] = []
+    real_debug = evaluator._web_search_call_debug
+    monkeypatch.setattr(evaluator, "_web_search_call_debug", lambda resp: (debug_calls.append(resp), real_debug(resp))[1])
+
+    evaluator.evaluate_company("a.com", "gpt-test")
+    assert debug_calls == []
+    _result, _usage, ws = evaluator._evaluate_company_raw("a.com", "gpt-test", evaluator.EvalOptions())
+    assert len(debug_calls) == 1 and "flex" in ws and "by_kind" in ws
+
+
+def test_retry_knobs_do_not_change_the_shared_prompt_prefix(fake_openai: Any) -> None:
+    fake_openai()
+
+    first, _st = evaluator._prepare_request("a.com", "gpt-test", evaluator.EvalOptions(max_tool_calls=1))
+    retry, _st = evaluator._prepare_request(
+        "a.com", "gpt-test", evaluator.EvalOptions(max_tool_calls=3, extra_user_instructions="Search twice.")
+    )
+    first_user, retry_user = first["input"][1]["content"], retry["input"][1]["content"]
+    fixed = first_user[: first_user.index("- Tool-call budget")]
+    assert retry_user.startswith(fixed)
+    assert "do NOT include URLs in `reasoning`" in fixed
+    assert retry_user.index("Search twice.") < retry_user.index("Shop website URL:")
+
+
+def test_timeout_client_is_built_once_per_timeout(fake_openai: Any) -> None:
+    derived: List[float] = []
+
+    class _TimeoutFakeOpenAI(_FakeOpenAI):
+        def with_options(self, *, timeout: float) -> "_TimeoutFakeOpenAI":
+            derived.append(timeout)
+            return self
+
+    fake_client = _TimeoutFakeOpenAI()
+    fake_client.responses.response_to_return = _FakeResponse(output_text='{"input_url": "https://a.com"}')
+    fake_openai(fake_client)
+
+    for url in ("a.com", "b.com", "c.com"):
+        evaluator.evaluate_company(url, "gpt-test", timeout_seconds=900)
+    evaluator.evaluate_company("a.com", "gpt-test", timeout_seconds=30)
+    assert derived == [900.0, 30.0]
+
+    # The cached views do not keep a dropped client alive.
+    import gc
+    import weakref
+
+    other = _TimeoutFakeOpenAI()
+    evaluator._client_with_timeout(other, 60)
+    ref = weakref.ref(other)
+    del other
+    gc.collect()
+    assert ref() is None
+
+
+def test_retry_delay_honors_retry_after(monkeypatch: Any) -> None:
+    from types import SimpleNamespace
+
+    def _exc(headers: Dict[str, str]) -> Exception:
+        e = Exception("rate limited")
+        e.response = SimpleNamespace(status_code=429, headers=headers)  # type: ignore[attr-defined]
+        return e
+
+    monkeypatch.setattr(evaluator.random, "uniform", lambda a, b: a)  # no jitter
+    assert evaluator._retry_delay(_exc({"retry-after-ms": "1500"}), 0) == 1.5
+    assert evaluator._retry_delay(_exc({"retry-after": "7"}), 0) == 7.0
+    assert evaluator._retry_delay(_exc({"retry-after": "86400"}), 0) == evaluator._RETRY_AFTER_CAP_SECONDS
+    # No header (or garbage): exponential backoff.
+    assert evaluator._retry_delay(_exc({}), 3) == evaluator._BACKOFF_SECONDS[3] * 0.8
+    assert evaluator._retry_after_seconds(_exc({"retry-after": "soon"})) is None
+
+
+def test_flex_429_retries_then_falls_back_in_sync_and_async(monkeypatch: Any, fake_openai: Any) -> None:
+    import asyncio
+
+    class _Unavailable(Exception):
+        status_code = 429
+        message = "Resource Unavailable"
+
+    sent: List[Dict[str, Any]] = []
+
+    def _respond(kw: Dict[str, Any]) -> _FakeResponse:
+        sent.append(dict(kw))
+        if kw.get("service_tier") == "flex":
+            raise _Unavailable()
+        return _FakeResponse(output_text='{"input_url": "https://a.com"}')
+
+    class _AsyncResponses:
+        async def create(self, **kw: Any) -> _FakeResponse:
+            return _respond(kw)
+
+    fake_client = _FakeOpenAI()
+    fake_client.responses.create = lambda **kw: _respond(kw)  # type: ignore[method-assign]
+    fake_openai(fake_client)
+    monkeypatch.setattr(evaluator, "_retry_delay", lambda _e, _a: 0.0)
+    opts = dict(service_tier="flex", flex_max_retries=2, flex_fallback_to_auto=True)
+
+    _r, _u, ws_sync = evaluator._evaluate_company_raw("a.com", "gpt-test", evaluator._resolve_options(None, opts))
+    async_client = type("C", (), {"responses": _AsyncResponses()})()
+    _r, _u, ws_async = asyncio.run(
+        evaluator._evaluate_company_raw_async(async_client, "a.com", "gpt-test", evaluator._resolve_options(None, opts))
+    )
+
+    assert [kw.get("service_tier") for kw in sent] == ["flex", "flex", "flex", None] * 2
+    for ws in (ws_sync, ws_async):
+        assert ws["flex"]["attempts"] == 4 and ws["flex"]["retries"] == 2
+        assert ws["flex"]["fallback_used"] and ws["flex"]["service_tier_used"] == "auto"
+
+
+def test_aevaluate_closes_only_the_client_it_creates(monkeypatch: Any, fake_openai: Any) -> None:
+    import asyncio
+
+    closed: List[str] = []
+
+    class _FakeAsyncOpenAI:
+        def __init__(self, name: str = "owned", **_kw: Any) -> None:
+            self.name = name
+            self.responses = self
+
+        async def create(self, **_kw: Any) -> _FakeResponse:
+            resp = _FakeResponse(output_text='{"input_url": "https://a.com"}')
+            resp.usage = object()  # type: ignore[assignment]
+            return resp
+
+        async def close(self) -> None:
+            closed.append(self.name)
+
+    monkeypatch.setattr(evaluator, "AsyncOpenAI", _FakeAsyncOpenAI)
+    fake_openai()
+
+    asyncio.run(evaluator.aevaluate_company_with_usage_and_web_search_debug("a.com", "gpt-test"))
+    asyncio.run(
+        evaluator.aevaluate_company_with_usage_and_web_search_debug(
+            "a.com", "gpt-test", client=_FakeAsyncOpenAI("caller")
+        )
+    )
+    assert closed == ["owned"]
@@ -6,6 +6,7 @@ from pathlib import Path
 
 import scripts.evaluate as eval_one
 import scripts.evaluate_list as eval_list
+import shoptech_eval
 
 
 def test_evaluate_list_applies_flex_discount_to_token_cost_only(tmp_path: Path, monkeypatch) -> None:
@@ -111,7 +112,7 @@ def test_evaluate_single_applies_flex_discount_to_token_cost_only(monkeypatch, c
             [],
         )
 
-    monkeypatch.setattr(eval_one, "evaluate_company_with_usage_and_web_search_artifacts", _fake_eval)
+    monkeypatch.setattr(shoptech_eval, "evaluate_company_with_usage_and_web_search_artifacts", _fake_eval)
 
     monkeypatch.setattr(
         sys,
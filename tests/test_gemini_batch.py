@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+import shoptech_eval.gemini_batch as gemini_batch
+import shoptech_eval.gemini_evaluator as gemini_evaluator
+
+
+def _ok_line(key: str, text: str) -> Dict[str, Any]:
+    response = {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "groundingMetadata": {"webSearchQueries": ["q1", "q2"]},
+            }
+        ],
+        "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 5, "totalTokenCount": 15},
+    }
+    return {"key": key, "response": response}
+
+
+class _FakeGeminiBatchClient:
+    def __init__(self, output_lines: List[Dict[str, Any]], *, state: str = "JOB_STATE_SUCCEEDED") -> None:
+        self.uploaded: List[Dict[str, Any]] = []
+        self.upload_paths: List[str] = []
+        self._output = "\n".join(json.dumps(o) for o in output_lines).encode("utf-8")
+        self._state = state
+        self.files = SimpleNamespace(upload=self._upload, download=self._download)
+        self.batches = SimpleNamespace(create=self._create, get=self._get)
+
+    def _upload(self, *, file: str, config: Any) -> Any:
+        self.upload_paths.append(file)
+        self.uploaded = [json.loads(line) for line in Path(file).read_text(encoding="utf-8").splitlines()]
+        return SimpleNamespace(name="files/in")
+
+    def _download(self, *, file: str) -> bytes:
+        assert file == "files/out"
+        return self._output
+
+    def _create(self, **_kw: Any) -> Any:
+        return SimpleNamespace(name="batches/1", state=SimpleNamespace(name="JOB_STATE_RUNNING"), dest=None)
+
+    def _get(self, *, name: str) -> Any:
+        dest = SimpleNamespace(file_name="files/out") if self._output else None
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=self._state), dest=dest, error=None)
+
+
+@pytest.fixture
+def fake_rubric(monkeypatch: Any) -> Iterator[None]:
+    monkeypatch.setattr(gemini_evaluator, "load_rubric_text", lambda _: ("rubrics/test.md", "RUBRIC_BODY"))
+    gemini_evaluator._system_instruction.cache_clear()
+    yield
+    gemini_evaluator._system_instruction.cache_clear()
+
+
+def _install(monkeypatch: Any, fake: _FakeGeminiBatchClient) -> None:
+    monkeypatch.setattr(gemini_batch, "_client", lambda _key: fake)
+    monkeypatch.setattr(gemini_batch.time, "sleep", lambda _s: None)
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+
+
+def test_batch_lines_are_keyed_by_position_and_share_one_system_instruction(fake_rubric: None) -> None:
+    lines = gemini_batch.build_gemini_batch_lines(["a.com", "https://b.com", "a.com"])
+
+    assert [line.key for line in lines] == ["0", "1", "2"]
+    first, second, third = (line.request for line in lines)
+    system_text = first["systemInstruction"]["parts"][0]["text"]
+    assert second["systemInstruction"]["parts"][0]["text"] is system_text  # built once per batch
+    assert "RUBRIC_BODY" in system_text
+    assert "Shop website URL: https://a.com" in first["contents"][0]["parts"][0]["text"]
+    assert "Shop website URL: https://b.com" in second["contents"][0]["parts"][0]["text"]
+    assert first["contents"] == third["contents"]
+    assert first["tools"] == [{"googleSearch": {}}]
+    assert first["generationConfig"]["responseMimeType"] == "application/json"
+
+
+def test_batch_input_jsonl_round_trip(tmp_path: Path, fake_rubric: None) -> None:
+    lines = gemini_batch.build_gemini_batch_lines(["müller.de"])
+    path = tmp_path / "nested" / "in.jsonl"
+    gemini_batch.write_gemini_batch_input_jsonl(lines, path)
+
+    raw = path.read_bytes()
+    assert raw.endswith(b"\n") and "müller.de".encode("utf-8") in raw  # no ASCII escaping
+    (obj,) = [json.loads(line) for line in raw.splitlines()]
+    assert obj == {"key": "0", "request": lines[0].request}
+
+
+def test_parse_batch_line_maps_result_usage_and_grounding() -> None:
+    parsed = gemini_batch._parse_gemini_batch_line(_ok_line("3", json.dumps({"input_url": "https://a.com"})))
+    assert parsed.key == "3"
+    assert parsed.model_result == {"input_url": "https://a.com"}
+    assert parsed.error is None
+    assert parsed.search_queries == 2
+    assert parsed.usage.prompt_token_count == 10
+    assert parsed.grounding["web_search_queries"] == ["q1", "q2"]
+
+
+def test_parse_batch_line_unwraps_fenced_json() -> None:
+    parsed = gemini_batch._parse_gemini_batch_line(_ok_line("0", '```json\n{"input_url": "https://a.com"}\n```'))
+    assert parsed.model_result == {"input_url": "https://a.com"}
+
+
+def test_parse_batch_line_reports_bad_output_as_error() -> None:
+    truncated = gemini_batch._parse_gemini_batch_line(_ok_line("0", '{"input_url": "https://a.'))
+    assert truncated.model_result is None and "non-JSON" in truncated.error["message"]
+    assert truncated.search_queries == 2  # the searches were still billed
+
+    failed = gemini_batch._parse_gemini_batch_line({"key": "1", "error": {"code": 500, "message": "boom"}})
+    assert failed.model_result is None and failed.error == {"code": 500, "message": "boom"}
+
+    missing = gemini_batch._parse_gemini_batch_line({"key": "2"})
+    assert missing.error == {"message": "missing response"}
+
+
+def test_evaluate_batch_returns_tuples_in_input_order(monkeypatch: Any, fake_rubric: None) -> None:
+    # Output lines arrive out of order; the bad line maps to an exception.
+    fake = _FakeGeminiBatchClient(
+        [
+            _ok_line("2", json.dumps({"input_url": "https://c.com"})),
+            {"key": "1", "error": {"message": "boom"}},
+            _ok_line("0", json.dumps({"input_url": "https://a.com"})),
+        ]
+    )
+    _install(monkeypatch, fake)
+
+    out = gemini_batch.evaluate_companies_gemini_batch(["a.com", "b.com", "c.com"], return_exceptions=True)
+
+    assert [line["key"] for line in fake.uploaded] == ["0", "1", "2"]
+    result, usage, search_queries, grounding = out[0]
+    assert result == {"input_url": "https://a.com"}
+    assert usage.total_token_count == 15 and search_queries == 2
+    assert grounding["web_search_queries"] == ["q1", "q2"]
+    assert isinstance(out[1], RuntimeError) and "boom" in str(out[1])
+    assert out[2][0] == {"input_url": "https://c.com"}
+    # Default work dir is a per-run temporary directory, removed afterwards.
+    assert not Path(fake.upload_paths[0]).exists()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        gemini_batch.evaluate_companies_gemini_batch(["a.com", "b.com", "c.com"])
+
+
+def test_failed_job_maps_to_per_url_errors(monkeypatch: Any, fake_rubric: None, tmp_path: Path) -> None:
+    fake = _FakeGeminiBatchClient([], state="JOB_STATE_FAILED")
+    _install(monkeypatch, fake)
+
+    out = gemini_batch.evaluate_companies_gemini_batch(["a.com", "b.com"], work_dir=tmp_path, return_exceptions=True)
+
+    assert len(out) == 2 and all(isinstance(e, RuntimeError) for e in out)
+    assert "JOB_STATE_FAILED" in str(out[0]) and "'b.com'" in str(out[1])
+    assert (tmp_path / "batch_input.jsonl").exists()  # an explicit work_dir is kept
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+pytest.importorskip("google.genai")
+
+import shoptech_eval.gemini_evaluator as gemini_evaluator
+
+
+class _DictCache(dict):
+    def __init__(self) -> None:
+        super().__init__()
+        self.expires: List[Any] = []
+
+    def set(self, key: str, value: Any, expire: Any = None) -> None:
+        self[key] = value
+        self.expires.append(expire)
+
+
+def _install(monkeypatch: Any) -> List[str]:
+    calls: List[str] = []
+
+    def _generate_content(*, model: str, contents: str, config: Any) -> Any:
+        calls.append(contents)
+        return SimpleNamespace(
+            text=json.dumps({"input_url": "https://a.com"}),
+            usage_metadata={"total_token_count": 15},
+            candidates=[SimpleNamespace(grounding_metadata=SimpleNamespace(web_search_queries=["q"]))],
+        )
+
+    fake = SimpleNamespace(models=SimpleNamespace(generate_content=_generate_content))
+    monkeypatch.setattr(gemini_evaluator, "_client", lambda _key: fake)
+    monkeypatch.setattr(gemini_evaluator, "load_rubric_text", lambda _: ("rubrics/test.md", "RUBRIC_BODY"))
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    for fn in (gemini_evaluator._system_instruction, gemini_evaluator._rubric_hash, gemini_evaluator._generate_config):
+        fn.cache_clear()
+    return calls
+
+
+def _evaluate(cache: _DictCache, url: str = "a.com", **kw: Any) -> Tuple[Dict[str, Any], Any, int, Dict[str, Any]]:
+    return gemini_evaluator.evaluate_company_gemini_with_debug(url, "gemini-test", result_cache=cache, **kw)
+
+
+def test_result_cache_marks_replays_and_honours_refresh_and_ttl(monkeypatch: Any) -> None:
+    calls = _install(monkeypatch)
+    cache = _DictCache()
+
+    result, usage, search_queries, debug = _evaluate(cache, cache_ttl=60)
+    assert result == {"input_url": "https://a.com"} and search_queries == 1
+    assert "cache_hit" not in debug
+    assert len(calls) == 1 and cache.expires == [60]
+
+    # Same normalized URL: served from the cache and flagged; the stored entry stays unmarked.
+    replay = _evaluate(cache, url="https://a.com")
+    assert len(calls) == 1
+    assert replay[:3] == (result, usage, search_queries) and replay[3]["cache_hit"] is True
+    assert "cache_hit" not in next(iter(cache.values()))[3]
+
+    # force_refresh skips the lookup but still stores the fresh result (no TTL given -> plain set).
+    fresh = _evaluate(cache, force_refresh=True)
+    assert len(calls) == 2 and "cache_hit" not in fresh[3]
+    assert cache.expires == [60, None]
+
+    # A different site misses.
+    _evaluate(cache, url="b.com")
+    assert len(calls) == 3
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import shoptech_eval.evaluator as evaluator
+import shoptech_eval.openai_batch as openai_batch
+
+
+def _ok_line(custom_id: str, input_url: str) -> Dict[str, Any]:
+    body = {
+        "id": f"resp_{custom_id}",
+        "output": [
+            {"type": "web_search_call", "id": "ws", "status": "completed", "action": {"type": "search", "query": "q"}},
+            {
+                "type": "message",
+                "id": "msg",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": json.dumps({"input_url": input_url}), "annotations": []}],
+            },
+        ],
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "total_tokens": 15,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+    return {"custom_id": custom_id, "response": {"status_code": 200, "body": body}, "error": None}
+
+
+class _FakeBatchClient:
+    def __init__(self, output_lines: List[Dict[str, Any]]) -> None:
+        self.uploaded: List[Dict[str, Any]] = []
+        self._output = "\n".join(json.dumps(o) for o in output_lines)
+        self._polls = 0
+        self.files = SimpleNamespace(create=self._files_create, content=self._files_content)
+        self.batches = SimpleNamespace(create=self._batches_create, retrieve=self._batches_retrieve)
+
+    def _files_create(self, *, file: Any, purpose: str) -> Any:
+        assert purpose == "batch"
+        self.uploaded = [json.loads(line) for line in file.read().decode("utf-8").splitlines()]
+        return SimpleNamespace(id="file_in")
+
+    def _files_content(self, file_id: str) -> Any:
+        assert file_id == "file_out"
+        return SimpleNamespace(text=self._output)
+
+    def _batches_create(self, **_kw: Any) -> Any:
+        return SimpleNamespace(id="batch_1", status="in_progress", output_file_id=None, error_file_id=None)
+
+    def _batches_retrieve(self, batch_id: str) -> Any:
+        self._polls += 1
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file_out", error_file_id=None)
+
+
+def test_evaluate_companies_batch_returns_triples_in_input_order(monkeypatch: Any, fake_openai: Any) -> None:
+    # Output lines arrive out of order; the failed line maps to an exception.
+    failed = {"custom_id": "1", "response": {"status_code": 500, "body": {}}, "error": None}
+    fake = _FakeBatchClient([_ok_line("2", "https://c.com"), failed, _ok_line("0", "https://a.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    fake_openai()
+    monkeypatch.setattr(openai_batch.time, "sleep", lambda _s: None)
+
+    out = openai_batch.evaluate_companies_batch(
+        ["a.com", "b.com", "c.com"], "gpt-test", service_tier="flex", return_exceptions=True
+    )
+
+    assert [line["custom_id"] for line in fake.uploaded] == ["0", "1", "2"]
+    assert all("service_tier" not in line["body"] for line in fake.uploaded)
+    assert "Shop website URL: https://b.com" in fake.uploaded[1]["body"]["input"][1]["content"]
+
+    result, usage, ws = out[0]
+    assert result == {"input_url": "https://a.com"}
+    assert usage.input_tokens == 10
+    assert evaluator._billable_web_search_calls(ws) == 1
+    assert isinstance(out[1], RuntimeError)
+    assert out[2][0] == {"input_url": "https://c.com"}
+
+
+def test_evaluate_companies_batch_maps_malformed_output_to_exception(monkeypatch: Any, fake_openai: Any) -> None:
+    bad = _ok_line("1", "https://b.com")
+    bad["response"]["body"]["output"][1]["content"][0]["text"] = '{"input_url": "https://b.'  # truncated
+    fake = _FakeBatchClient([_ok_line("0", "https://a.com"), bad, _ok_line("2", "https://c.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    fake_openai()
+    monkeypatch.setattr(openai_batch.time, "sleep", lambda _s: None)
+
+    out = openai_batch.evaluate_companies_batch(["a.com", "b.com", "c.com"], "gpt-test", return_exceptions=True)
+
+    assert out[0][0] == {"input_url": "https://a.com"}
+    assert isinstance(out[1], ValueError)
+    assert out[2][0] == {"input_url": "https://c.com"}
+
+
+def test_batch_bodies_only_carry_explicit_prompt_cache_retention(monkeypatch: Any, fake_openai: Any) -> None:
+    fake_openai()
+    monkeypatch.setattr(openai_batch.time, "sleep", lambda _s: None)
+    monkeypatch.setattr(evaluator, "_MODELS_WITHOUT_RETENTION", set())
+
+    fake = _FakeBatchClient([_ok_line("0", "https://a.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    openai_batch.evaluate_companies_batch(["a.com"], "gpt-test", prompt_cache=True)
+    body = fake.uploaded[0]["body"]
+    assert "prompt_cache_key" in body and "prompt_cache_retention" not in body
+
+    fake = _FakeBatchClient([_ok_line("0", "https://a.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    openai_batch.evaluate_companies_batch(["a.com"], "gpt-test", prompt_cache=True, prompt_cache_retention="24h")
+    assert fake.uploaded[0]["body"]["prompt_cache_retention"] == "24h"
+
+
+def test_batch_skips_cached_urls_and_stores_fresh_results(monkeypatch: Any, fake_openai: Any) -> None:
+    class _DictCache(dict):
+        def set(self, key: str, value: Any) -> None:
+            self[key] = value
+
+    fake_openai()
+    monkeypatch.setattr(openai_batch.time, "sleep", lambda _s: None)
+    cache = _DictCache()
+
+    fake = _FakeBatchClient([_ok_line("0", "https://a.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    first = openai_batch.evaluate_companies_batch(["a.com"], "gpt-test", result_cache=cache)
+    assert len(cache) == 1 and not first[0][2].get("cache_hit")
+
+    fake = _FakeBatchClient([_ok_line("1", "https://c.com")])
+    monkeypatch.setattr(evaluator, "_get_client", lambda: fake)
+    out = openai_batch.evaluate_companies_batch(["a.com", "c.com"], "gpt-test", result_cache=cache)
+    assert [line["custom_id"] for line in fake.uploaded] == ["1"]  # only the uncached URL is submitted
+    assert out[0][0] == {"input_url": "https://a.com"} and out[0][2]["cache_hit"] is True
+    assert out[1][0] == {"input_url": "https://c.com"} and len(cache) == 2
+
+    monkeypatch.setattr(evaluator, "_get_client", lambda: None)  # no batch at all when everything is cached
+    out = openai_batch.evaluate_companies_batch(["c.com", "a.com"], "gpt-test", result_cache=cache)
+    assert [r[0]["input_url"] for r in out] == ["https://c.com", "https://a.com"]
+
+
+def test_batch_jsonl_round_trip(tmp_path: Any) -> None:
+    line = openai_batch.BatchRequestLine(custom_id="c-1", method="POST", url="/v1/responses", body={"q": "Müller"})
+    in_path = tmp_path / "in.jsonl"
+    openai_batch.write_batch_input_jsonl([line], in_path)
+    assert json.loads(in_path.read_text(encoding="utf-8"))["body"] == {"q": "Müller"}
+
+    out_path = tmp_path / "out.jsonl"
+    out_path.write_text(json.dumps(_ok_line("c-1", "https://a.com")) + "\n\n", encoding="utf-8")
+    (parsed,) = list(openai_batch.parse_batch_output_jsonl(out_path))
+    assert parsed.custom_id == "c-1"
+    assert parsed.model_result == {"input_url": "https://a.com"}
+    assert parsed.web_search_calls == 1
+
+
+def test_irene_batch_lines_share_one_system_prompt(tmp_path: Any, fake_openai: Any) -> None:
+    fake_openai()
+    sample = tmp_path / "sample.csv"
+    sample.write_text("Name,Website\nA Shop,a.com\nB,\nC,c.com\n", encoding="utf-8")
+
+    lines = openai_batch.build_irene_batch_lines(sample, model="gpt-test")
+
+    assert [line.custom_id for line in lines] == ["irene-1-A_Shop", "irene-3-C"]
+    first, second = (line.body["input"][0]["content"] for line in lines)
+    assert first is second and "RUBRIC_BODY" in first
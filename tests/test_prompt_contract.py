@@ -1,17 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+from typing import Any
 
 import shoptech_eval.evaluator as evaluator
 
 
-def test_system_prompt_mentions_search_and_budget_guidance(monkeypatch: Any) -> None:
+def test_system_prompt_mentions_search_and_budget_guidance(fake_openai: Any) -> None:
     # Ensure the prompt keeps the behavioral contract: search tool use + budget-aware guidance.
-    def _fake_load_rubric_text(_: Optional[str]) -> tuple[str, str]:
-        return ("rubrics/test.md", "RUBRIC_BODY")
-
-    monkeypatch.setattr(evaluator, "load_rubric_text", _fake_load_rubric_text)
-
     class _FakeResponses:
         def __init__(self) -> None:
             self.kwargs = None
@@ -41,8 +36,7 @@ def test_system_prompt_mentions_search_and_budget_guidance(monkeypatch: Any) ->
         def __init__(self) -> None:
             self.responses = _FakeResponses()
 
-    fake = _FakeClient()
-    monkeypatch.setattr(evaluator, "OpenAI", lambda: fake)
+    fake = fake_openai(_FakeClient())
 
     evaluator.evaluate_company("example.com", "gpt-test")
     system_msg = fake.responses.kwargs["input"][0]["content"]
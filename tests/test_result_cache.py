@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, List
+
+import shoptech_eval.evaluator as evaluator
+from shoptech_eval.result_cache import DiskCache
+
+
+def test_disk_cache_round_trip_and_expiry(tmp_path: Path) -> None:
+    cache = DiskCache(tmp_path / "cache", default_ttl=60)
+    cache.set("k", ({"a": 1}, None, {"calls": []}))
+    cache.set("old", "v", expire=-1)
+
+    # A second instance on the same directory sees the persisted entry.
+    reopened = DiskCache(tmp_path / "cache")
+    assert reopened.get("k") == ({"a": 1}, None, {"calls": []})
+    assert reopened.get("old") is None
+    assert reopened.get("missing", "dflt") == "dflt"
+
+
+def test_disk_cache_hits_are_marked_and_skip_the_request(tmp_path: Path, monkeypatch: Any, fake_openai: Any) -> None:
+    calls: List[Dict[str, Any]] = []
+
+    def _fake_uncached(url: str, model: str, options: Any, *, need_debug: bool = True) -> Any:
+        calls.append({"url": url, "need_debug": need_debug})
+        return {"input_url": url}, {"input_tokens": 1}, {"by_kind_completed": {"query": 1}}
+
+    monkeypatch.setattr(evaluator, "_evaluate_company_uncached", _fake_uncached)
+    fake_openai()
+
+    opts = evaluator.EvalOptions(result_cache=DiskCache(tmp_path))
+    _res, _use, ws1 = evaluator._evaluate_company_raw("a.com", "gpt-test", opts)
+    res2, _use, ws2 = evaluator._evaluate_company_raw("a.com", "gpt-test", opts)
+
+    assert len(calls) == 1 and calls[0]["need_debug"] is True
+    assert "cache_hit" not in ws1
+    assert ws2["cache_hit"] is True and res2 == {"input_url": "a.com"}
+
+
+def test_cache_by_site_shares_entries_across_url_variants(fake_openai: Any) -> None:
+    fake_openai()
+
+    site = evaluator.EvalOptions(cache_by_site=True)
+    keys = {evaluator._result_cache_key(u, "gpt-test", site) for u in ("acme.com", "https://www.Acme.com/de?x=1", "http://acme.com/")}
+    assert len(keys) == 1
+    assert evaluator._result_cache_key("shop.acme.com", "gpt-test", site) not in keys
+
+    exact = evaluator.EvalOptions()
+    assert evaluator._result_cache_key("acme.com", "gpt-test", exact) != evaluator._result_cache_key("acme.com/de", "gpt-test", exact)
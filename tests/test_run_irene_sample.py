@@ -6,10 +6,13 @@ import os
 import sys
 from pathlib import Path
 
+import pytest
+
 import scripts.evaluate_list as runner
 
 
-def test_run_irene_sample_main_writes_jsonl(tmp_path: Path, monkeypatch) -> None:
+@pytest.mark.parametrize("minimal_jsonl", [False, True])
+def test_run_irene_sample_main_writes_jsonl(tmp_path: Path, monkeypatch, minimal_jsonl: bool) -> None:
     # Create a tiny sample CSV (not the real 9-row file).
     sample = tmp_path / "sample.csv"
     with sample.open("w", encoding="utf-8", newline="") as f:
@@ -131,7 +134,8 @@ def test_run_irene_sample_main_writes_jsonl(tmp_path: Path, monkeypatch) -> None
             "gpt-test",
             "--sleep",
             "0",
-        ],
+        ]
+        + (["--minimal-jsonl"] if minimal_jsonl else []),
     )
 
     rc = runner.main()
@@ -142,7 +146,7 @@ def test_run_irene_sample_main_writes_jsonl(tmp_path: Path, monkeypatch) -> None
     lines = out.read_text(encoding="utf-8").strip().splitlines()
     assert len(lines) == 2
     rec = json.loads(lines[0])
-    assert "raw" in rec
-    assert "url_citations" in rec
+    assert ("raw" in rec) is not minimal_jsonl
+    assert rec["url_citations"] == [{"url": "https://example.com", "title": "t"}]
 
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 import re
 from pathlib import Path
 
+import pytest
+
 import scripts.evaluate_list as runner
 
 
@@ -13,6 +15,7 @@ def test_suffix_slug() -> None:
     assert runner._suffix_slug("my run 01") == "my_run_01"
     assert runner._suffix_slug("weird*&^%name") == "weirdname"
     assert runner._suffix_slug("__a__b__") == "a__b"
+    assert runner._suffix_slug(" Müller\tlauf/2 ") == "Müller_lauf2"
 
 
 def test_run_stamp_format() -> None:
@@ -26,7 +29,7 @@ def test_load_url_list(tmp_path: Path) -> None:
         "# comment\n\nhttps://example.com\nexample.org/path\n  www.test.com  \n",
         encoding="utf-8",
     )
-    rows = runner._load_rows(p, input_format="txt")
+    rows = list(runner._iter_rows(p, input_format="txt"))
     assert rows == [{"Website": "https://example.com"}, {"Website": "example.org/path"}, {"Website": "www.test.com"}]
 
 
@@ -35,4 +38,19 @@ def test_normalize_for_dedupe() -> None:
     assert runner._normalize_for_dedupe("example.com/") == "example.com"
     assert runner._normalize_for_dedupe("https://example.com/a?b=c") == "example.com/a?b=c"
     assert runner._normalize_for_dedupe("") == ""
+    assert runner._normalize_for_dedupe(" https://Example.com/Shop/?q=1#top ") == "example.com/shop/?q=1"
+    assert runner._normalize_for_dedupe("example.com/#top") == "example.com/#top"
+
+
+
+def test_parquet_input_cache_round_trip(tmp_path: Path) -> None:
+    pytest.importorskip("pyarrow")
+    src = tmp_path / "in.csv"
+    src.write_text("Name;Website;Notes\nA;a.com;x\nB;;y\n", encoding="utf-8")
+    cache = tmp_path / "in.parquet"
+
+    rows = runner._iter_rows(src, input_format="csv", csv_delimiter=None, columns=["Website", "Name", "Firma"])
+    assert runner._write_parquet_rows(rows, cache, ["Website", "Name", "Firma"]) == 2
 
+    back = list(runner._iter_rows(cache, input_format=None, csv_delimiter=None, columns=["Website", "Name"]))
+    assert back == [{"Website": "a.com", "Name": "A"}, {"Website": "", "Name": "B"}]
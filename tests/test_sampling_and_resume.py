@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import csv
+import gzip
+import itertools
+import json
 import sys
 from pathlib import Path
 
@@ -230,3 +233,107 @@ def test_resume_skips_already_processed_websites(tmp_path: Path, monkeypatch) ->
     assert calls == ["b.com"]
 
 
+
+
+def test_eligible_rows_filters_lazily() -> None:
+    def _rows():
+        yield {"Website": "https://A.com/"}
+        yield {"Website": ""}
+        yield {"Website": "a.com"}
+        yield {"Website": "done.com"}
+        yield {"Website": "b.com"}
+        raise AssertionError("input read past the limit")
+
+    rows = runner._eligible_rows(_rows(), url_column="Website", processed={"done.com"}, dedupe=True, resume=True)
+    got = [r["Website"] for r in itertools.islice(rows, 2)]
+    assert got == ["https://A.com/", "b.com"]
+
+
+def test_gzip_out_round_trips_through_resume(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    sample = tmp_path / "in.txt"
+    sample.write_text("a.com\nb.com\n", encoding="utf-8")
+    out = tmp_path / "o.jsonl.gz"
+    out_csv = tmp_path / "o.csv.gz"
+
+    class _Usage:
+        input_tokens = 0
+        output_tokens = 0
+        total_tokens = 0
+        input_tokens_details = type("X", (), {"cached_tokens": 0})()
+        output_tokens_details = type("Y", (), {"reasoning_tokens": 0})()
+
+    calls: list[str] = []
+
+    def _fake_eval(url: str, *_a, **_kw):
+        calls.append(url)
+        return ({"input_url": url, "confidence": "high", "reasoning": "Müller"}, _Usage(), 0, [])
+
+    monkeypatch.setattr(runner, "evaluate_company_with_usage_and_web_search_artifacts", _fake_eval)
+    argv = ["evaluate_list.py", "--input", str(sample), "--out", str(out), "--out-csv", str(out_csv), "--sleep", "0"]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--limit", "1"])
+    assert runner.main() == 0
+    monkeypatch.setattr(sys, "argv", argv + ["--resume"])
+    assert runner.main() == 0
+
+    assert calls == ["a.com", "b.com"]
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f]
+    assert [r["website"] for r in recs] == ["a.com", "b.com"]
+    assert recs[0]["reasoning"] == "Müller"
+    with gzip.open(out_csv, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["website"] for r in rows] == ["a.com", "b.com"]
+    assert rows[0]["confidence"] == "high" and rows[0]["error"] == ""
+
+
+def test_resume_index_scans_only_appended_lines(tmp_path: Path) -> None:
+    out = tmp_path / "o.jsonl"
+    out.write_text('{"website": "https://A.com/"}\nnot json\n{"website": "b.com"', encoding="utf-8")
+
+    idx = runner._ResumeIndex(out)
+    idx.sync()
+    assert "a.com" in idx and "b.com" not in idx  # the partial last line is left for the next sync
+
+    with out.open("a", encoding="utf-8") as f:
+        f.write('}\n{"website": "c.com"}\n')
+    idx.sync()
+    assert "b.com" in idx and "c.com" in idx
+    idx.close()
+
+    # A rewritten (smaller) file invalidates the index; reopening picks up the stored state.
+    out.write_text('{"website": "d.com"}\n', encoding="utf-8")
+    idx = runner._ResumeIndex(out)
+    idx.sync()
+    assert "d.com" in idx and "a.com" not in idx
+    idx.close()
+
+
+def test_sample_keys_is_uniform_over_distinct_keys() -> None:
+    keys = ["a", "b", "a", "c", "a", "a", "d", ""]
+    assert runner._sample_keys(iter(keys), k=10, seed=1) == {"a", "b", "c", "d"}
+    assert runner._sample_keys(iter(keys), k=0, seed=1) == set()
+
+    # A key repeated many times is no more likely to be picked than any other.
+    stream = ["hot"] * 50 + [f"k{i}" for i in range(9)]
+    hits = sum("hot" in runner._sample_keys(iter(stream), k=1, seed=seed) for seed in range(2000))
+    assert 120 < hits < 290  # expected 200 (1 in 10)
+
+
+def test_jsonl_website_fast_path_matches_json_loads() -> None:
+    recs = [
+        {"name": 'says "website": "evil.com"', "website": "Müller.de", "raw": {"website": "nested.com"}},
+        {"name": "x", "website": 'a\\b"c.com'},
+        {"name": "no website"},
+    ]
+    for rec in recs:
+        for line in (json.dumps(rec).encode(), json.dumps(rec, ensure_ascii=False, indent=None).encode() + b"\n"):
+            assert runner._jsonl_website(line) == (rec.get("website") or "")
+    assert runner._jsonl_website(b"not json\n") == ""
+
+
+def test_resume_key_prefers_the_stored_website_key() -> None:
+    assert runner._jsonl_resume_key(b'{"website": "https://A.com/", "website_key": "a.com"}\n') == "a.com"
+    assert runner._jsonl_resume_key(b'{"website": "https://A.com/"}\n') == "a.com"  # older outputs
+    assert runner._jsonl_resume_key(b'{"website": "x.com", "website_key": "stored"}') == "stored"
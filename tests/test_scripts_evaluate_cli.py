@@ -1,8 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import io
+import json
 import os
 import subprocess
 import sys
+import types
+
+import scripts.evaluate as evaluate
+import shoptech_eval
+import shoptech_eval.openai_batch as openai_batch
+
+
+def _fake_usage(input_tokens: int = 10) -> types.SimpleNamespace:
+    return types.SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=0,
+        total_tokens=input_tokens,
+        input_tokens_details=types.SimpleNamespace(cached_tokens=0),
+        output_tokens_details=types.SimpleNamespace(reasoning_tokens=0),
+    )
 
 
 def test_scripts_evaluate_exits_when_no_key() -> None:
@@ -18,3 +36,184 @@ def test_scripts_evaluate_exits_when_no_key() -> None:
     assert "Missing OPENAI_API_KEY" in (p.stderr + p.stdout)
 
 
+def _run_evaluate_main(
+    monkeypatch, capsys, confidences: list[str], *, retry_first: bool = False
+) -> tuple[list[dict], list[bool], str, str]:
+    calls: list[dict] = []
+    usage = _fake_usage()
+
+    async def _fake(url, model, **kw):
+        calls.append(dict(kw))
+        if kw.get("extra_user_instructions"):
+            await asyncio.sleep(0 if retry_first else 0.05)  # retry usually finishes after attempt 1
+            return {"input_url": url, "confidence": confidences[1]}, usage, {"by_kind_completed": {"query": 1}}
+        await asyncio.sleep(0.01 if retry_first else 0)  # let the speculative retry start
+        if kw.get("on_text_delta"):
+            kw["on_text_delta"]('{"input_url": "x", "confidence": "' + confidences[0] + '", ')
+            await asyncio.sleep(0)
+            early_cancelled.append(_others_finished())
+        return {"input_url": url, "confidence": confidences[0]}, usage, {"by_kind_completed": {"query": 1}}
+
+    early_cancelled: list[bool] = []
+
+    def _others_finished() -> bool:
+        current = asyncio.current_task()
+        others = [t for t in asyncio.all_tasks() if t is not current]
+        return all(t.cancelled() or t.done() for t in others)
+
+    async def _close() -> None:
+        return None
+
+    monkeypatch.setattr(shoptech_eval, "aevaluate_company_with_usage_and_web_search_debug", _fake)
+    monkeypatch.setattr(shoptech_eval, "new_async_client", lambda: types.SimpleNamespace(close=_close))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(
+        sys, "argv", ["evaluate.py", "https://a.com", "--retry-disambiguation-on-low-confidence"]
+    )
+    assert evaluate.main() == 0
+    out = capsys.readouterr()
+    return calls, early_cancelled, out.out, out.err
+
+
+def test_speculative_retry_is_discarded_when_attempt1_is_confident(monkeypatch, capsys) -> None:
+    calls, early_cancelled, out, err = _run_evaluate_main(monkeypatch, capsys, ["high", "high"])
+    # Both calls were started together; only attempt 1 counts.
+    assert len(calls) == 2
+    assert calls[0]["stream"] is True
+    # The streamed confidence cancelled the retry before attempt 1 returned.
+    assert early_cancelled == [True]
+    assert '"confidence": "high"' in out
+    assert "attempts=1" in err
+    assert "excludes_cancelled_speculative_retries=1" in err
+
+
+def test_speculative_retry_that_finished_first_is_costed_but_not_selected(monkeypatch, capsys) -> None:
+    calls, _, out, err = _run_evaluate_main(monkeypatch, capsys, ["high", "medium"], retry_first=True)
+    assert len(calls) == 2
+    assert '"confidence": "high"' in out
+    assert "attempts=2" in err and "web_search_calls=2" in err
+    assert "excludes_cancelled_speculative_retries" not in err
+
+
+def test_speculative_retry_is_selected_when_attempt1_is_low(monkeypatch, capsys) -> None:
+    calls, early_cancelled, out, err = _run_evaluate_main(monkeypatch, capsys, ["low", "medium"])
+    assert len(calls) == 2
+    assert early_cancelled == [False]
+    assert '"confidence": "medium"' in out
+    retry_prompt = calls[1]["extra_user_instructions"]
+    assert "'a.com Shopware'" in retry_prompt and "<domain>" not in retry_prompt
+    assert "attempts=2" in err and "web_search_calls=2" in err
+
+
+def test_scripts_evaluate_exits_on_missing_rubric(tmp_path) -> None:
+    env = dict(os.environ)
+    env["OPENAI_API_KEY"] = "test"
+    p = subprocess.run(
+        [sys.executable, "-m", "scripts.evaluate", "https://example.com", "--rubric-file", str(tmp_path / "nope.md")],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert p.returncode == 2
+    assert "Cannot load rubric" in p.stderr
+
+
+def test_batch_mode_prints_one_json_line_per_url(monkeypatch, capsys) -> None:
+    usage = _fake_usage()
+    clients: list[object] = []
+
+    async def _fake(url, model, **kw):
+        clients.append(kw["client"])
+        if url == "bad.com":
+            raise RuntimeError("boom")
+        return {"input_url": url, "confidence": "high"}, usage, {"by_kind_completed": {"query": 1}}
+
+    async def _close() -> None:
+        return None
+
+    monkeypatch.setattr(shoptech_eval, "aevaluate_company_with_usage_and_web_search_debug", _fake)
+    monkeypatch.setattr(shoptech_eval, "new_async_client", lambda **_kw: types.SimpleNamespace(close=_close))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a.com\n\nbad.com\nc.com\n"))
+    monkeypatch.setattr(sys, "argv", ["evaluate.py", "--batch", "--concurrency", "2"])
+
+    assert evaluate.main() == 1
+    out = capsys.readouterr()
+    lines = [json.loads(line) for line in out.out.splitlines()]
+    assert sorted(line["input_url"] for line in lines) == ["a.com", "bad.com", "c.com"]
+    assert [line["error"] for line in lines if "error" in line] == ["RuntimeError: boom"]
+    assert len(set(map(id, clients))) == 1
+    assert "attempts=2" in out.err and "urls=3, errors=1" in out.err
+
+
+def test_batch_api_mode_prints_results_in_input_order(monkeypatch, capsys) -> None:
+    usage = _fake_usage(1_000_000)
+
+    def _fake_batch(urls, model, **kw):
+        assert kw["return_exceptions"] is True
+        return [({"input_url": urls[0]}, usage, {"by_kind_completed": {"query": 1}}), RuntimeError("expired")]
+
+    monkeypatch.setattr(openai_batch, "evaluate_companies_batch", _fake_batch)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("SHOPTECH_PRICE_INPUT_PER_1M", "1.0")
+    monkeypatch.setenv("SHOPTECH_BATCH_TOKEN_DISCOUNT", "0.5")
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a.com\nb.com\n"))
+    monkeypatch.setattr(sys, "argv", ["evaluate.py", "--batch", "--use-batch-api"])
+
+    assert evaluate.main() == 1
+    out = capsys.readouterr()
+    lines = [json.loads(line) for line in out.out.splitlines()]
+    assert lines == [{"input_url": "a.com"}, {"input_url": "b.com", "error": "RuntimeError: expired"}]
+    assert "tokens=0.500000" in out.err and "batch_api=1" in out.err
+
+
+def test_adaptive_limit_halves_once_per_burst_and_recovers() -> None:
+    now = [0.0]
+    limit = evaluate._AdaptiveLimit(8, clock=lambda: now[0])
+    limit.record(throttled=True)
+    limit.record(throttled=True)  # same burst of 429s
+    assert limit.limit == 4
+    now[0] = 1.5
+    limit.record(throttled=True, retry_after=3.0)
+    assert limit.limit == 2
+    now[0] = 4.0
+    limit.record(throttled=False)  # still inside the Retry-After window
+    assert limit.limit == 2
+    now[0] = 5.0
+    for _ in range(10):
+        limit.record(throttled=False)
+    assert limit.limit == 8
+
+
+def test_batch_concurrency_counts_speculative_retries_and_sdk_429s(monkeypatch, capsys) -> None:
+    usage = _fake_usage()
+    state = {"in_flight": 0, "max_in_flight": 0}
+    hooks: list = []
+
+    async def _fake(url, model, **kw):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return {"input_url": url, "confidence": "low"}, usage, {"by_kind_completed": {"query": 1}}
+
+    async def _close() -> None:
+        return None
+
+    def _new_client(*, on_rate_limited):
+        hooks.append(on_rate_limited)
+        return types.SimpleNamespace(close=_close)
+
+    monkeypatch.setattr(shoptech_eval, "aevaluate_company_with_usage_and_web_search_debug", _fake)
+    monkeypatch.setattr(shoptech_eval, "new_async_client", _new_client)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(sys, "stdin", io.StringIO("a.com\nb.com\nc.com\n"))
+    monkeypatch.setattr(
+        sys, "argv", ["evaluate.py", "--batch", "--concurrency", "2", "--retry-disambiguation-on-low-confidence"]
+    )
+
+    assert evaluate.main() == 0
+    # Attempt 1 and the speculative retry each take a slot.
+    assert state["max_in_flight"] == 2
+    assert "attempts=6" in capsys.readouterr().err
+    assert len(hooks) == 1
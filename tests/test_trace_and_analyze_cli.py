@@ -71,11 +71,28 @@ def test_trace_web_search_writes_outputs(tmp_path: Path, monkeypatch) -> None:
     rows = list(csv.DictReader(out_csv.open("r", encoding="utf-8", newline="")))
     assert len(rows) == 1
     assert int(rows[0]["query_calls"]) == 1
+    assert json.loads(rows[0]["queries_json"]) == ["a.com"]
+    assert (rows[0]["reasoning"], rows[0]["error"]) == ("r", "")
 
     rec = json.loads(out_jsonl.read_text(encoding="utf-8").splitlines()[0])
     assert rec["web_search_debug"]["completed"] == 1
 
 
+def test_trace_sample_unique_dedupes_before_sampling() -> None:
+    rows = [{"Website": u} for u in ("a.com", "https://A.com/", "b.com", "", "c.com", "b.com")]
+    picked = trace._sample_unique(rows, url_column="Website", k=2, seed=1)
+    keys = [trace._normalize_for_dedupe(r["Website"]) for r in picked]
+    assert len(set(keys)) == 2 and set(keys) <= {"a.com", "b.com", "c.com"}
+    assert len(trace._sample_unique(rows, url_column="Website", k=10, seed=1)) == 3
+
+
+def test_trace_csv_rows_projects_requested_columns(tmp_path: Path) -> None:
+    p = tmp_path / "in.csv"
+    p.write_text("\ufeffName;Website;Extra\nA;a.com;x\nB\n", encoding="utf-8")
+    rows = list(trace._iter_csv_rows(p, None, columns=("Website", "Name", "Missing")))
+    assert rows == [{"Website": "a.com", "Name": "A"}, {"Website": None, "Name": "B"}]
+
+
 def test_analyze_run_reads_csv_and_prints_summary(tmp_path: Path, monkeypatch, capsys) -> None:
     p = tmp_path / "run.csv"
     p.write_text(
@@ -18,3 +18,44 @@ def test_billable_web_search_calls_handles_bad_inputs() -> None:
     assert evaluator._billable_web_search_calls({"by_kind_completed": {"query": "not-an-int"}}) == 0
 
 
+
+
+class _Action:
+    def __init__(self, **kw) -> None:
+        self._kw = kw
+
+    def model_dump(self) -> dict:
+        return dict(self._kw)
+
+
+class _Obj:
+    def __init__(self, **kw) -> None:
+        self.__dict__.update(kw)
+
+
+def test_web_search_call_debug_single_pass_classifies_calls_and_citations() -> None:
+    resp = _Obj(
+        output=[
+            _Obj(type="web_search_call", id="ws1", status="completed", action=_Action(type="search", query="a.com shopify")),
+            _Obj(type="web_search_call", id="ws2", status="completed", action=_Action(type="open_page", url="https://a.com")),
+            _Obj(type="reasoning"),
+            _Obj(
+                type="message",
+                content=[
+                    _Obj(
+                        annotations=[
+                            _Obj(type="url_citation", url_citation=_Obj(url="https://a.com", title="A")),
+                            _Obj(type="url_citation", url_citation=_Obj(url="https://a.com", title="A again")),
+                        ]
+                    )
+                ],
+            ),
+        ]
+    )
+    ws = evaluator._web_search_call_debug(resp)
+    assert ws["output_item_types"] == ["web_search_call", "web_search_call", "reasoning", "message"]
+    assert ws["total"] == 2 and ws["completed"] == 2
+    assert ws["by_kind_completed"] == {"query": 1, "open": 1}
+    # action_hint keeps the dict repr so downstream tooling can recover the query text.
+    assert "'query': 'a.com shopify'" in ws["calls"][0]["action_hint"]
+    assert ws["url_citations"] == [{"url": "https://a.com", "title": "A"}]